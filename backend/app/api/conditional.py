@@ -0,0 +1,83 @@
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import Any, Optional, Set
+import hashlib
+
+from ..models.trip import Trip
+
+
+def make_etag(trip: Any, variant: str) -> str:
+    """
+    Strong ETag for one representation of a trip.
+
+    ``trip`` is anything with ``id``, ``version`` and ``updated_at`` (a Trip
+    or a row from ``lookup_trip_version``). Every write to a trip or to its
+    options and itinerary bumps the trip's row version, so the tag changes
+    whenever any of the trip's representations could have changed. The tag
+    starts with the version, so any of them can be sent back in If-Match.
+    """
+    updated_at = trip.updated_at.isoformat() if trip.updated_at else ""
+    digest = hashlib.sha1(f"{trip.id}:{trip.version}:{updated_at}:{variant}".encode()).hexdigest()[:20]
+    return f'"{trip.version}-{digest}"'
+
+
+def lookup_trip_version(db: Session, trip_id: str):
+    """Fetch only the columns needed for an ETag; None if the trip does not exist"""
+    return db.query(Trip.id, Trip.version, Trip.updated_at).filter(
+        Trip.id == trip_id,
+        Trip.deleted_at.is_(None)
+    ).first()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def if_match_versions(request: Request) -> Optional[Set[int]]:
+    """
+    Trip versions named by If-Match; None when there is no precondition.
+
+    If-Match uses strong comparison, so weak tags never match.
+    """
+    header = request.headers.get("if-match")
+    if not header:
+        return None
+    versions = set()
+    for tag in (tag.strip() for tag in header.split(",")):
+        if tag == "*":
+            return None
+        version, _, _ = tag.strip('"').partition("-")
+        if not tag.startswith("W/") and version.isdigit():
+            versions.add(int(version))
+    return versions
+
+
+def check_if_match(request: Request, version: int) -> None:
+    """Raise 412 when If-Match names a different version of the trip"""
+    versions = if_match_versions(request)
+    if versions is not None and version not in versions:
+        raise precondition_failed()
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Trip has changed since it was read; fetch it again and retry"
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def with_etag(result: Any, response: Response, etag: str) -> Any:
+    """Attach the ETag to a returned Response, or to FastAPI's response for plain content"""
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = "no-cache"
+    return result
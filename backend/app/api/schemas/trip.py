@@ -127,6 +127,10 @@ class TripOptionsGenerate(BaseModel):
     force_regenerate: bool = Field(default=False, description="Force regeneration of options")
 
 
+class OptionRegenerate(BaseModel):
+    day_number: Optional[int] = Field(default=None, ge=1, description="Day to regenerate (default: every day of the option)")
+
+
 class PlaceSearchRequest(BaseModel):
     query: str = Field(..., description="Search query")
     place_type: Optional[str] = Field(default=None, description="Type of place to search")
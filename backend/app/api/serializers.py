@@ -0,0 +1,124 @@
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import load_only
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from ..core.timing import timed
+from ..core.tracing import span
+from ..models.trip import Trip, DailyItinerary, TripOption
+
+
+def _as_bool(value: Any) -> bool:
+    """is_selected is stored as a string column ("True"/"False"/"1"/"0")"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+# Response fields per resource, in schema order
+TRIP_FIELDS = (
+    "id", "destination", "start_date", "end_date", "total_budget", "currency", "travelers",
+    "themes", "accommodation_preference", "transportation_preference", "food_preference",
+    "special_requirements", "status", "created_at", "updated_at", "selected_option",
+)
+OPTION_FIELDS = (
+    "id", "trip_id", "option_name", "theme", "description", "daily_itineraries",
+    "total_cost", "highlights", "is_selected", "created_at", "updated_at",
+)
+ITINERARY_FIELDS = (
+    "id", "trip_id", "day_number", "date", "daily_budget", "activities", "meals",
+    "accommodation", "transport", "created_at", "updated_at",
+)
+
+# Summary views leave out the large JSON columns
+OPTION_SUMMARY_FIELDS = tuple(f for f in OPTION_FIELDS if f != "daily_itineraries")
+ITINERARY_SUMMARY_FIELDS = tuple(
+    f for f in ITINERARY_FIELDS if f not in ("activities", "meals", "accommodation", "transport")
+)
+
+_CONVERTERS = {"is_selected": _as_bool}
+
+
+def _pick(row: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    """Read only the requested attributes so deferred columns are never loaded"""
+    result = {}
+    for field in fields:
+        value = getattr(row, field)
+        converter = _CONVERTERS.get(field)
+        result[field] = converter(value) if converter else value
+    return result
+
+
+def serialize_option(option: TripOption, fields: Sequence[str] = OPTION_FIELDS) -> Dict[str, Any]:
+    """Plain dict matching TripOptionResponse (or the requested subset of it)"""
+    return _pick(option, fields)
+
+
+def serialize_trip(trip: Trip, selected_option: Optional[TripOption] = None,
+                   fields: Sequence[str] = TRIP_FIELDS,
+                   option_fields: Sequence[str] = OPTION_FIELDS) -> Dict[str, Any]:
+    """Plain dict matching TripResponse (or the requested subset of it)"""
+    result = _pick(trip, [field for field in fields if field != "selected_option"])
+    if "selected_option" in fields:
+        result["selected_option"] = (
+            serialize_option(selected_option, option_fields) if selected_option is not None else None
+        )
+    return result
+
+
+def serialize_itinerary(itinerary: DailyItinerary, fields: Sequence[str] = ITINERARY_FIELDS) -> Dict[str, Any]:
+    """Plain dict matching DailyItineraryResponse (or the requested subset of it)"""
+    return _pick(itinerary, fields)
+
+
+def resolve_fields(view: str, fields: Optional[str], all_fields: Sequence[str],
+                   summary_fields: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Turn the ``view``/``fields`` query parameters into the list of fields to return.
+
+    ``fields`` (comma-separated) takes precedence over ``view``; ``id`` is
+    always included. Unknown names are rejected with 400.
+    """
+    if fields:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(all_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        requested.add("id")
+        return tuple(field for field in all_fields if field in requested)
+    if view == "summary":
+        return tuple(summary_fields)
+    return tuple(all_fields)
+
+
+def load_only_fields(model: Any, fields: Sequence[str]):
+    """Loader option that defers every column not in fields"""
+    columns = [getattr(model, field) for field in fields if field in model.__table__.columns]
+    return load_only(*columns, raiseload=True)
+
+
+def fast_response(content: Any, serializer: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                  partial: bool = False) -> Any:
+    """
+    Serialize trusted ORM rows straight to JSON with orjson.
+
+    Returning a Response makes FastAPI skip response_model validation and
+    jsonable_encoder, which dominate the cost for large itinerary payloads.
+    The rows come from our own tables and already match the schemas.
+    Content that is already serialized can be passed without a serializer.
+    With FAST_JSON_RESPONSES disabled the content is returned unchanged
+    and goes through the regular response_model path, except for partial
+    (sparse fieldset) content which would not validate against it.
+    """
+    if not settings.fast_json_responses and not partial:
+        return content
+    with timed("serialize"), span("serialize", **{"serialize.rows": len(content) if isinstance(content, list) else 1}):
+        if serializer is None:
+            return ORJSONResponse(content)
+        if isinstance(content, list):
+            return ORJSONResponse([serializer(item) for item in content])
+        return ORJSONResponse(serializer(content))
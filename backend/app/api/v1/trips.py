@@ -1,21 +1,185 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from sqlalchemy.orm.exc import StaleDataError
+from typing import List, Dict, Any, Literal, Optional
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 
-from ...core.database import get_db
+from ...core.bulk import bulk_insert, bulk_insert_returning
+from ...core.coalesce import write_coalescer
+from ...core.database import SessionLocal, get_db, get_read_db
+from ...core.json_patch import JsonPatchError, apply_patch, touched_members, validate_patch
 from ...models.trip import Trip, DailyItinerary, TripOption
-from ...services.google_ai_service import google_ai_service
+from ...services.google_ai_service import google_ai_service, trip_ai_data
 from ...services.google_maps_service import google_maps_service
+from ...services.trip_export import TripExporter
+from ...services.trip_import import TripImporter
+from ..conditional import (
+    make_etag, lookup_trip_version, etag_matches, not_modified, with_etag,
+    check_if_match, if_match_versions, precondition_failed
+)
+from ..serializers import (
+    fast_response, serialize_trip, serialize_option, serialize_itinerary,
+    resolve_fields, load_only_fields,
+    TRIP_FIELDS, OPTION_FIELDS, OPTION_SUMMARY_FIELDS, ITINERARY_FIELDS, ITINERARY_SUMMARY_FIELDS
+)
 from ..schemas.trip import (
     TripCreate, TripResponse, TripUpdate,
     TripOptionResponse, DailyItineraryResponse,
-    TripOptionsGenerate
+    TripOptionsGenerate, OptionRegenerate
 )
 
 router = APIRouter()
 
+# Days regenerated at once when a whole option is regenerated
+REGENERATE_CONCURRENCY = 4
+
+
+# JSON Patch targets: the model, the column identifying a row within the
+# trip, the collection ETag variant, and the fields a patch may change
+# (with the JSON types they must keep)
+PATCH_TARGETS = {
+    "itinerary": (DailyItinerary, "day_number", "itinerary", {
+        "daily_budget": (int, float, type(None)),
+        "activities": list,
+        "meals": list,
+        "accommodation": dict,
+        "transport": dict,
+    }),
+    "option": (TripOption, "id", "options", {
+        "option_name": str,
+        "theme": str,
+        "description": (str, type(None)),
+        "daily_itineraries": list,
+        "total_cost": (int, float, type(None)),
+        "highlights": (list, type(None)),
+    }),
+}
+
+
+def _active_trips(db: Session):
+    """Query trips that have not been soft-deleted"""
+    return db.query(Trip).filter(Trip.deleted_at.is_(None))
+
+
+def _parse_patch(target: str, operations: Any) -> Dict[str, Any]:
+    """Validate a JSON Patch for a target; 422 if it is malformed or touches other fields"""
+    try:
+        members = touched_members(validate_patch(operations))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    unknown = members - set(PATCH_TARGETS[target][3])
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Fields cannot be patched: {', '.join(sorted(unknown))}"
+        )
+    return {"target": target, "operations": operations, "members": members}
+
+
+def _apply_trip_patches(db: Session, trip_id: str, patches: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Apply a batch of JSON Patches to one trip's days and options in one transaction
+
+    Only the patched rows, and only the fields the patches touch, are loaded
+    and written (plus the trip's version). Each patch is all-or-nothing.
+    The first patch that changes something bumps the trip's version, so
+    a later patch in the batch with If-Match gets 412 like it would had it
+    arrived after the commit (its ETag cannot name the new version yet).
+    Returns, per patch, the patched fields and the new ETag, or the
+    HTTPException for it.
+    """
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+    
+    members = {}
+    for patch in patches:
+        members.setdefault((patch["target"], patch["key"]), set()).update(patch["members"])
+    rows, originals = {}, {}
+    for target, fields in members.items():
+        model, column, _, _ = PATCH_TARGETS[target[0]]
+        fields = ("id", column) + tuple(sorted(fields))
+        rows[target] = db.query(model).options(load_only_fields(model, fields)).filter(
+            model.trip_id == trip_id,
+            getattr(model, column) == target[1]
+        ).first()
+        if rows[target] is not None:
+            originals[target] = {field: getattr(rows[target], field) for field in fields}
+    documents = dict(originals)
+    
+    results = []
+    bumped = False
+    for patch in patches:
+        target = (patch["target"], patch["key"])
+        field_types = PATCH_TARGETS[patch["target"]][3]
+        if rows[target] is None:
+            detail = "Day not found" if patch["target"] == "itinerary" else "Trip option not found"
+            results.append(HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail))
+            continue
+        if patch["expected"] is not None and (bumped or trip.version not in patch["expected"]):
+            results.append(precondition_failed())
+            continue
+        try:
+            patched = apply_patch(documents[target], patch["operations"])
+        except JsonPatchError as e:
+            results.append(HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)))
+            continue
+        invalid = [field for field in patch["members"] if not isinstance(patched.get(field), field_types[field])]
+        if invalid:
+            results.append(HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid value for {', '.join(sorted(invalid))}"
+            ))
+            continue
+        bumped = bumped or patched != documents[target]
+        documents[target] = patched
+        results.append(target)
+    
+    changed = False
+    for target, document in documents.items():
+        for field, value in document.items():
+            if value != originals[target][field]:
+                setattr(rows[target], field, value)
+                changed = True
+    if changed:
+        # Touch the trip so its version (and ETags) change
+        trip.updated_at = datetime.utcnow()
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Trip was modified concurrently, please retry"
+            )
+    
+    return [
+        result if isinstance(result, HTTPException)
+        else (documents[result], make_etag(trip, f"{PATCH_TARGETS[result[0]][2]}:full:"))
+        for result in results
+    ]
+
+
+async def _patch_trip(request: Request, response: Response, db: Session, trip_id: str,
+                      patch: Dict[str, Any]) -> Any:
+    """Queue a parsed patch with other edits to the trip and return its result"""
+    patch["expected"] = if_match_versions(request)
+    bind, info = db.get_bind(), dict(db.info)
+    
+    def apply(patches: List[Dict[str, Any]]) -> List[Any]:
+        # The batch runs in a worker thread on a session of its own, not the leading request's
+        with SessionLocal(bind=bind, info=info) as batch_db:
+            return _apply_trip_patches(batch_db, trip_id, patches)
+    
+    content, etag = await write_coalescer.submit(trip_id, patch, apply)
+    return with_etag(fast_response(content, partial=True), response, etag)
+
 
 @router.post("/", response_model=TripResponse)
 async def create_trip(trip_data: TripCreate, db: Session = Depends(get_db)):
@@ -43,7 +207,7 @@ async def create_trip(trip_data: TripCreate, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(db_trip)
         
-        return db_trip
+        return fast_response(db_trip, serialize_trip)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -52,58 +216,101 @@ async def create_trip(trip_data: TripCreate, db: Session = Depends(get_db)):
         )
 
 
+@router.get("/export")
+async def export_trips(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    trip_status: Optional[str] = Query(default=None, alias="status"),
+    options: bool = True,
+    itinerary: bool = True,
+    chunk_size: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Stream all trips with their options and daily itineraries
+
+    Rows are read through a server-side cursor and written out chunk by
+    chunk, so the export runs in constant memory. Declared before
+    ``/{trip_id}`` so that "export" is not taken for a trip id.
+    """
+    try:
+        exporter = TripExporter(
+            db.get_bind(), fmt=format, chunk_size=chunk_size, status=trip_status,
+            include_options=options, include_itinerary=itinerary
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        exporter.iter_bytes(),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="trips.{format}"'}
+    )
+
+
 @router.get("/{trip_id}", response_model=TripResponse)
-async def get_trip(trip_id: str, db: Session = Depends(get_db)):
-    """Get trip by ID with selected option information"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+async def get_trip(
+    trip_id: str,
+    request: Request,
+    response: Response,
+    view: Literal["summary", "full"] = "full",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get trip by ID with selected option information
+
+    ``view=summary`` leaves the selected option's daily itineraries out;
+    ``fields`` is a comma-separated list of trip fields to return.
+    """
+    trip_fields = resolve_fields(view, fields, TRIP_FIELDS, TRIP_FIELDS)
+    option_fields = OPTION_SUMMARY_FIELDS if view == "summary" else OPTION_FIELDS
+    
+    trip = _active_trips(db).options(
+        load_only_fields(Trip, trip_fields + ("version", "updated_at"))
+    ).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
     
+    etag = make_etag(trip, f"trip:{view}:{fields or ''}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     # Get the selected trip option if any
-    selected_option = db.query(TripOption).filter(
-        TripOption.trip_id == trip_id,
-        TripOption.is_selected == True
-    ).first()
+    selected_option = None
+    if "selected_option" in trip_fields:
+        selected_option = db.query(TripOption).options(
+            load_only_fields(TripOption, option_fields)
+        ).filter(
+            TripOption.trip_id == trip_id,
+            TripOption.is_selected == True
+        ).first()
     
-    # Convert trip to dict and add selected option
-    trip_dict = {
-        "id": trip.id,
-        "destination": trip.destination,
-        "start_date": trip.start_date,
-        "end_date": trip.end_date,
-        "total_budget": trip.total_budget,
-        "currency": trip.currency,
-        "travelers": trip.travelers,
-        "themes": trip.themes,
-        "accommodation_preference": trip.accommodation_preference,
-        "transportation_preference": trip.transportation_preference,
-        "food_preference": trip.food_preference,
-        "special_requirements": trip.special_requirements,
-        "status": trip.status,
-        "created_at": trip.created_at,
-        "updated_at": trip.updated_at,
-        "selected_option": selected_option
-    }
-    
-    return trip_dict
+    content = serialize_trip(trip, selected_option, trip_fields, option_fields)
+    partial = trip_fields != TRIP_FIELDS or option_fields != OPTION_FIELDS
+    return with_etag(fast_response(content, partial=partial), response, etag)
 
 
 @router.put("/{trip_id}", response_model=TripResponse)
 async def update_trip(
     trip_id: str, 
     trip_update: TripUpdate, 
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Update trip"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    """Update trip (send an ETag of the trip in If-Match to reject stale edits with 412)"""
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
+    check_if_match(request, trip.version)
     
     # Update fields
     update_data = trip_update.dict(exclude_unset=True)
@@ -112,22 +319,30 @@ async def update_trip(
     
     trip.updated_at = datetime.utcnow()
     
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Trip was modified concurrently, please retry"
+        )
     db.refresh(trip)
-    return trip
+    return fast_response(trip, serialize_trip)
 
 
 @router.delete("/{trip_id}")
 async def delete_trip(trip_id: str, db: Session = Depends(get_db)):
-    """Delete trip"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
+    """Delete trip (soft delete; the trip and its options are purged in the background)"""
+    deleted = _active_trips(db).filter(Trip.id == trip_id).update(
+        {Trip.deleted_at: datetime.utcnow(), Trip.version: Trip.version + 1}, synchronize_session=False
+    )
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
     
-    db.delete(trip)
     db.commit()
     return {"message": "Trip deleted successfully"}
 
@@ -137,16 +352,44 @@ async def list_trips(
     skip: int = 0, 
     limit: int = 100, 
     status: str = None,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """List all trips with optional filtering"""
-    query = db.query(Trip)
+    """List all trips with optional filtering and a comma-separated ``fields`` selection"""
+    trip_fields = resolve_fields("full", fields, TRIP_FIELDS, TRIP_FIELDS)
+    query = _active_trips(db).options(load_only_fields(Trip, trip_fields))
     
     if status:
         query = query.filter(Trip.status == status)
     
     trips = query.offset(skip).limit(limit).all()
-    return trips
+    return fast_response(
+        trips,
+        lambda trip: serialize_trip(trip, fields=trip_fields),
+        partial=trip_fields != TRIP_FIELDS
+    )
+
+
+@router.post("/import")
+async def import_trips(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    chunk_size: int = Query(default=1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import trips from a streamed NDJSON or CSV body (one trip per line or row)
+
+    The format defaults to the request Content-Type (``text/csv`` for CSV,
+    NDJSON otherwise). Rows are validated like ``POST /trips/`` and inserted
+    in batches of ``chunk_size``; invalid rows are reported, not fatal.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    
+    importer = TripImporter(db, fmt=format, chunk_size=chunk_size)
+    return await importer.import_stream(request.stream())
 
 
 @router.post("/{trip_id}/generate-options", response_model=List[TripOptionResponse])
@@ -155,58 +398,80 @@ async def generate_trip_options(
     options_request: TripOptionsGenerate,
     db: Session = Depends(get_db)
 ):
-    """Generate multiple trip options using AI"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    """
+    Generate multiple trip options using AI
+
+    Idempotent: a trip that already has options gets them back without a
+    Gemini call or any write. ``force_regenerate`` replaces them with a
+    freshly generated set, or fails with 502 and keeps them if Gemini does
+    not return one (a trip without options gets sample options, as usual). Replacing the selected option returns the trip to
+    draft and clears the itinerary that was built from it.
+    """
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
     
+    existing = db.query(TripOption).filter(TripOption.trip_id == trip_id).order_by(TripOption.created_at).all()
+    if existing and not options_request.force_regenerate:
+        return fast_response([serialize_option(option) for option in existing])
+    
+    # Prepare trip data for AI
+    trip_data = trip_ai_data(trip)
+    
+    if existing:
+        # Only replace the stored options with a real Gemini result
+        try:
+            ai_options = await google_ai_service.regenerate_trip_options(trip_data)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Error regenerating trip options: {str(e)}"
+            )
+    else:
+        # Generate options using AI (sample options if Gemini is unavailable)
+        ai_options = await google_ai_service.generate_trip_options(trip_data)
+    
     try:
-        # Prepare trip data for AI
-        trip_data = {
-            "destination": trip.destination,
-            "start_date": trip.start_date.isoformat(),
-            "end_date": trip.end_date.isoformat(),
-            "total_budget": trip.total_budget,
-            "travelers": trip.travelers,
-            "themes": trip.themes or [],
-            "accommodation_preference": trip.accommodation_preference,
-            "transportation_preference": trip.transportation_preference,
-            "food_preference": trip.food_preference,
-            "special_requirements": trip.special_requirements,
-            "duration": (trip.end_date - trip.start_date).days + 1
-        }
+        # Replace (never append to) any earlier set
+        replaced_selected = db.query(TripOption.id).filter(
+            TripOption.trip_id == trip_id,
+            TripOption.is_selected == True
+        ).first() is not None
+        db.query(TripOption).filter(TripOption.trip_id == trip_id).delete(synchronize_session=False)
+        if replaced_selected:
+            # The itinerary was built from the option being replaced
+            db.query(DailyItinerary).filter(DailyItinerary.trip_id == trip_id).delete(synchronize_session=False)
+            if trip.status == "planned":
+                trip.status = "draft"
         
-        # Generate options using AI
-        ai_options = await google_ai_service.generate_trip_options(trip_data)
+        # Save all options with a single bulk INSERT
+        default_total_cost = trip.total_budget * 0.8
+        option_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "trip_id": trip_id,
+                "option_name": option_data.get("option_name", "Generated Option"),
+                "theme": option_data.get("theme", "balanced"),
+                "description": option_data.get("description", ""),
+                "daily_itineraries": option_data.get("daily_itineraries", []),
+                "total_cost": option_data.get("total_cost", default_total_cost),
+                "highlights": option_data.get("highlights", [])
+            }
+            for option_data in ai_options
+        ]
+        saved_options = bulk_insert_returning(db, TripOption, option_rows)
         
-        # Save options to database
-        saved_options = []
-        for option_data in ai_options:
-            option_id = str(uuid.uuid4())
-            db_option = TripOption(
-                id=option_id,
-                trip_id=trip_id,
-                option_name=option_data.get("option_name", "Generated Option"),
-                theme=option_data.get("theme", "balanced"),
-                description=option_data.get("description", ""),
-                daily_itineraries=option_data.get("daily_itineraries", []),
-                total_cost=option_data.get("total_cost", trip.total_budget * 0.8),
-                highlights=option_data.get("highlights", [])
-            )
-            
-            db.add(db_option)
-            saved_options.append(db_option)
+        # Build the response before commit expires the loaded attributes
+        response = [serialize_option(option) for option in saved_options]
         
+        # Touch the trip so its version (and ETags) change
+        trip.updated_at = datetime.utcnow()
         db.commit()
         
-        # Refresh all options
-        for option in saved_options:
-            db.refresh(option)
-        
-        return saved_options
+        return fast_response(response)
         
     except Exception as e:
         db.rollback()
@@ -216,24 +481,171 @@ async def generate_trip_options(
         )
 
 
-@router.get("/{trip_id}/options", response_model=List[TripOptionResponse])
-async def get_trip_options(trip_id: str, db: Session = Depends(get_db)):
-    """Get all options for a trip"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+@router.post("/{trip_id}/options/{option_id}/regenerate", response_model=TripOptionResponse)
+async def regenerate_trip_option(
+    trip_id: str,
+    option_id: str,
+    regenerate_request: OptionRegenerate,
+    db: Session = Depends(get_db)
+):
+    """
+    Regenerate one day of an option, or every day of it, in place
+
+    Each day costs one daily-itinerary generation instead of a full set of
+    options. The option's stored itinerary is patched, and so is the trip's
+    itinerary if this option is the selected one. Nothing is written if any
+    day fails to generate.
+    """
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
     
-    options = db.query(TripOption).filter(TripOption.trip_id == trip_id).all()
-    return options
+    option = db.query(TripOption).filter(
+        TripOption.id == option_id,
+        TripOption.trip_id == trip_id
+    ).first()
+    if not option:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip option not found"
+        )
+    
+    days = list(option.daily_itineraries or [])
+    day_numbers = [day.get("day_number", index + 1) for index, day in enumerate(days)]
+    if regenerate_request.day_number is None:
+        indexes = list(range(len(days)))
+    elif regenerate_request.day_number in day_numbers:
+        indexes = [day_numbers.index(regenerate_request.day_number)]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Day not found in this option"
+        )
+    
+    trip_data = trip_ai_data(trip)
+    trip_data["themes"] = [option.theme] + [theme for theme in trip_data["themes"] if theme != option.theme]
+    semaphore = asyncio.Semaphore(REGENERATE_CONCURRENCY)
+    
+    async def regenerate_day(index: int) -> Dict[str, Any]:
+        day_data = {**trip_data, "start_date": days[index].get("date", trip_data["start_date"])}
+        async with semaphore:
+            itinerary = await google_ai_service.regenerate_daily_itinerary(day_data, day_numbers[index])
+        itinerary["day_number"] = day_numbers[index]
+        if "date" in days[index]:
+            itinerary["date"] = days[index]["date"]
+        return itinerary
+    
+    try:
+        regenerated = await asyncio.gather(*[regenerate_day(index) for index in indexes])
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Error regenerating itinerary: {str(e)}"
+        )
+    
+    try:
+        for index, itinerary in zip(indexes, regenerated):
+            days[index] = itinerary
+        option.daily_itineraries = days
+        response = serialize_option(option)
+        
+        # Keep the trip's itinerary in step when this option is the selected one
+        if response["is_selected"]:
+            for itinerary in regenerated:
+                db.query(DailyItinerary).filter(
+                    DailyItinerary.trip_id == trip_id,
+                    DailyItinerary.day_number == itinerary["day_number"]
+                ).update({
+                    "activities": itinerary.get("activities", []),
+                    "meals": itinerary.get("meals", []),
+                    "accommodation": itinerary.get("accommodation", {}),
+                    "transport": itinerary.get("transport", {})
+                }, synchronize_session=False)
+        
+        # Touch the trip so its version (and ETags) change
+        trip.updated_at = datetime.utcnow()
+        db.commit()
+        
+        return fast_response(response)
+        
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving regenerated itinerary: {str(e)}"
+        )
+
+
+@router.get("/{trip_id}/options", response_model=List[TripOptionResponse])
+async def get_trip_options(
+    trip_id: str,
+    request: Request,
+    response: Response,
+    view: Literal["summary", "full"] = "full",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get all options for a trip
+
+    ``view=summary`` returns everything except ``daily_itineraries``, which is
+    then never read from the database; ``fields`` selects individual fields.
+    """
+    option_fields = resolve_fields(view, fields, OPTION_FIELDS, OPTION_SUMMARY_FIELDS)
+    
+    trip_version = lookup_trip_version(db, trip_id)
+    if not trip_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found"
+        )
+    
+    etag = make_etag(trip_version, f"options:{view}:{fields or ''}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    options = db.query(TripOption).options(
+        load_only_fields(TripOption, option_fields)
+    ).filter(TripOption.trip_id == trip_id).all()
+    return with_etag(
+        fast_response(
+            options,
+            lambda option: serialize_option(option, option_fields),
+            partial=option_fields != OPTION_FIELDS
+        ),
+        response,
+        etag
+    )
+
+
+@router.patch("/{trip_id}/options/{option_id}")
+async def patch_trip_option(
+    trip_id: str,
+    option_id: str,
+    request: Request,
+    response: Response,
+    operations: List[Dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    db: Session = Depends(get_db)
+):
+    """
+    Edit an option with a JSON Patch (RFC 6902), e.g. ``/daily_itineraries/0/activities/1``
+
+    Returns the patched fields. With If-Match, the edit is rejected with 412
+    if the trip changed since that ETag was issued. Editing an option does
+    not change the trip's itinerary; patch the itinerary days for that.
+    """
+    patch = _parse_patch("option", operations)
+    patch["key"] = option_id
+    return await _patch_trip(request, response, db, trip_id, patch)
 
 
 @router.post("/{trip_id}/select-option/{option_id}")
 async def select_trip_option(trip_id: str, option_id: str, db: Session = Depends(get_db)):
     """Select a trip option and create daily itineraries"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -257,25 +669,28 @@ async def select_trip_option(trip_id: str, option_id: str, db: Session = Depends
         
         # Create daily itineraries from the selected option
         daily_itineraries_data = option.daily_itineraries or []
+        default_daily_budget = trip.total_budget / max(len(daily_itineraries_data), 1)
+        default_date = trip.start_date.isoformat()
         
         # Clear existing daily itineraries
-        db.query(DailyItinerary).filter(DailyItinerary.trip_id == trip_id).delete()
+        db.query(DailyItinerary).filter(DailyItinerary.trip_id == trip_id).delete(synchronize_session=False)
         
-        # Create new daily itineraries
-        for day_data in daily_itineraries_data:
-            itinerary_id = str(uuid.uuid4())
-            db_itinerary = DailyItinerary(
-                id=itinerary_id,
-                trip_id=trip_id,
-                day_number=day_data.get("day_number", 1),
-                date=datetime.fromisoformat(day_data.get("date", trip.start_date.isoformat())),
-                daily_budget=day_data.get("daily_budget", trip.total_budget / len(daily_itineraries_data)),
-                activities=day_data.get("activities", []),
-                meals=day_data.get("meals", []),
-                accommodation=day_data.get("accommodation", {}),
-                transport=day_data.get("transport", {})
-            )
-            db.add(db_itinerary)
+        # Create new daily itineraries with a single bulk INSERT
+        itinerary_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "trip_id": trip_id,
+                "day_number": day_data.get("day_number", 1),
+                "date": datetime.fromisoformat(day_data.get("date", default_date)),
+                "daily_budget": day_data.get("daily_budget", default_daily_budget),
+                "activities": day_data.get("activities", []),
+                "meals": day_data.get("meals", []),
+                "accommodation": day_data.get("accommodation", {}),
+                "transport": day_data.get("transport", {})
+            }
+            for day_data in daily_itineraries_data
+        ]
+        bulk_insert(db, DailyItinerary, itinerary_rows)
         
         # Update trip status
         trip.status = "planned"
@@ -294,20 +709,69 @@ async def select_trip_option(trip_id: str, option_id: str, db: Session = Depends
 
 
 @router.get("/{trip_id}/itinerary", response_model=List[DailyItineraryResponse])
-async def get_trip_itinerary(trip_id: str, db: Session = Depends(get_db)):
-    """Get daily itinerary for a trip"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
+async def get_trip_itinerary(
+    trip_id: str,
+    request: Request,
+    response: Response,
+    view: Literal["summary", "full"] = "full",
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get daily itinerary for a trip
+
+    ``view=summary`` returns the day, date and budget without the activity,
+    meal, accommodation and transport JSON; ``fields`` selects individual fields.
+    """
+    itinerary_fields = resolve_fields(view, fields, ITINERARY_FIELDS, ITINERARY_SUMMARY_FIELDS)
+    
+    trip_version = lookup_trip_version(db, trip_id)
+    if not trip_version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Trip not found"
         )
     
-    itineraries = db.query(DailyItinerary).filter(
+    etag = make_etag(trip_version, f"itinerary:{view}:{fields or ''}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    itineraries = db.query(DailyItinerary).options(
+        load_only_fields(DailyItinerary, itinerary_fields)
+    ).filter(
         DailyItinerary.trip_id == trip_id
     ).order_by(DailyItinerary.day_number).all()
     
-    return itineraries
+    return with_etag(
+        fast_response(
+            itineraries,
+            lambda itinerary: serialize_itinerary(itinerary, itinerary_fields),
+            partial=itinerary_fields != ITINERARY_FIELDS
+        ),
+        response,
+        etag
+    )
+
+
+@router.patch("/{trip_id}/itinerary/{day_number}")
+async def patch_itinerary_day(
+    trip_id: str,
+    day_number: int,
+    request: Request,
+    response: Response,
+    operations: List[Dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    db: Session = Depends(get_db)
+):
+    """
+    Edit one day of the itinerary with a JSON Patch (RFC 6902), e.g. ``/activities/2/time``
+
+    Returns the patched fields. With If-Match, the edit is rejected with 412
+    if the trip changed since that ETag was issued; edits arriving together
+    (autosave) are written in one transaction.
+    """
+    patch = _parse_patch("itinerary", operations)
+    patch["key"] = day_number
+    return await _patch_trip(request, response, db, trip_id, patch)
 
 
 @router.post("/{trip_id}/recommendations")
@@ -316,7 +780,7 @@ async def get_travel_recommendations(
     db: Session = Depends(get_db)
 ):
     """Get travel recommendations for a trip destination"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -347,7 +811,7 @@ async def search_places(
     db: Session = Depends(get_db)
 ):
     """Search for places near the trip destination"""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = _active_trips(db).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
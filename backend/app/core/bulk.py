@@ -0,0 +1,45 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Type
+
+
+def supports_bulk_returning(db: Session) -> bool:
+    """Check whether the bound dialect can RETURNING rows from a multi-row INSERT"""
+    return bool(db.get_bind().dialect.insert_executemany_returning)
+
+
+def bulk_insert(db: Session, model: Type[Any], rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert many rows in a single executemany-style statement.
+
+    SQLAlchemy batches the parameter sets into multi-row INSERTs
+    ("insertmanyvalues"), so the number of round trips does not grow
+    with the number of rows.
+    """
+    if not rows:
+        return
+    db.execute(insert(model), rows)
+
+
+def bulk_insert_returning(db: Session, model: Type[Any], rows: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Insert many rows and return the persisted ORM objects in input order.
+
+    Uses INSERT ... RETURNING where the database supports it (SQLite 3.35+,
+    MariaDB, PostgreSQL). Otherwise the rows are inserted in one batch and
+    read back with a single SELECT on their primary keys, so both paths
+    take a constant number of round trips. Rows must carry their own ``id``.
+
+    Batched RETURNING rows only come back in parameter order when asked for
+    (``sort_by_parameter_order``); the SELECT fallback is reordered by ``id``.
+    """
+    if not rows:
+        return []
+
+    if supports_bulk_returning(db):
+        return list(db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows).all())
+
+    bulk_insert(db, model, rows)
+    ids = [row["id"] for row in rows]
+    by_id = {obj.id: obj for obj in db.scalars(select(model).where(model.id.in_(ids)))}
+    return [by_id[row_id] for row_id in ids]
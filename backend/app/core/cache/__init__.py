@@ -0,0 +1 @@
+# Cache backends and the shared application cache
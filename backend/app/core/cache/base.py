@@ -0,0 +1,57 @@
+from typing import Optional
+
+
+class CacheBackend:
+    """
+    Byte-level key/value store with expiry.
+
+    Backends only store bytes under string keys; serialization,
+    namespacing and stampede protection live in ``Cache``. Methods are
+    async so network backends do not block the event loop.
+    """
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Set only if the key is absent; True if it was set (used for locks)"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self, prefix: str = "") -> None:
+        """Remove every key starting with ``prefix``"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullBackend(CacheBackend):
+    """Stores nothing (CACHE_BACKEND=none)"""
+
+    name = "none"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        pass
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return True
+
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def clear(self, prefix: str = "") -> None:
+        pass
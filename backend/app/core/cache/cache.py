@@ -0,0 +1,282 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import contextvars
+import hashlib
+import logging
+import time
+
+import orjson
+
+from ..config import settings
+from ..metrics import metrics
+from ..timing import timed
+from .base import CacheBackend, NullBackend
+from .memory import MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 200
+
+
+def make_key(*parts: Any) -> str:
+    """Build a cache key from parts; long keys (e.g. prompts) are replaced by their hash"""
+    key = ":".join(str(part) for part in parts)
+    if len(key) > MAX_KEY_LENGTH:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    return key
+
+
+class CacheNamespace:
+    """
+    One kind of cached data (geocodes, places, ...) with its own key
+    prefix, default TTL and statistics.
+
+    Values are stored as JSON (orjson), so tuples come back as lists.
+    Backend errors are logged and counted, then treated as misses: the
+    cache never fails a request.
+    """
+
+    def __init__(self, cache: "Cache", name: str, ttl: Optional[float] = None):
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl
+        self.prefix = f"{cache.prefix}:{name}:"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _count(self, event: str) -> None:
+        metrics.increment(f"cache.{self.name}.{event}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            with timed("cache"):
+                data = await self.cache.backend.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache get failed ({self.name}): {e}")
+            self._count("errors")
+            return None
+        self._count("hits" if data is not None else "misses")
+        return orjson.loads(data) if data is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            with timed("cache"):
+                await self.cache.backend.set(self.prefix + key, orjson.dumps(value), ttl or self.ttl)
+            self._count("sets")
+        except Exception as e:
+            logger.warning(f"Cache set failed ({self.name}): {e}")
+            self._count("errors")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.cache.backend.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed ({self.name}): {e}")
+            self._count("errors")
+
+    async def clear(self) -> None:
+        await self.cache.backend.clear(self.prefix)
+
+    async def _wait_for_other_worker(self, key: str) -> Optional[Any]:
+        """Poll for a value another process is computing, up to the lock wait"""
+        deadline = time.monotonic() + self.cache.lock_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            value = await self.get(key)
+            if value is not None:
+                return value
+        return None
+
+    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                         should_cache: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Return the cached value, or compute it once with ``factory`` and store it.
+
+        Concurrent misses for the same key in this process wait for the
+        first caller's result instead of calling ``factory`` again. On a
+        shared backend a short-lived lock key does the same across
+        processes. Values rejected by ``should_cache`` (e.g. fallbacks)
+        are returned but not stored.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        return await self._compute(key, factory, ttl, should_cache)
+
+    async def _compute(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float],
+                       should_cache: Callable[[Any], bool]) -> Any:
+        """The miss path of get_or_set: one factory call per key at a time"""
+        value = None
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The caller computing the value was cancelled, not us: take over
+                return await self._compute(key, factory, ttl, should_cache)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        lock_key = f"{self.prefix}{key}:lock"
+        locked = False
+        try:
+            if self.cache.shared:
+                try:
+                    locked = await self.cache.backend.add(lock_key, b"1", self.cache.lock_wait_seconds * 2)
+                except Exception as e:
+                    logger.warning(f"Cache lock failed ({self.name}): {e}")
+                if not locked:
+                    self._count("lock_waits")
+                    value = await self._wait_for_other_worker(key)
+
+            if value is None:
+                value = await factory()
+                if should_cache(value):
+                    await self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so a failure nobody waited for is not logged
+            raise
+        finally:
+            del self._inflight[key]
+            if locked:
+                await self.delete(lock_key)
+
+    async def get_or_revalidate(self, key: str, factory: Callable[[], Awaitable[Any]], fresh_seconds: float,
+                                ttl: Optional[float] = None,
+                                should_cache: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Stale-while-revalidate lookup.
+
+        A cached value is returned at once; if it is older than
+        ``fresh_seconds`` a background refresh replaces it for later
+        callers. Only a miss waits for ``factory``. Values are stored with
+        their age, so use this or ``get_or_set`` for a namespace, not both.
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            if time.time() - entry["stored_at"] > fresh_seconds:
+                self._count("stale")
+                self.revalidate(key, factory, ttl, should_cache)
+            return entry["value"]
+
+        entry = await self._compute(
+            key, lambda: self._stamped(factory), ttl, lambda entry: should_cache(entry["value"])
+        )
+        return entry["value"]
+
+    @staticmethod
+    async def _stamped(factory: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        return {"value": await factory(), "stored_at": time.time()}
+
+    async def age(self, key: str) -> Optional[float]:
+        """Seconds since a stale-while-revalidate entry was stored, or None if absent"""
+        entry = await self.get(key)
+        return time.time() - entry["stored_at"] if entry is not None else None
+
+    async def refresh(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                      should_cache: Callable[[Any], bool] = lambda value: value is not None) -> bool:
+        """
+        Recompute a stale-while-revalidate entry now; True if a new value was stored.
+
+        Failures are logged and leave the old entry in place. On a shared
+        backend the refresh is skipped while another process holds the key.
+        """
+        lock_key = f"{self.prefix}{key}:lock"
+        try:
+            if self.cache.shared and not await self.cache.backend.add(lock_key, b"1", self.cache.lock_wait_seconds * 2):
+                return False
+            try:
+                entry = await self._stamped(factory)
+                if not should_cache(entry["value"]):
+                    return False
+                await self.set(key, entry, ttl)
+                self._count("refreshes")
+                return True
+            finally:
+                if self.cache.shared:
+                    await self.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Cache refresh failed ({self.name}): {e}")
+            self._count("errors")
+            return False
+
+    def revalidate(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+                   should_cache: Callable[[Any], bool] = lambda value: value is not None) -> None:
+        """Refresh an entry in the background, at most once at a time per key"""
+        if key in self._refreshing:
+            return
+        # A fresh context, so the refresh is not bound by the triggering request's deadline
+        task = asyncio.get_running_loop().create_task(
+            self.refresh(key, factory, ttl, should_cache), context=contextvars.Context()
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {
+            event: metrics.counter(f"cache.{self.name}.{event}")
+            for event in ("hits", "misses", "sets", "errors", "coalesced", "lock_waits", "stale", "refreshes")
+        }
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else 0.0
+        return counts
+
+
+class Cache:
+    """The shared cache: one backend, split into namespaces"""
+
+    def __init__(self, backend: CacheBackend, prefix: str = "tripplanner", lock_wait_seconds: float = 5.0):
+        self.backend = backend
+        self.prefix = prefix
+        self.lock_wait_seconds = lock_wait_seconds
+        self.namespaces: Dict[str, CacheNamespace] = {}
+
+    @property
+    def shared(self) -> bool:
+        """Whether other processes see this cache (so cross-process locking is worth it)"""
+        return not isinstance(self.backend, (MemoryBackend, NullBackend))
+
+    def namespace(self, name: str, ttl: Optional[float] = None) -> CacheNamespace:
+        if name not in self.namespaces:
+            self.namespaces[name] = CacheNamespace(self, name, ttl)
+        return self.namespaces[name]
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            backend = self.backend.stats()
+        except Exception:
+            backend = {}
+        return {
+            "backend": self.backend.name,
+            **backend,
+            "namespaces": {name: namespace.stats() for name, namespace in self.namespaces.items()},
+        }
+
+
+def create_backend(kind: str, url: str = "") -> CacheBackend:
+    """Build the backend named by CACHE_BACKEND"""
+    if kind == "memory":
+        return MemoryBackend(max_entries=settings.cache_max_entries, max_bytes=settings.cache_max_bytes)
+    if kind == "sqlite":
+        from .sqlite import SQLiteBackend
+        return SQLiteBackend(url or "cache.db")
+    if kind == "resp":
+        from .resp import RESPBackend
+        return RESPBackend(url or "redis://localhost:6379/0")
+    if kind == "none":
+        return NullBackend()
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# Create the shared cache
+cache = Cache(create_backend(settings.cache_backend, settings.cache_url), prefix=settings.cache_key_prefix)
+metrics.register_gauge("cache", cache.stats)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+import time
+
+from .base import CacheBackend
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU cache with per-key TTL.
+
+    Evicts least recently used entries once either ``max_entries`` or
+    ``max_bytes`` (the total size of stored values) is exceeded. Expired
+    entries are dropped when read or when they reach the LRU end. All
+    operations are synchronous under the hood, so they are atomic on the
+    event loop.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        return value
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._live(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    async def clear(self, prefix: str = "") -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._remove(key)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import asyncio
+
+from .base import CacheBackend
+
+
+class RESPError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply (simple string, error, integer, bulk string or array)"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RESPError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        if count == -1:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RESPError(f"Unexpected reply: {line!r}")
+
+
+class RESPBackend(CacheBackend):
+    """
+    Cache in any Redis-protocol server (Redis, Valkey, KeyDB, or the
+    stand-in in ``resp_server``), shared by all worker processes.
+
+    Speaks RESP directly over asyncio streams, so no client library is
+    needed. Connections are pooled per event loop (up to ``pool_size``)
+    and a connection that fails or times out is discarded.
+    """
+
+    name = "resp"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", pool_size: int = 10, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pools: Dict[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, List]] = {}
+
+    def _pool(self):
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            for stale in [other for other in self._pools if other.is_closed()]:
+                del self._pools[stale]
+            pool = self._pools[loop] = (asyncio.Semaphore(self.pool_size), [])
+        return pool
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+            await read_reply(reader)
+        if self.db:
+            writer.write(encode_command("SELECT", self.db))
+            await read_reply(reader)
+        return reader, writer
+
+    async def execute(self, *args) -> Any:
+        """Send one command and return its reply"""
+        semaphore, idle = self._pool()
+        async with semaphore:
+            connection = idle.pop() if idle else None
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                reader, writer = connection
+                writer.write(encode_command(*args))
+                reply = await asyncio.wait_for(read_reply(reader), self.timeout)
+            except RESPError:
+                idle.append(connection)
+                raise
+            except BaseException:
+                if connection is not None:
+                    connection[1].close()
+                raise
+            idle.append(connection)
+            return reply
+
+    @staticmethod
+    def _ttl_args(ttl: Optional[float]) -> list:
+        return ["PX", max(1, int(ttl * 1000))] if ttl else []
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self.execute("SET", key, value, *self._ttl_args(ttl))
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return await self.execute("SET", key, value, "NX", *self._ttl_args(ttl)) == "OK"
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", key)
+
+    async def clear(self, prefix: str = "") -> None:
+        cursor = b"0"
+        while True:
+            cursor, keys = await self.execute("SCAN", cursor, "MATCH", prefix + "*", "COUNT", 500)
+            if keys:
+                await self.execute("DEL", *keys)
+            if cursor in (b"0", 0, "0"):
+                return
+
+    async def close(self) -> None:
+        for _, idle in self._pools.values():
+            for _, writer in idle:
+                writer.close()
+            idle.clear()
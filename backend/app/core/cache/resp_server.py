@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Minimal Redis-protocol server for local development and tests.
+
+Implements the commands the RESP cache backend uses (PING, GET, SET with
+EX/PX/NX, DEL, SCAN, SELECT, AUTH, FLUSHDB, DBSIZE) over an in-memory
+dict, so CACHE_BACKEND=resp can be tried without installing Redis:
+
+    python -m app.core.cache.resp_server --port 6379
+"""
+
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import asyncio
+import threading
+import time
+
+from .resp import read_reply
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+
+
+class RESPStandIn:
+    """In-memory keyspace answering RESP commands"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0]
+
+    def handle(self, args) -> Any:
+        command = args[0].upper()
+        if command in (b"PING", b"SELECT", b"AUTH"):
+            return "PONG" if command == b"PING" else "OK"
+        if command == b"GET":
+            return self._live(args[1])
+        if command == b"SET":
+            key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+            if b"NX" in options and self._live(key) is not None:
+                return None
+            self.data[key] = (value, expires_at)
+            return "OK"
+        if command == b"DEL":
+            deleted = 0
+            for key in args[1:]:
+                if self._live(key) is not None:
+                    del self.data[key]
+                    deleted += 1
+            return deleted
+        if command == b"SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [key for key in list(self.data) if fnmatchcase(key.decode(), pattern) and self._live(key)]
+            return [b"0", keys]
+        if command == b"FLUSHDB":
+            self.data.clear()
+            return "OK"
+        if command == b"DBSIZE":
+            return len(self.data)
+        return RuntimeError(f"unknown command '{command.decode()}'")
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    args = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    return
+                writer.write(_encode(self.handle(args)))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+class RESPServerThread:
+    """Run the stand-in server on a background thread (``with RESPServerThread() as url``)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.stand_in = RESPStandIn()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self) -> str:
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self.stand_in.serve_client, self.host, self.port), self._loop
+        )
+        self._thread.start()
+        self._server = server.result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"redis://{self.host}:{self.port}/0"
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _shutdown(self) -> None:
+        """Stop listening and drop the connections still open"""
+        self._server.close()
+        clients = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+async def serve(host: str, port: int) -> None:
+    stand_in = RESPStandIn()
+    server = await asyncio.start_server(stand_in.serve_client, host, port)
+    print(f"🚀 RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal Redis-protocol server for development")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from typing import Optional
+import asyncio
+import sqlite3
+import threading
+import time
+
+from .base import CacheBackend
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Disk-backed cache in a SQLite file, so entries survive restarts.
+
+    Uses WAL mode so several worker processes can share one file. Queries
+    run in a worker thread; expired rows are ignored on read and deleted
+    in bulk every ``prune_every`` writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "cache.db", prune_every: int = 1000):
+        self.path = path
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)"
+        )
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _expiry(ttl: Optional[float]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def _get(self, key: str) -> Optional[bytes]:
+        rows = self._execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        )
+        return rows[0][0] if rows else None
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, self._expiry(ttl))
+        )
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self._execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def _add(self, key: str, value: bytes, ttl: Optional[float]) -> bool:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, time.time())
+                )
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, self._expiry(ttl))
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return await asyncio.to_thread(self._add, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    async def clear(self, prefix: str = "") -> None:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM cache_entries WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",)
+        )
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> dict:
+        return {"entries": self._execute("SELECT COUNT(*) FROM cache_entries")[0][0]}
@@ -0,0 +1,162 @@
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from .config import settings
+from .deadline import DeadlineExceeded, cap_timeout, mark_degraded
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Every breaker, by name, for /health
+circuit_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream service is erroring or slow.
+
+    The outcome of the last ``window_size`` calls is kept; errors,
+    timeouts and calls slower than ``slow_call_seconds`` count as
+    failures. Once at least ``minimum_calls`` are recorded and the failure
+    rate reaches ``failure_rate_threshold`` the circuit opens and calls
+    raise ``CircuitOpenError`` immediately. After ``open_seconds`` one
+    probe call is let through (half-open): success closes the circuit,
+    failure opens it again.
+
+    Calls run the blocking SDK function in a worker thread so a slow
+    upstream never blocks the event loop, with the timeout capped to the
+    request's remaining deadline. Running out of request time is not held
+    against the upstream.
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, minimum_calls: int = 5,
+                 window_size: int = 20, open_seconds: float = 30, slow_call_seconds: float = 10,
+                 timeout_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.timeout_seconds = timeout_seconds
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit {self.name} {self.state} -> {state}")
+        self.state = state
+        metrics.increment(f"circuit.{self.name}.{state}")
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (claims the probe when half-open)"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, ok: bool, duration: float) -> None:
+        """Record a call outcome; slow successes count as failures"""
+        ok = ok and duration < self.slow_call_seconds
+        metrics.increment(f"circuit.{self.name}.{'successes' if ok else 'failures'}")
+
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._transition(CLOSED if ok else OPEN)
+            return
+
+        self._outcomes.append(ok)
+        if (self.state == CLOSED and len(self._outcomes) >= self.minimum_calls
+                and self.failure_rate >= self.failure_rate_threshold):
+            self._transition(OPEN)
+
+    async def call(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking call in a thread through the breaker"""
+        configured = timeout if timeout is not None else self.timeout_seconds
+        try:
+            timeout = cap_timeout(configured)
+        except DeadlineExceeded:
+            metrics.increment(f"circuit.{self.name}.deadline_skipped")
+            mark_degraded(self.name)
+            raise
+
+        if not self.allow():
+            metrics.increment(f"circuit.{self.name}.rejected")
+            mark_degraded(self.name)
+            raise CircuitOpenError(f"Circuit {self.name} is open")
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(func, *args, **kwargs), timeout)
+        except asyncio.CancelledError:
+            # The caller gave up; that says nothing about the upstream's health
+            self._probe_in_flight = False
+            raise
+        except asyncio.TimeoutError:
+            mark_degraded(self.name)
+            if configured is not None and timeout >= configured:
+                self.record(False, time.perf_counter() - start)
+                raise
+            # Cut short by the request deadline, not by the upstream's own timeout
+            self._probe_in_flight = False
+            metrics.increment(f"circuit.{self.name}.deadline_exceeded")
+            raise DeadlineExceeded(f"Request deadline reached during {self.name} call")
+        except Exception:
+            mark_degraded(self.name)
+            self.record(False, time.perf_counter() - start)
+            raise
+        duration = time.perf_counter() - start
+        metrics.observe(f"upstream.{self.name}.latency_ms", duration * 1000)
+        self.record(True, duration)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "failure_rate": round(self.failure_rate, 3), "calls": len(self._outcomes)}
+
+
+def breaker_for(name: str, timeout_seconds: float, slow_call_seconds: float) -> CircuitBreaker:
+    """Create a service breaker with the shared thresholds from settings, exposed in /health and /metrics"""
+    breaker = CircuitBreaker(
+        name,
+        failure_rate_threshold=settings.circuit_failure_rate_threshold,
+        minimum_calls=settings.circuit_minimum_calls,
+        window_size=settings.circuit_window_size,
+        open_seconds=settings.circuit_open_seconds,
+        slow_call_seconds=slow_call_seconds,
+        timeout_seconds=timeout_seconds,
+    )
+    circuit_breakers[name] = breaker
+    metrics.register_gauge(f"circuit.{name}.state", lambda: _STATE_CODES[breaker.state])
+    metrics.register_gauge(f"circuit.{name}.failure_rate", lambda: round(breaker.failure_rate, 3))
+    return breaker
@@ -0,0 +1,115 @@
+from typing import Any, Callable, Dict, Hashable, List
+import asyncio
+import logging
+
+from .config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Result handed to a waiting request that has to take over flushing its batch
+_LEAD = object()
+
+
+class _Entry:
+    def __init__(self, payload: Any, apply: Callable[[List[Any]], List[Any]]):
+        self.payload = payload
+        self.apply = apply
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class WriteCoalescer:
+    """
+    Batches writes to the same key that arrive within a short window.
+
+    The first request for a key waits ``window_seconds``, then calls its
+    ``apply`` in a worker thread with the payloads of every request that
+    joined the batch meanwhile (in arrival order) and hands each request
+    its own result; a result that is an exception is raised in that
+    request only. ``apply`` runs once per batch, so a burst of autosave
+    edits costs one transaction. If the request leading a batch goes away
+    before the flush, the next waiting request takes over with its own
+    ``apply``; once the batch is being applied, it completes for the
+    others regardless.
+
+    Batching is per process; writes from other workers are not merged.
+    """
+
+    def __init__(self, window_seconds: float = 0.2):
+        self.window_seconds = window_seconds
+        self._pending: Dict[Hashable, List[_Entry]] = {}
+
+    async def submit(self, key: Hashable, payload: Any, apply: Callable[[List[Any]], List[Any]]) -> Any:
+        entry = _Entry(payload, apply)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = [entry]
+            return await self._lead(key, batch, entry, self.window_seconds)
+
+        batch.append(entry)
+        try:
+            result = await entry.future
+        except asyncio.CancelledError:
+            if not entry.future.done() or entry.future.result() is _LEAD:
+                self._abandon(key, batch, entry)
+            raise
+        if result is _LEAD:
+            return await self._lead(key, batch, entry, 0)
+        return result
+
+    async def _lead(self, key: Hashable, batch: List[_Entry], entry: _Entry, delay: float) -> Any:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self._abandon(key, batch, entry)
+            raise
+
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        metrics.increment("coalesce.batches")
+        metrics.increment("coalesce.writes", len(batch))
+        work = asyncio.ensure_future(self._apply(entry, [item.payload for item in batch]))
+        try:
+            results = await asyncio.shield(work)
+        except asyncio.CancelledError:
+            work.add_done_callback(lambda done: self._settle(batch, entry, done.result()))
+            raise
+        self._settle(batch, entry, results)
+
+        result = results[batch.index(entry)]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    @staticmethod
+    async def _apply(entry: _Entry, payloads: List[Any]) -> List[Any]:
+        try:
+            return await asyncio.to_thread(entry.apply, payloads)
+        except Exception as e:
+            return [e] * len(payloads)
+
+    @staticmethod
+    def _settle(batch: List[_Entry], entry: _Entry, results: List[Any]) -> None:
+        """Hand every other request in the batch its result"""
+        for item, result in zip(batch, results):
+            if item is entry or item.future.done():
+                continue
+            if isinstance(result, BaseException):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+    def _abandon(self, key: Hashable, batch: List[_Entry], entry: _Entry) -> None:
+        """Drop a request that went away before its batch was flushed"""
+        leading = batch[0] is entry
+        batch.remove(entry)
+        if not leading:
+            return
+        if batch:
+            batch[0].future.set_result(_LEAD)
+        elif self._pending.get(key) is batch:
+            del self._pending[key]
+
+
+# Create write coalescer instance
+write_coalescer = WriteCoalescer(window_seconds=settings.patch_coalesce_seconds)
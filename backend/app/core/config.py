@@ -14,6 +14,28 @@ class Settings(BaseSettings):
     # Database - Must be provided in .env file
     database_url: str
     
+    # Create missing tables when the app starts (disable when migrations manage the schema)
+    create_tables_on_startup: bool = True
+    
+    # Connection pool (applies to the primary and every replica)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 300
+    db_pool_pre_ping: str = "idle"  # always, idle or never
+    db_pool_pre_ping_idle_seconds: float = 30.0
+    db_slow_checkout_ms: float = 100.0
+    
+    # Read replicas (optional, comma-separated URLs)
+    database_replica_urls: str = ""
+    replica_health_check_interval: float = 30.0
+    replica_read_your_writes_seconds: float = 5.0
+    
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """Convert comma-separated replica URLs to list"""
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+    
     # Security - Must be provided in .env file
     secret_key: str
     algorithm: str = "HS256"
@@ -24,6 +46,106 @@ class Settings(BaseSettings):
     google_maps_api_key: Optional[str] = None
     google_cloud_project_id: Optional[str] = None
     
+    # Request deadlines (X-Request-Timeout header or per-route defaults)
+    request_deadline_seconds: float = 30.0
+    request_deadline_max_seconds: float = 120.0
+    upstream_min_call_seconds: float = 0.5  # skip upstream calls with less time than this left
+    
+    # Server-Timing header with time per category (db, gemini, maps, ...); requests
+    # at least this slow are logged with the breakdown (0 logs every request)
+    server_timing_enabled: bool = True
+    request_timing_log_ms: float = 1000.0
+    
+    # Slow request profiling, off unless PROFILE_DIR is set: "stack" dumps the stacks
+    # of requests still running after PROFILE_SLOW_MS, "cprofile" profiles a sample
+    # of requests and keeps the slow ones
+    profile_dir: str = ""
+    profile_mode: str = "stack"
+    profile_slow_ms: float = 2000.0
+    profile_sample_rate: float = 0.05
+    profile_max_files: int = 200
+    
+    # Request tracing (router, services, SQL statements), exported as OTLP/JSON to
+    # TRACING_FILE ("file") or POSTed to an OTLP/HTTP collector ("otlp"); requests
+    # with a sampled W3C traceparent are always traced
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 1.0
+    tracing_exporter: str = "file"
+    tracing_file: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_service_name: str = "trip-planner-api"
+    
+    # Gemini model routing: a fast default, a stronger model for large trips,
+    # optional per-method overrides ("method=model,..."), adapted to observed
+    # parse failures and latency
+    gemini_model: str = "gemini-1.5-flash"
+    gemini_strong_model: str = "gemini-1.5-pro"
+    gemini_method_models: str = ""
+    gemini_strong_min_days: int = 7
+    gemini_strong_min_themes: int = 3
+    gemini_router_failure_threshold: float = 0.3
+    gemini_router_max_latency_seconds: float = 20.0
+    
+    # Upstream calls: timeouts, slow-call thresholds and circuit breakers
+    gemini_timeout_seconds: float = 30.0
+    gemini_slow_call_seconds: float = 20.0
+    maps_timeout_seconds: float = 10.0
+    maps_slow_call_seconds: float = 5.0
+    circuit_failure_rate_threshold: float = 0.5
+    circuit_minimum_calls: int = 5
+    circuit_window_size: int = 20
+    circuit_open_seconds: float = 30.0
+    
+    # Hedged Gemini calls: re-send calls slower than the learned percentile, within a budget
+    gemini_hedging_enabled: bool = False
+    gemini_hedge_percentile: float = 90.0
+    gemini_hedge_min_samples: int = 20
+    gemini_hedge_budget_ratio: float = 0.1  # at most this many extra calls per call
+    
+    # Cache for upstream results: memory (per process), sqlite (file at CACHE_URL),
+    # resp (Redis-protocol server at CACHE_URL) or none
+    cache_backend: str = "memory"
+    cache_url: str = ""
+    cache_key_prefix: str = "tripplanner"
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_ttl_geocode_seconds: float = 30 * 86400
+    cache_ttl_places_seconds: float = 86400
+    cache_ttl_directions_seconds: float = 86400
+    cache_ttl_recommendations_seconds: float = 30 * 86400  # how long stale recommendations may be served
+    cache_ttl_generated_seconds: float = 6 * 3600  # AI trip options and daily itineraries
+    
+    # Reuse trip options generated for a similar request (same duration, similar
+    # destination, themes, requirements and budget), re-dated and rescaled
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_max_entries: int = 5000
+    semantic_cache_max_budget_ratio: float = 1.5
+    
+    # Recommendations older than this are refreshed in the background; the most
+    # common destination/interest combinations can be kept fresh ahead of requests
+    # (each worker warms on its own, so only worth it with a shared cache backend)
+    recommendations_fresh_seconds: float = 86400
+    recommendations_warm_enabled: bool = False
+    recommendations_warm_top: int = 50
+    recommendations_warm_interval_seconds: float = 3600
+    recommendations_warm_per_minute: float = 10  # Gemini calls per worker
+    
+    # JSON Patch edits to one trip arriving within this window (e.g. autosave)
+    # are applied together in one transaction; 0 applies each on its own
+    patch_coalesce_seconds: float = 0.2
+    
+    # Background purge of soft-deleted trips
+    trip_purge_enabled: bool = True
+    trip_purge_batch_size: int = 500
+    trip_purge_interval_seconds: float = 60.0
+    
+    # JSON column storage: "zlib" (stdlib) or "zstd" (requires zstandard)
+    json_column_compression: str = "zlib"
+    
+    # Serialize trusted ORM responses with orjson, skipping response_model revalidation
+    fast_json_responses: bool = True
+    
     # CORS
     allowed_origins: str = "http://localhost:3000,http://127.0.0.1:3000,http://localhost:3001"
     
@@ -32,8 +154,19 @@ class Settings(BaseSettings):
         """Convert comma-separated origins to list"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
-    # Rate Limiting
+    # Rate Limiting (per client; AI/Maps routes have their own, smaller budget)
+    rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
+    rate_limit_expensive_per_minute: int = 10
+    rate_limit_backend_url: str = ""  # e.g. redis://localhost:6379/0 to share limits across workers
+    # Known X-API-Key values (comma-separated) that get a bucket of their own;
+    # any other request is limited by its IP address
+    rate_limit_api_keys: str = ""
+    
+    @property
+    def rate_limit_api_keys_list(self) -> List[str]:
+        """Convert comma-separated API keys to list"""
+        return [key.strip() for key in self.rate_limit_api_keys.split(",") if key.strip()]
     
     # API Configuration
     api_v1_prefix: str = "/api/v1"
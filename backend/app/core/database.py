@@ -1,24 +1,71 @@
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Dict, Iterable, List, Optional
+import itertools
+import logging
+import threading
+import time
 from .config import settings
+from .pool import InstrumentedQueuePool, instrument_pool, install_idle_pre_ping
+from .timing import instrument_engine
+from .tracing import trace_engine
 
-# Create database engine with appropriate connection args
-connect_args = {}
-if "sqlite" in settings.database_url:
-    connect_args = {"check_same_thread": False}
-elif "mysql" in settings.database_url:
-    connect_args = {
-        "charset": "utf8mb4",
-        "autocommit": False
-    }
-
-engine = create_engine(
-    settings.database_url,
-    connect_args=connect_args,
-    pool_pre_ping=True,  # Verify connections before use
-    pool_recycle=300,    # Recycle connections every 5 minutes
-)
+logger = logging.getLogger(__name__)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces ON DELETE CASCADE when foreign keys are switched on"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_engine(database_url: str, name: str = "primary"):
+    """Create a database engine with appropriate connection args and pool settings"""
+    if settings.db_pool_pre_ping not in ("always", "idle", "never"):
+        raise ValueError(f"Unknown pool pre-ping mode: {settings.db_pool_pre_ping}")
+    connect_args = {}
+    if "sqlite" in database_url:
+        connect_args = {"check_same_thread": False}
+    elif "mysql" in database_url:
+        connect_args = {
+            "charset": "utf8mb4",
+            "autocommit": False
+        }
+
+    pool_args = {}
+    if database_url != "sqlite://" and ":memory:" not in database_url:
+        # In-memory SQLite needs its default single-connection pool
+        pool_args = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        }
+
+    db_engine = create_engine(
+        database_url,
+        connect_args=connect_args,
+        pool_pre_ping=settings.db_pool_pre_ping == "always",  # Verify connections before every use
+        pool_recycle=settings.db_pool_recycle,                # Recycle connections periodically
+        **pool_args
+    )
+
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", _enable_sqlite_foreign_keys)
+    instrument_pool(db_engine, name, settings.db_slow_checkout_ms)
+    instrument_engine(db_engine)
+    trace_engine(db_engine)
+    if settings.db_pool_pre_ping == "idle":
+        install_idle_pre_ping(db_engine, settings.db_pool_pre_ping_idle_seconds)
+    return db_engine
+
+
+# Create primary database engine
+engine = _create_engine(settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,10 +74,148 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session"""
+class ReplicaRouter:
+    """
+    Routes read-only sessions to replica engines.
+
+    Replicas are picked round-robin. A replica that fails a health check
+    (or a query) is skipped for ``health_check_interval`` seconds, and
+    healthy replicas are re-probed with ``SELECT 1`` at the same interval.
+    Keys written recently (a trip id or a client) are pinned to the
+    primary for ``read_your_writes_seconds`` so callers always see their
+    own mutations despite replication lag.
+    """
+
+    def __init__(self, replica_urls: List[str], health_check_interval: float = 30,
+                 read_your_writes_seconds: float = 5):
+        self.engines = [
+            _create_engine(url, name=f"replica{index}") for index, url in enumerate(replica_urls)
+        ]
+        self.sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+            for replica_engine in self.engines
+        ]
+        self.health_check_interval = health_check_interval
+        self.read_your_writes_seconds = read_your_writes_seconds
+
+        self._counter = itertools.count()
+        self._down_until = [0.0] * len(self.engines)
+        self._last_checked = [0.0] * len(self.engines)
+        self._pinned_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def record_write(self, keys: Iterable[str]) -> None:
+        """Pin keys to the primary for the read-your-writes window"""
+        now = time.monotonic()
+        expires = now + self.read_your_writes_seconds
+        with self._lock:
+            for key in keys:
+                self._pinned_until[key] = expires
+            if len(self._pinned_until) > 10000:
+                self._pinned_until = {k: v for k, v in self._pinned_until.items() if v > now}
+
+    def is_pinned(self, keys: Iterable[str]) -> bool:
+        """Check whether any key was written within the read-your-writes window"""
+        now = time.monotonic()
+        return any(self._pinned_until.get(key, 0) > now for key in keys)
+
+    def pick(self, keys: Iterable[str] = ()) -> Optional[int]:
+        """Return the index of the next healthy replica, or None to use the primary"""
+        if not self.engines or self.is_pinned(keys):
+            return None
+
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = next(self._counter) % len(self.engines)
+            if self._down_until[index] > now:
+                continue
+            if self._last_checked[index] + self.health_check_interval <= now and not self.check_health(index):
+                continue
+            return index
+        return None
+
+    def check_health(self, index: int) -> bool:
+        """Probe a replica with SELECT 1 and update its health state"""
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            self.mark_unhealthy(index, e)
+            return False
+        self._last_checked[index] = time.monotonic()
+        return True
+
+    def mark_unhealthy(self, index: int, error: Optional[Exception] = None) -> None:
+        """Take a replica out of rotation until the next health check"""
+        logger.warning(f"Database replica {index} marked unhealthy: {error}")
+        self._down_until[index] = time.monotonic() + self.health_check_interval
+
+    def session(self, index: int) -> Session:
+        return self.sessionmakers[index]()
+
+
+replica_router = ReplicaRouter(
+    settings.database_replica_urls_list,
+    health_check_interval=settings.replica_health_check_interval,
+    read_your_writes_seconds=settings.replica_read_your_writes_seconds,
+)
+
+
+def _read_your_writes_keys(request: Request) -> List[str]:
+    """Keys identifying what a request touches: its trip and its client"""
+    keys = []
+    trip_id = request.path_params.get("trip_id")
+    if trip_id:
+        keys.append(f"trip:{trip_id}")
+    if request.client:
+        keys.append(f"client:{request.client.host}")
+    return keys
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_committed_keys(session):
+    keys = session.info.get("read_your_writes_keys")
+    if keys and replica_router.enabled:
+        replica_router.record_write(keys)
+
+
+def get_db(request: Request = None):
+    """
+    Dependency to get database session
+
+    Also usable outside a request (``next(get_db())`` in scripts and
+    background tasks); read-your-writes pinning only applies to requests.
+    """
     db = SessionLocal()
+    if replica_router.enabled and request is not None:
+        db.info["read_your_writes_keys"] = _read_your_writes_keys(request)
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency to get a read-only database session.
+
+    Uses a replica when one is configured and healthy, otherwise the
+    primary session from ``get_db`` (which only connects when used).
+    """
+    index = replica_router.pick(_read_your_writes_keys(request)) if replica_router.enabled else None
+    if index is None:
+        yield db
+        return
+
+    replica_db = replica_router.session(index)
+    try:
+        yield replica_db
+    except OperationalError as e:
+        replica_router.mark_unhealthy(index, e)
+        raise
+    finally:
+        replica_db.close()
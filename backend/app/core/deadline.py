@@ -0,0 +1,130 @@
+from contextvars import ContextVar
+from typing import List, Optional
+import re
+import time
+
+from .config import settings
+
+# Per-route time budgets (seconds); other routes get REQUEST_DEADLINE_SECONDS
+ROUTE_DEADLINES = (
+    (re.compile(r"/trips/[^/]+/generate-options$"), 45.0),
+    (re.compile(r"/trips/[^/]+/options/[^/]+/regenerate$"), 45.0),
+    (re.compile(r"/trips/[^/]+/recommendations$"), 20.0),
+    (re.compile(r"/trips/[^/]+/places/search$"), 10.0),
+)
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting upstream work the request no longer has time for"""
+
+
+class Deadline:
+    """The time budget of one request, and the upstreams it had to do without"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self.degraded: List[str] = []
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None outside a request"""
+    deadline = _current.get()
+    return deadline.remaining() if deadline else None
+
+
+def start_deadline(seconds: float):
+    """Start a budget for the current context; returns a token for ``end_deadline``"""
+    return _current.set(Deadline(seconds))
+
+
+def end_deadline(token) -> None:
+    _current.reset(token)
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    Limit an upstream timeout to the time the request has left.
+
+    Raises ``DeadlineExceeded`` when less than ``UPSTREAM_MIN_CALL_SECONDS``
+    remain, since a call that short would only be cut off.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left < settings.upstream_min_call_seconds:
+        raise DeadlineExceeded(f"{max(left, 0):.2f}s left of the request deadline")
+    return left if timeout is None else min(timeout, left)
+
+
+def mark_degraded(upstream: str) -> None:
+    """Note that a fallback was served in place of an upstream's answer"""
+    deadline = _current.get()
+    if deadline is not None and upstream not in deadline.degraded:
+        deadline.degraded.append(upstream)
+
+
+def route_deadline(path: str) -> float:
+    for pattern, seconds in ROUTE_DEADLINES:
+        if pattern.search(path):
+            return seconds
+    return settings.request_deadline_seconds
+
+
+def _requested_timeout(scope) -> Optional[float]:
+    for name, value in scope["headers"]:
+        if name == TIMEOUT_HEADER:
+            try:
+                seconds = float(value)
+            except ValueError:
+                return None
+            return seconds if seconds > 0 else None
+    return None
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving every request a time budget.
+
+    The budget is the ``X-Request-Timeout`` header (seconds, capped at
+    ``REQUEST_DEADLINE_MAX_SECONDS``) or the route's default. Upstream
+    calls made while handling the request cap their timeouts to what is
+    left; if any upstream was replaced by a fallback the response carries
+    ``X-Degraded`` with the upstream names.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _requested_timeout(scope)
+        seconds = min(requested, settings.request_deadline_max_seconds) if requested else route_deadline(scope["path"])
+        token = start_deadline(seconds)
+        deadline = _current.get()
+
+        async def send_with_degraded(message):
+            if message["type"] == "http.response.start" and deadline.degraded:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-degraded", ",".join(deadline.degraded).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_degraded)
+        finally:
+            end_deadline(token)
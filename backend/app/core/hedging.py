@@ -0,0 +1,130 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from .metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """
+    Sends a second, identical request when the first is slower than usual.
+
+    The delay before hedging is the ``percentile`` of recently observed
+    latencies, learned separately per method, so only the slowest ~10% of
+    calls are hedged. Hedging starts once ``min_samples`` latencies have
+    been seen. A budget caps the extra spend: each call earns
+    ``budget_ratio`` of a hedge, up to ``max_burst`` saved hedges.
+
+    Only primary attempts are timed, including those that lose: the first
+    attempt to succeed wins, a losing hedge is cancelled, but a losing
+    primary is left to finish so its (slow) latency is still learned.
+    Otherwise the percentile would only see the calls that were fast
+    enough to win and keep drifting down, hedging more and more.
+    Cancelling would not save anything anyway: the SDK calls block in
+    worker threads (``asyncio.to_thread``), which keep running until the
+    call returns; cancellation only drops the result.
+    """
+
+    def __init__(self, name: str, percentile: float = 90, min_samples: int = 20,
+                 budget_ratio: float = 0.1, max_burst: float = 5, enabled: bool = True):
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.max_burst = max_burst
+        self.enabled = enabled
+        self._latencies: Dict[str, Histogram] = {}
+        self._budget = 0.0
+
+    def delay(self, method: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little data"""
+        histogram = self._latencies.get(method)
+        if histogram is None or len(histogram.samples) < self.min_samples:
+            return None
+        return histogram.percentile(self.percentile)
+
+    def observe(self, method: str, seconds: float) -> None:
+        histogram = self._latencies.get(method)
+        if histogram is None:
+            histogram = self._latencies[method] = Histogram(max_samples=512)
+        histogram.observe(seconds)
+
+    def _take_budget(self) -> bool:
+        if self._budget >= 1:
+            self._budget -= 1
+            return True
+        return False
+
+    async def _timed(self, method: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        start = time.perf_counter()
+        result = await attempt()
+        self.observe(method, time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    def _forget(task: "asyncio.Future") -> None:
+        """Let a losing primary finish in the background without logging its error as unhandled"""
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    async def run(self, method: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``attempt()``, hedging it with a second call if it is slow"""
+        if not self.enabled:
+            return await attempt()
+
+        metrics.increment(f"hedge.{self.name}.calls")
+        self._budget = min(self.max_burst, self._budget + self.budget_ratio)
+        start = time.perf_counter()
+        result = await self._race(method, attempt)
+        metrics.observe(f"hedge.{self.name}.latency_ms", (time.perf_counter() - start) * 1000)
+        return result
+
+    async def _race(self, method: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        primary = asyncio.ensure_future(self._timed(method, attempt))
+        tasks = [primary]
+        try:
+            delay = self.delay(method)
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            if not self._take_budget():
+                metrics.increment(f"hedge.{self.name}.budget_exhausted")
+                return await primary
+
+            metrics.increment(f"hedge.{self.name}.hedged")
+            hedge = asyncio.ensure_future(attempt())
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.increment(f"hedge.{self.name}.hedge_wins")
+                        return task.result()
+            # Both attempts failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    if task is primary:
+                        self._forget(task)
+                    else:
+                        task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # retrieved, so a losing failure is not logged as unhandled
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = metrics.counter(f"hedge.{self.name}.calls")
+        hedged = metrics.counter(f"hedge.{self.name}.hedged")
+        wins = metrics.counter(f"hedge.{self.name}.hedge_wins")
+        return {
+            "hedge_rate": round(hedged / calls, 4) if calls else 0.0,
+            "win_rate": round(wins / hedged, 4) if hedged else 0.0,
+            "delays": {method: self.delay(method) for method in self._latencies},
+        }
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Set
+import copy
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """A patch that is malformed or cannot be applied to the document"""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens"""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_index(document, token)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at /{'/'.join(tokens)}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, token))
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def validate_patch(operations: Any) -> List[Dict[str, Any]]:
+    """Check a patch is a list of well-formed RFC 6902 operations"""
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            raise JsonPatchError(f"Invalid operation: {operation!r}")
+        _parse_pointer(operation.get("path"))
+        if operation["op"] in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{operation['op']}' needs a value")
+        if operation["op"] in ("move", "copy"):
+            _parse_pointer(operation.get("from"))
+    return operations
+
+
+def touched_members(operations: List[Dict[str, Any]]) -> Set[str]:
+    """Top-level members a patch reads or writes (so only those need loading)"""
+    members = set()
+    for operation in operations:
+        for pointer in (operation.get("path"), operation.get("from")):
+            if pointer:
+                members.add(_parse_pointer(pointer)[0])
+            elif pointer == "":
+                raise JsonPatchError("Patching the whole document is not supported")
+    return members
+
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Apply an RFC 6902 JSON Patch and return the new document.
+
+    The input is not modified, and the patch is atomic: if any operation
+    fails, JsonPatchError is raised and no change is kept.
+    """
+    document = copy.deepcopy(document)
+    for operation in validate_patch(operations):
+        op = operation["op"]
+        tokens = _parse_pointer(operation["path"])
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(document, tokens)
+        elif op == "replace":
+            _resolve(document, tokens)
+            if tokens:
+                _remove(document, tokens)
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = _parse_pointer(operation["from"])
+            if tokens[:len(source)] == source and tokens != source:
+                raise JsonPatchError("Cannot move a value into one of its children")
+            document = _add(document, tokens, _remove(document, source))
+        elif op == "copy":
+            value = copy.deepcopy(_resolve(document, _parse_pointer(operation["from"])))
+            document = _add(document, tokens, value)
+        elif _resolve(document, tokens) != operation["value"]:
+            raise JsonPatchError(f"Test failed at {operation['path']}")
+    return document
@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Any, Callable, Dict
+import threading
+
+
+class Histogram:
+    """Keeps a bounded reservoir of recent observations for percentiles"""
+
+    def __init__(self, max_samples: int = 2048):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Percentile (0-100) over the retained samples"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and histograms exposed at /metrics"""
+
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def counter(self, name: str) -> float:
+        return self._counters.get(name, 0)
+
+    def register_gauge(self, name: str, callback: Callable[[], Any]) -> None:
+        """Register a gauge whose value is read when a snapshot is taken"""
+        self._gauges[name] = callback
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: h.snapshot() for name, h in self._histograms.items()}
+        gauges = {}
+        for name, callback in list(self._gauges.items()):
+            try:
+                gauges[name] = callback()
+            except Exception:
+                gauges[name] = None
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+# Create metrics registry
+metrics = MetricsRegistry()
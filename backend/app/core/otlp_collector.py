@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Minimal OTLP/HTTP (JSON) trace collector for local development and tests.
+
+Accepts ``POST /v1/traces`` with the JSON encoding of
+``ExportTraceServiceRequest`` (what TRACING_EXPORTER=otlp sends), keeps
+the spans in memory, optionally appends each request to a file, and
+prints every finished request as a waterfall:
+
+    python -m app.core.otlp_collector --port 4318 --output traces.jsonl
+
+Files written by the collector or by TRACING_EXPORTER=file can be shown
+the same way:
+
+    python -m app.core.otlp_collector --show traces.jsonl
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import json
+import threading
+
+KIND_SERVER = 2
+BAR_WIDTH = 40
+
+
+def _attribute(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for kind in ("stringValue", "boolValue", "doubleValue"):
+        if kind in value:
+            return value[kind]
+    return value
+
+
+def flatten(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Spans of an ExportTraceServiceRequest, with attributes as a dict and times as ints"""
+    spans = []
+    for resource_spans in document.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                spans.append({
+                    **span,
+                    "startTimeUnixNano": int(span["startTimeUnixNano"]),
+                    "endTimeUnixNano": int(span["endTimeUnixNano"]),
+                    "attributes": {item["key"]: _attribute(item["value"]) for item in span.get("attributes", [])},
+                })
+    return spans
+
+
+def _uncovered_ns(span: Dict[str, Any], children: List[Dict[str, Any]]) -> int:
+    """Time in ``span`` not covered by any child: its own work, or waiting between children"""
+    covered, cursor = 0, span["startTimeUnixNano"]
+    for child in sorted(children, key=lambda item: item["startTimeUnixNano"]):
+        start = max(child["startTimeUnixNano"], cursor)
+        end = min(child["endTimeUnixNano"], span["endTimeUnixNano"])
+        if end > start:
+            covered += end - start
+            cursor = end
+    return span["endTimeUnixNano"] - span["startTimeUnixNano"] - covered
+
+
+def waterfall(spans: Iterable[Dict[str, Any]]) -> str:
+    """
+    Render one trace as an indented tree with start offset, duration and
+    self time (not covered by children) per span, plus a timeline bar.
+    Overlapping siblings are fan-out; large self times are gaps between
+    them (serialization, parsing, waiting on the event loop).
+    """
+    spans = list(spans)
+    ids = {span["spanId"] for span in spans}
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        children.setdefault(span.get("parentSpanId") or "", []).append(span)
+    roots = [span for span in spans if (span.get("parentSpanId") or "") not in ids]
+    start = min(span["startTimeUnixNano"] for span in spans)
+    total = max(max(span["endTimeUnixNano"] for span in spans) - start, 1)
+
+    lines = [f"trace {spans[0]['traceId']}  {total / 1e6:.1f} ms",
+             f"  {'offset':>9} {'dur':>9} {'self':>9}  {'':<{BAR_WIDTH}}  span"]
+
+    def render(span: Dict[str, Any], depth: int) -> None:
+        offset = span["startTimeUnixNano"] - start
+        duration = span["endTimeUnixNano"] - span["startTimeUnixNano"]
+        kids = sorted(children.get(span["spanId"], []), key=lambda item: item["startTimeUnixNano"])
+        begin = int(offset / total * BAR_WIDTH)
+        length = max(int(duration / total * BAR_WIDTH), 1)
+        bar = (" " * begin + "█" * length)[:BAR_WIDTH]
+        error = " ✗" if span.get("status", {}).get("code") == 2 else ""
+        details = " ".join(
+            f"{key}={value}" for key, value in span["attributes"].items() if key != "db.statement"
+        )
+        lines.append(
+            f"  {offset / 1e6:>9.1f} {duration / 1e6:>9.1f} {_uncovered_ns(span, kids) / 1e6:>9.1f}  "
+            f"{bar:<{BAR_WIDTH}}  {'  ' * depth}{span['name']}{error} {details}".rstrip()
+        )
+        for child in kids:
+            render(child, depth + 1)
+
+    for root in sorted(roots, key=lambda item: item["startTimeUnixNano"]):
+        render(root, 0)
+    return "\n".join(lines)
+
+
+class TraceCollector:
+    """Spans received so far, grouped by trace"""
+
+    def __init__(self, output: Optional[str] = None, echo: bool = False):
+        self.output = output
+        self.echo = echo
+        self.traces: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def receive(self, body: bytes) -> None:
+        document = json.loads(body)
+        spans = flatten(document)
+        finished = []
+        with self._lock:
+            if self.output:
+                with open(self.output, "a") as out:
+                    out.write(json.dumps(document, separators=(",", ":")) + "\n")
+            for span in spans:
+                self.traces.setdefault(span["traceId"], []).append(span)
+                # Children end (and are exported) before their request's server span
+                if span.get("kind") == KIND_SERVER:
+                    finished.append(span["traceId"])
+            rendered = [waterfall(self.traces[trace_id]) for trace_id in finished]
+        if self.echo:
+            for text in rendered:
+                print(text + "\n", flush=True)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if trace_id is not None:
+                return list(self.traces.get(trace_id, []))
+            return [span for spans in self.traces.values() for span in spans]
+
+
+def _handler(collector: TraceCollector):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                collector.receive(body)
+            except (ValueError, KeyError) as e:
+                self.send_error(400, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class CollectorThread:
+    """Run the collector on a background thread (``with CollectorThread() as endpoint``)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, output: Optional[str] = None):
+        self.collector = TraceCollector(output)
+        self.server = ThreadingHTTPServer((host, port), _handler(self.collector))
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> str:
+        self._thread.start()
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def show(path: str) -> None:
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path) as lines:
+        for line in lines:
+            if line.strip():
+                for span in flatten(json.loads(line)):
+                    traces.setdefault(span["traceId"], []).append(span)
+    for spans in traces.values():
+        print(waterfall(spans) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal OTLP/HTTP JSON trace collector for development")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", help="Append received requests to this file (OTLP/JSON lines)")
+    parser.add_argument("--show", metavar="FILE", help="Print the traces in FILE as waterfalls and exit")
+    args = parser.parse_args()
+
+    if args.show:
+        show(args.show)
+        return
+    collector = TraceCollector(args.output, echo=True)
+    server = ThreadingHTTPServer((args.host, args.port), _handler(collector))
+    print(f"🚀 OTLP collector stand-in listening on http://{args.host}:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
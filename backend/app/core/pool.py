@@ -0,0 +1,96 @@
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+import logging
+import time
+
+from .metrics import metrics
+from .timing import record
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    metrics_prefix = "db.pool"
+    slow_checkout_ms = 100.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.increment(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            record("db_pool", wait)
+            wait_ms = wait * 1000
+            metrics.observe(f"{self.metrics_prefix}.checkout_wait_ms", wait_ms)
+            if wait_ms >= self.slow_checkout_ms:
+                metrics.increment(f"{self.metrics_prefix}.slow_checkouts")
+                logger.warning(
+                    f"Slow connection checkout on {self.metrics_prefix}: {wait_ms:.1f} ms "
+                    f"({self.checkedout()} checked out, size {self.size()}, overflow {self.overflow()})"
+                )
+
+
+def instrument_pool(engine, name: str, slow_checkout_ms: float) -> None:
+    """Hook pool events to report utilization and connection churn under db.pool.<name>"""
+    pool = engine.pool
+    prefix = f"db.pool.{name}"
+
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.metrics_prefix = prefix
+        pool.slow_checkout_ms = slow_checkout_ms
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        metrics.register_gauge(f"{prefix}.checked_out", pool.checkedout)
+        metrics.register_gauge(
+            f"{prefix}.utilization",
+            lambda: round(pool.checkedout() / capacity, 3) if capacity else 0.0
+        )
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment(f"{prefix}.connections_opened")
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        metrics.increment(f"{prefix}.connections_closed")
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment(f"{prefix}.connections_invalidated")
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment(f"{prefix}.checkouts")
+
+
+def install_idle_pre_ping(engine, idle_seconds: float) -> None:
+    """
+    Ping connections on checkout only if they sat idle in the pool.
+
+    Cheaper than pool_pre_ping, which adds a round trip to every
+    checkout. A failed ping raises DisconnectionError so the pool
+    discards the connection and retries with a fresh one.
+    """
+    pool = engine.pool
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            raise DisconnectionError(f"Idle connection failed pre-ping: {e}") from e
+        finally:
+            cursor.close()
@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+import asyncio
+import cProfile
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import traceback
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Sample:
+    """Handle for one request; ``keep_if`` decides whether its profile is written"""
+
+    def __init__(self, profiler: "SlowRequestProfiler", scope, profile: Optional[cProfile.Profile] = None):
+        self.profiler = profiler
+        self.scope = scope
+        self.profile = profile
+
+    def keep_if(self, elapsed_ms: float, fields: Dict[str, Any]) -> None:
+        if self.profile is None or elapsed_ms < self.profiler.slow_ms:
+            return
+        self.profile.disable()
+        path = self.profiler.path_for(self.scope, elapsed_ms, "prof")
+        if path:
+            self.profile.dump_stats(path)
+            logger.warning(f"Profiled slow request {self.scope['method']} {self.scope['path']} into {path} {fields}")
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in capture of what slow requests were doing, written to ``directory``.
+
+    ``stack`` mode costs nothing until a request has run for ``slow_ms``;
+    then it writes the request's task stack and every thread's stack
+    (worker threads running queries or upstream calls) to a .txt file.
+    ``cprofile`` mode runs ``sample_rate`` of requests under cProfile, one
+    at a time, and keeps the .prof file (``python -m pstats``, snakeviz)
+    only if the request took at least ``slow_ms``. cProfile sees the event
+    loop thread, so concurrent requests show up in each other's profiles.
+    At most ``max_files`` files are written per process.
+    """
+
+    def __init__(self, directory: str = "", mode: str = "stack", slow_ms: float = 2000,
+                 sample_rate: float = 0.05, max_files: int = 200):
+        if mode not in ("stack", "cprofile"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.directory = Path(directory) if directory else None
+        self.mode = mode
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self._written = 0
+        self._profiling = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def path_for(self, scope, elapsed_ms: float, extension: str) -> Optional[Path]:
+        """A new file name for a capture, or None once ``max_files`` were written"""
+        with self._lock:
+            if self._written >= self.max_files:
+                return None
+            self._written += 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:80] or "root"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return self.directory / f"{stamp}-{self._written}-{scope['method']}-{slug}-{elapsed_ms:.0f}ms.{extension}"
+
+    @contextmanager
+    def profile(self, scope):
+        if not self.enabled:
+            yield _Sample(self, scope)
+        elif self.mode == "stack":
+            with self._watch(scope) as sample:
+                yield sample
+        else:
+            with self._cprofile(scope) as sample:
+                yield sample
+
+    @contextmanager
+    def _watch(self, scope):
+        task = asyncio.current_task()
+        started = time.perf_counter()
+        handle = asyncio.get_running_loop().call_later(
+            self.slow_ms / 1000, lambda: self._dump_stacks(scope, task, started)
+        )
+        try:
+            yield _Sample(self, scope)
+        finally:
+            handle.cancel()
+
+    @contextmanager
+    def _cprofile(self, scope):
+        with self._lock:
+            chosen = not self._profiling and random.random() < self.sample_rate
+            self._profiling = self._profiling or chosen
+        if not chosen:
+            yield _Sample(self, scope)
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield _Sample(self, scope, profile)
+        finally:
+            profile.disable()
+            self._profiling = False
+
+    def _dump_stacks(self, scope, task, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        path = self.path_for(scope, elapsed_ms, "txt")
+        if not path:
+            return
+        frames = sys._current_frames()
+        with open(path, "w") as out:
+            out.write(f"{scope['method']} {scope['path']} still running after {elapsed_ms:.0f} ms\n\n")
+            if task is not None:
+                out.write("== Request task ==\n")
+                task.print_stack(file=out)
+            for thread in threading.enumerate():
+                frame = frames.get(thread.ident)
+                if frame is not None:
+                    out.write(f"\n== Thread {thread.name} ==\n")
+                    out.write("".join(traceback.format_stack(frame)))
+        logger.warning(f"Slow request {scope['method']} {scope['path']}: stacks written to {path}")
+
+
+# Create profiler instance
+profiler = SlowRequestProfiler(
+    directory=settings.profile_dir,
+    mode=settings.profile_mode,
+    slow_ms=settings.profile_slow_ms,
+    sample_rate=settings.profile_sample_rate,
+    max_files=settings.profile_max_files
+)
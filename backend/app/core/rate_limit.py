@@ -0,0 +1,209 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import logging
+import math
+import re
+import time
+
+import orjson
+
+from .cache.resp import RESPBackend
+from .config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Routes that call Gemini or Google Maps; everything else under the API prefix is "default"
+EXPENSIVE_PATH = re.compile(
+    r"/trips/[^/]+/(generate-options|options/[^/]+/regenerate|recommendations|places/search)$"
+)
+EXEMPT_PATHS = ("/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+class MemoryStore:
+    """
+    Per-process token buckets.
+
+    ``consume`` never awaits, so it runs atomically on the event loop
+    without a lock. Buckets idle long enough to have refilled completely
+    are dropped once the table grows past ``max_keys`` (and, if that is not
+    enough, the least recently seen half).
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def consume(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now, capacity / rate)
+            bucket = self._buckets[key] = [float(capacity), now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True, bucket[0]
+        return False, bucket[0]
+
+    def _prune(self, now: float, refill_seconds: float) -> None:
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < refill_seconds
+        }
+        if len(self._buckets) >= self.max_keys:
+            recent = sorted(self._buckets.items(), key=lambda item: item[1][1])[len(self._buckets) // 2:]
+            self._buckets = dict(recent)
+
+
+class RedisStore:
+    """
+    Token buckets shared by every worker through Redis.
+
+    The refill-and-take step runs as one Lua script, so concurrent workers
+    cannot overspend a bucket. If Redis is unreachable requests are let
+    through (and counted), since an outage of the limiter should not take
+    the API down with it.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        # Speaks RESP directly, like the resp cache backend; no client library needed
+        self.client = RESPBackend(url)
+        self.prefix = prefix
+
+    async def consume(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await self.client.execute(
+                "EVAL", self.SCRIPT, 1, self.prefix + key, capacity, rate, time.time()
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            metrics.increment("rate_limit.backend_errors")
+            return True, float(capacity)
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:
+    """
+    Token-bucket limits per client, with separate budgets for expensive
+    (AI/Maps) routes and everything else.
+
+    A bucket holds up to one minute's worth of requests and refills
+    continuously, so a client can burst up to its per-minute limit and is
+    then held to the sustained rate. Clients are identified by their
+    ``X-API-Key`` header when it is one of ``api_keys``, and otherwise by
+    the peer address, so made-up keys cannot buy a fresh budget.
+    """
+
+    def __init__(self, default_per_minute: int, expensive_per_minute: int,
+                 backend_url: str = "", enabled: bool = True, api_keys: Iterable[str] = ()):
+        self.enabled = enabled
+        self.limits = {"default": default_per_minute, "expensive": expensive_per_minute}
+        self.store = RedisStore(backend_url) if backend_url else MemoryStore()
+        self.api_keys = frozenset(api_keys)
+
+    def client_key(self, scope) -> str:
+        """Bucket owner: a known API key (hashed, so stores never hold it), else the peer address"""
+        for name, value in scope["headers"]:
+            if name == b"x-api-key" and value.decode("latin-1") in self.api_keys:
+                return "key:" + hashlib.sha256(value).hexdigest()[:16]
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def classify(self, path: str) -> Optional[str]:
+        """Budget for a request path, or None if the path is not limited"""
+        if path in EXEMPT_PATHS:
+            return None
+        return "expensive" if EXPENSIVE_PATH.search(path) else "default"
+
+    async def check(self, client: str, budget: str) -> Tuple[bool, int, float]:
+        """Returns (allowed, remaining, retry-after seconds) for one request"""
+        limit = self.limits[budget]
+        rate = limit / 60
+        allowed, tokens = await self.store.consume(f"{budget}:{client}", limit, rate)
+        if allowed:
+            return True, int(tokens), 0.0
+        metrics.increment(f"rate_limit.rejected.{budget}")
+        return False, 0, (1 - tokens) / rate
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing ``RateLimiter`` budgets.
+
+    Rejected requests get 429 with ``Retry-After``; every limited response
+    carries ``X-RateLimit-Limit`` and ``X-RateLimit-Remaining``.
+    """
+
+    def __init__(self, app, limiter: "RateLimiter"):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.limiter.classify(scope["path"])
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, remaining, retry_after = await self.limiter.check(self.limiter.client_key(scope), budget)
+        limit_headers = [
+            (b"x-ratelimit-limit", str(self.limiter.limits[budget]).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+        ]
+
+        if not allowed:
+            body = orjson.dumps({"error": "Rate limit exceeded", "status_code": 429})
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+rate_limiter = RateLimiter(
+    settings.rate_limit_per_minute,
+    settings.rate_limit_expensive_per_minute,
+    backend_url=settings.rate_limit_backend_url,
+    enabled=settings.rate_limit_enabled,
+    api_keys=settings.rate_limit_api_keys_list,
+)
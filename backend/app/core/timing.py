@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+from .config import settings
+from .profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+# Categories in Server-Timing order; anything else is appended after them
+CATEGORIES = ("db_pool", "db", "cache", "gemini", "maps", "serialize")
+
+
+class RequestTimings:
+    """
+    Time spent per category (database, Gemini, Maps, ...) by one request.
+
+    Shared by every task and worker thread handling the request (they
+    inherit the context), so recording is locked. Categories can overlap
+    each other (parallel upstream calls) and are not exclusive of the total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[category] = self.durations.get(category, 0.0) + seconds
+            self.counts[category] = self.counts.get(category, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def fields(self) -> Dict[str, float]:
+        """Flat log fields: <category>_ms and <category>_count, plus total_ms"""
+        with self._lock:
+            result = {"total_ms": round(self.elapsed() * 1000, 2)}
+            for category in sorted(self.durations, key=_order):
+                result[f"{category}_ms"] = round(self.durations[category] * 1000, 2)
+                result[f"{category}_count"] = self.counts[category]
+        return result
+
+    def header(self) -> str:
+        """Server-Timing value, e.g. ``db;dur=12.4;desc="3 calls", total;dur=80.1``"""
+        with self._lock:
+            entries = [
+                f'{category};dur={self.durations[category] * 1000:.1f};desc="{self.counts[category]} calls"'
+                for category in sorted(self.durations, key=_order)
+            ]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def _order(category: str):
+    return (CATEGORIES.index(category) if category in CATEGORIES else len(CATEGORIES), category)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record(category: str, seconds: float) -> None:
+    """Add time to the current request's category (no-op outside a request)"""
+    timings = _current.get()
+    if timings is not None:
+        timings.record(category, seconds)
+
+
+@contextmanager
+def timed(category: str):
+    """Time a block (sync or ``await``-ing) into the current request's category"""
+    if _current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(category, time.perf_counter() - start)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement the engine executes into the ``db`` category"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("timing_started")
+        if started:
+            record("db", time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("timing_started"):
+            record("db", time.perf_counter() - connection.info["timing_started"].pop())
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware that breaks each request's time down by category.
+
+    Adds a ``Server-Timing`` header (time up to the response headers) and
+    logs requests slower than ``REQUEST_TIMING_LOG_MS`` with the breakdown
+    as structured fields (``extra={"timing": {...}}``). Slow requests can
+    also be profiled, see ``profiling``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.server_timing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timings.header().encode())
+                ]
+            await send(message)
+
+        try:
+            with profiler.profile(scope) as sample:
+                await self.app(scope, receive, send_with_timing)
+                sample.keep_if(timings.elapsed() * 1000, timings.fields())
+        finally:
+            _current.reset(token)
+            fields = timings.fields()
+            if fields["total_ms"] >= settings.request_timing_log_ms:
+                breakdown = " ".join(f"{key}={value}" for key, value in fields.items())
+                logger.info(
+                    f"{scope['method']} {scope['path']} {status['code']} {breakdown}",
+                    extra={"timing": {"method": scope["method"], "path": scope["path"],
+                                      "status": status["code"], **fields}}
+                )
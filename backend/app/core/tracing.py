@@ -0,0 +1,352 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+
+from sqlalchemy import event
+
+from .config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds and status codes
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+# Path parameters recorded under their own attribute names
+PATH_ATTRIBUTES = {"trip_id": "trip.id", "option_id": "option.id", "day_number": "trip.day_number"}
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+MAX_STATEMENT_LENGTH = 500
+
+
+class Span:
+    """One timed operation in a trace (times in ns since the epoch, like OTLP)"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = "", kind: int = KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes or {})
+        self.status = (STATUS_OK, "")
+
+    def set(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def fail(self, error: BaseException) -> None:
+        self.status = (STATUS_ERROR, f"{type(error).__name__}: {error}"[:500])
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status[0]},
+        }
+        if self.status[1]:
+            span["status"]["message"] = self.status[1]
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """
+    Batches finished spans and writes them on a background thread
+    (flushed at shutdown and at interpreter exit).
+
+    ``file`` appends one OTLP/JSON ``ExportTraceServiceRequest`` per batch
+    (one per line) to ``path``; ``otlp`` POSTs the same document to an
+    OTLP/HTTP JSON collector (``endpoint``, e.g. .../v1/traces). Export
+    failures are logged and the batch is dropped.
+    """
+
+    def __init__(self, kind: str = "file", path: str = "traces.jsonl",
+                 endpoint: str = "http://localhost:4318/v1/traces", service_name: str = "trip-planner-api",
+                 flush_seconds: float = 1.0, max_batch: int = 512):
+        if kind not in ("file", "otlp"):
+            raise ValueError(f"Unknown trace exporter: {kind}")
+        self.kind = kind
+        self.path = Path(path)
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.shutdown)
+        self._queue.put(span)
+
+    def shutdown(self) -> None:
+        """Flush what is queued and stop the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            atexit.unregister(self.shutdown)
+            self._queue.put(None)
+            thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def document(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app"}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+
+    def _write(self, spans: List[Span]) -> None:
+        body = json.dumps(self.document(spans), separators=(",", ":"))
+        try:
+            if self.kind == "file":
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a") as out:
+                    out.write(body + "\n")
+            else:
+                request = urllib.request.Request(
+                    self.endpoint, data=body.encode(), headers={"Content-Type": "application/json"}, method="POST"
+                )
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    response.read()
+            metrics.increment("tracing.spans_exported", len(spans))
+        except Exception as e:
+            metrics.increment("tracing.export_errors")
+            logger.warning(f"Could not export {len(spans)} spans to {self.endpoint if self.kind == 'otlp' else self.path}: {e}")
+
+
+class Tracer:
+    """Starts root spans for sampled requests and child spans within them"""
+
+    def __init__(self, exporter: SpanExporter, enabled: bool = False, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    def start_root(self, name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+        """A server span continuing ``traceparent`` (W3C) or a new trace; None if not sampled"""
+        if not self.enabled:
+            return None
+        match = TRACEPARENT.match(traceparent or "")
+        if match:
+            if not int(match.group(3), 16) & 1:
+                return None
+            return Span(name, match.group(1), match.group(2), KIND_SERVER, attributes)
+        if random.random() >= self.sample_rate:
+            return None
+        return Span(name, os.urandom(16).hex(), "", KIND_SERVER, attributes)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        self.exporter.export(span)
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the current span (no-op when the request is not traced)"""
+    current = _current.get()
+    if current is not None:
+        current.set(key, value)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes):
+    """
+    Child span of the current one for the duration of the block.
+
+    Yields the span, or None when the request is not traced, so callers
+    write ``if s: s.set(...)`` for attributes known only afterwards.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        tracer.finish(child)
+
+
+def trace_engine(engine) -> None:
+    """One client span per SQL statement, with the statement and the rows returned or affected"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        conn.info.setdefault("trace_spans", []).append(Span(
+            f"db.{operation.lower()}", parent.trace_id, parent.span_id, KIND_CLIENT, {
+                "db.system": engine.dialect.name,
+                "db.operation": operation,
+                "db.statement": statement[:MAX_STATEMENT_LENGTH],
+                "db.executemany": executemany,
+            }
+        ))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            statement_span = spans.pop()
+            # Buffered drivers (e.g. PyMySQL) report rows returned; SQLite only rows affected
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                statement_span.set("db.rows", cursor.rowcount)
+            tracer.finish(statement_span)
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(exception_context):
+        connection = exception_context.connection
+        spans = connection.info.get("trace_spans") if connection is not None else None
+        if spans:
+            statement_span = spans.pop()
+            statement_span.fail(exception_context.original_exception)
+            tracer.finish(statement_span)
+
+
+def _route_template(scope) -> Optional[str]:
+    """The matched route's path template (``/api/v1/trips/{trip_id}``), if any"""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return None
+    for route in getattr(app, "routes", ()):
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return None
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a server span per sampled request.
+
+    Continues an incoming W3C ``traceparent`` and returns the request's
+    own in the response, so a client can find its trace. Spans opened
+    while handling the request (services, SQL statements, serialization)
+    become its children, including those in worker threads and in tasks
+    started with ``asyncio.gather`` (fan-out shows up as siblings).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = next((value.decode() for name, value in scope["headers"] if name == b"traceparent"), None)
+        root = tracer.start_root(
+            f"{scope['method']} {scope['path']}", traceparent,
+            **{"http.request.method": scope["method"], "url.path": scope["path"]}
+        )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                root.set("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = (STATUS_ERROR, "")
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", f"00-{root.trace_id}-{root.span_id}-01".encode())
+                ]
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            root.fail(e)
+            raise
+        finally:
+            _current.reset(token)
+            template = _route_template(scope)
+            if template:
+                root.name = f"{scope['method']} {template}"
+                root.set("http.route", template)
+            for name, value in (scope.get("path_params") or {}).items():
+                root.set(PATH_ATTRIBUTES.get(name, f"http.path_param.{name}"), value)
+            tracer.finish(root)
+
+
+# Create tracer instance
+tracer = Tracer(
+    SpanExporter(
+        kind=settings.tracing_exporter,
+        path=settings.tracing_file,
+        endpoint=settings.tracing_otlp_endpoint,
+        service_name=settings.tracing_service_name
+    ),
+    enabled=settings.tracing_enabled,
+    sample_rate=settings.tracing_sample_rate
+)
@@ -0,0 +1,95 @@
+from sqlalchemy.types import TypeDecorator, LargeBinary
+from sqlalchemy.dialects.mysql import LONGBLOB
+from typing import Any, Optional
+import json
+import zlib
+
+import orjson
+
+from .config import settings
+
+# Stored values start with MAGIC followed by a one-byte codec identifier.
+# Anything else is treated as a legacy plain JSON document, so rows written
+# before the migration keep working and can be re-encoded incrementally.
+MAGIC = b"CJ"
+CODEC_ZLIB = b"\x01"
+CODEC_ZSTD = b"\x02"
+
+
+def _zstd():
+    """Import zstandard lazily; it is optional (not in requirements.txt) and only needed for zstd"""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstandard is not installed; install it or set JSON_COLUMN_COMPRESSION=zlib") from e
+    return zstandard
+
+
+def check_codec(codec: Optional[str] = None) -> None:
+    """Fail at startup, not on the first write, if the configured codec cannot be used"""
+    codec = codec or settings.json_column_compression
+    if codec not in ("zlib", "zstd"):
+        raise ValueError(f"Unknown JSON column codec: {codec!r}")
+    if codec == "zstd":
+        _zstd()
+
+
+def encode_json(value: Any, codec: Optional[str] = None) -> bytes:
+    """Serialize a JSON-compatible value and compress it"""
+    payload = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    codec = codec or settings.json_column_compression
+    if codec not in ("zlib", "zstd"):
+        raise ValueError(f"Unknown JSON column codec: {codec!r}")
+    if codec == "zstd":
+        return MAGIC + CODEC_ZSTD + _zstd().ZstdCompressor(level=3).compress(payload)
+    return MAGIC + CODEC_ZLIB + zlib.compress(payload, 6)
+
+
+def decode_json(data: Any) -> Any:
+    """Decode a stored value, accepting both compressed and legacy JSON rows"""
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if data[:2] != MAGIC:
+        return orjson.loads(data)
+
+    codec = data[2:3]
+    if codec == CODEC_ZLIB:
+        return orjson.loads(zlib.decompress(data[3:]))
+    if codec == CODEC_ZSTD:
+        return orjson.loads(_zstd().ZstdDecompressor().decompress(data[3:]))
+    raise ValueError(f"Unknown JSON column codec: {codec!r}")
+
+
+def is_encoded(data: Any) -> bool:
+    """Check whether a raw stored value already uses the compressed format"""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:2]) == MAGIC
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored as compressed orjson bytes.
+
+    Large itinerary payloads compress 5-10x, which shrinks tables and the
+    bytes moved per row read. Decoding is eager: every loaded value is
+    decompressed and parsed when its row is fetched, so queries that do
+    not need these columns should defer them (``defer``/``load_only``).
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(LONGBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_json(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_json(value)
@@ -1,21 +1,63 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import logging
 
+from .core.cache.cache import cache
+from .core.circuit_breaker import circuit_breakers, OPEN
 from .core.config import settings
+from .core.deadline import DeadlineMiddleware
 from .core.database import engine, Base
+from .core.metrics import metrics
+from .core.rate_limit import RateLimitMiddleware, rate_limiter
+from .core.timing import TimingMiddleware
+from .core.types import check_codec
+from .core.tracing import TracingMiddleware, tracer
 from .api.v1 import trips
+from .services.google_ai_service import google_ai_service
+from .services.google_maps_service import google_maps_service
+from .services.recommendation_warmer import recommendation_warmer
+from .services.trip_purger import trip_purger
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create tables, connect the Google SDKs and start background maintenance tasks
+
+    Nothing here runs at import time, so importing the app (workers, tests,
+    scripts) stays cheap. The SDKs are imported in worker threads while the
+    app already serves requests; a request that needs one first waits for it.
+    """
+    check_codec(settings.json_column_compression)
+    if settings.create_tables_on_startup:
+        await asyncio.to_thread(Base.metadata.create_all, bind=engine)
+    sdk_setup = asyncio.gather(
+        asyncio.to_thread(google_ai_service.connect),
+        asyncio.to_thread(google_maps_service.connect)
+    )
+    if settings.trip_purge_enabled:
+        trip_purger.start()
+    if settings.recommendations_warm_enabled:
+        if not cache.shared:
+            logger.warning("Recommendation warming with a per-process cache: every worker calls Gemini for its own copy")
+        recommendation_warmer.start()
+    yield
+    await recommendation_warmer.stop()
+    await trip_purger.stop()
+    await sdk_setup
+    await asyncio.to_thread(tracer.exporter.shutdown)
+
 
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_name,
     version=settings.version,
     description="AI-powered travel planning API using Google AI technologies",
@@ -23,6 +65,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Request deadlines (innermost, so only admitted requests get a budget)
+app.add_middleware(DeadlineMiddleware)
+
+# Rate limiting (inside CORS, so 429s carry CORS headers and preflights are never counted)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,6 +80,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request tracing (inside timing, so the root span covers CORS, rate limiting and deadlines)
+app.add_middleware(TracingMiddleware)
+
+# Per-request timing breakdown (outermost, so the total covers every other middleware)
+app.add_middleware(TimingMiddleware)
+
 # Include API routers
 app.include_router(
     trips.router,
@@ -53,14 +107,23 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (degraded while an upstream circuit is open)"""
+    circuits = {name: breaker.snapshot() for name, breaker in circuit_breakers.items()}
+    degraded = any(circuit["state"] == OPEN for circuit in circuits.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "version": settings.version,
-        "environment": settings.environment
+        "environment": settings.environment,
+        "circuits": circuits
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process metrics (connection pools, upstream services)"""
+    return metrics.snapshot()
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, For
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
+from ..core.types import CompressedJSON
 
 
 class Trip(Base):
@@ -26,26 +27,34 @@ class Trip(Base):
     status = Column(String(50), default="draft")  # draft, planned, booked, completed
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True, index=True)  # Soft delete; rows are purged in the background
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every change (ETags)
     
-    # Relationships
-    daily_itineraries = relationship("DailyItinerary", back_populates="trip", cascade="all, delete-orphan")
-    trip_options = relationship("TripOption", back_populates="trip", cascade="all, delete-orphan")
+    # Relationships (children are removed by ON DELETE CASCADE, never loaded for deletion)
+    daily_itineraries = relationship(
+        "DailyItinerary", back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
+    )
+    trip_options = relationship(
+        "TripOption", back_populates="trip", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class DailyItinerary(Base):
     __tablename__ = "daily_itineraries"
     
     id = Column(String(255), primary_key=True, index=True)
-    trip_id = Column(String(255), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(255), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
     day_number = Column(Integer, nullable=False)
     date = Column(DateTime, nullable=False)
     daily_budget = Column(Float)
     
     # Activities, meals, accommodation stored as JSON
-    activities = Column(JSON)  # List of activity objects
-    meals = Column(JSON)  # List of meal objects
-    accommodation = Column(JSON)  # Accommodation object
-    transport = Column(JSON)  # Transport details
+    activities = Column(CompressedJSON)  # List of activity objects
+    meals = Column(CompressedJSON)  # List of meal objects
+    accommodation = Column(CompressedJSON)  # Accommodation object
+    transport = Column(CompressedJSON)  # Transport details
     
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -58,13 +67,13 @@ class TripOption(Base):
     __tablename__ = "trip_options"
     
     id = Column(String(255), primary_key=True, index=True)
-    trip_id = Column(String(255), ForeignKey("trips.id"), nullable=False)
+    trip_id = Column(String(255), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
     option_name = Column(String(255), nullable=False)  # e.g., "Adventure", "Cultural", "Balanced"
     theme = Column(String(50), nullable=False)  # adventure, cultural, balanced
     description = Column(Text)
     
     # Option details stored as JSON
-    daily_itineraries = Column(JSON)  # Complete daily itineraries for this option
+    daily_itineraries = Column(CompressedJSON)  # Complete daily itineraries for this option
     total_cost = Column(Float)
     highlights = Column(JSON)  # List of highlights
     
@@ -0,0 +1,168 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from ..core.database import SessionLocal
+from ..core.rate_limit import MemoryStore
+from ..models.trip import Trip
+from .google_ai_service import google_ai_service, recommendation_key, trip_ai_data
+from .google_maps_service import google_maps_service
+
+logger = logging.getLogger(__name__)
+
+# Which upstream each kind of job calls, and a rough price per call (USD)
+UPSTREAMS = {"geocode": "maps", "recommendations": "gemini", "trip_options": "gemini"}
+ESTIMATED_COST_USD = {"geocode": 0.005, "recommendations": 0.001, "trip_options": 0.004}
+
+# Trip columns the prompts are built from
+TRIP_COLUMNS = (
+    Trip.destination, Trip.start_date, Trip.end_date, Trip.total_budget, Trip.travelers, Trip.themes,
+    Trip.accommodation_preference, Trip.transportation_preference, Trip.food_preference,
+    Trip.special_requirements
+)
+
+
+def describe(kind: str, args: tuple) -> str:
+    """Short label for a warm-up job"""
+    if kind == "trip_options":
+        trip_data = args[0]
+        return f"trip_options {trip_data['destination']} ({trip_data['duration']} days from {trip_data['start_date'][:10]})"
+    if kind == "recommendations":
+        return f"recommendations {args[0]} [{', '.join(args[1])}]"
+    return f"geocode {args[0]}"
+
+
+class CacheWarmer:
+    """
+    Prefills the geocode, recommendations and trip options caches from
+    the trips table, so the first users after a deploy get cache hits.
+
+    ``plan`` mines the most recent ``sample_size`` trips for the most
+    common destinations (geocodes), destination/interest combinations
+    (recommendations) and upcoming trip profiles (trip options; their
+    prompts include dates and budget, so only identical upcoming trips
+    benefit). ``run`` works through the jobs with ``concurrency`` workers,
+    pacing calls per upstream with token buckets and skipping anything
+    already cached.
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal, sample_size: int = 5000,
+                 top_destinations: int = 50, top_combinations: int = 100, top_profiles: int = 20,
+                 concurrency: int = 4, gemini_per_minute: float = 10, maps_per_minute: float = 300):
+        self.session_factory = session_factory
+        self.sample_size = sample_size
+        self.top_destinations = top_destinations
+        self.top_combinations = top_combinations
+        self.top_profiles = top_profiles
+        self.concurrency = concurrency
+        self.per_minute = {"gemini": gemini_per_minute, "maps": maps_per_minute}
+        self._buckets = MemoryStore()
+
+    def _recent_trips(self) -> list:
+        db = self.session_factory()
+        try:
+            return db.execute(
+                select(*TRIP_COLUMNS)
+                .where(Trip.deleted_at.is_(None))
+                .order_by(Trip.created_at.desc())
+                .limit(self.sample_size)
+            ).all()
+        finally:
+            db.close()
+
+    def plan(self) -> Dict[str, Any]:
+        """Mine recent trips and return the summary plus the warm-up jobs, most popular first"""
+        trips = self._recent_trips()
+        now = datetime.utcnow()
+
+        destinations, combinations, profiles = Counter(), Counter(), Counter()
+        durations, themes = Counter(), Counter()
+        examples = {}
+        for trip in trips:
+            destination = " ".join(trip.destination.lower().split())
+            destinations[destination] += 1
+            examples.setdefault(("geocode", destination), (trip.destination,))
+
+            combination = recommendation_key(trip.destination, trip.themes or [])
+            combinations[combination] += 1
+            examples.setdefault(("recommendations", combination), (trip.destination, list(trip.themes or [])))
+
+            durations[(trip.end_date - trip.start_date).days + 1] += 1
+            themes.update(theme.strip().lower() for theme in trip.themes or [])
+
+            if trip.start_date >= now:
+                trip_data = trip_ai_data(trip)
+                profile = repr(sorted(trip_data.items()))
+                profiles[profile] += 1
+                examples.setdefault(("trip_options", profile), (trip_data,))
+
+        jobs = (
+            [("geocode", examples[("geocode", key)]) for key, _ in destinations.most_common(self.top_destinations)]
+            + [("recommendations", examples[("recommendations", key)])
+               for key, _ in combinations.most_common(self.top_combinations)]
+            + [("trip_options", examples[("trip_options", key)]) for key, _ in profiles.most_common(self.top_profiles)]
+        )
+        return {
+            "trips": len(trips),
+            "destinations": destinations.most_common(10),
+            "durations": durations.most_common(5),
+            "themes": themes.most_common(10),
+            "jobs": jobs,
+        }
+
+    @staticmethod
+    def estimate_cost(jobs: List[Tuple[str, tuple]]) -> float:
+        """Upper bound on the cost of the jobs (as if none were cached yet)"""
+        return sum(ESTIMATED_COST_USD[kind] for kind, _ in jobs)
+
+    async def _throttle(self, upstream: str) -> None:
+        """Wait for a token in the upstream's bucket"""
+        rate = self.per_minute[upstream] / 60
+        while True:
+            allowed, tokens = await self._buckets.consume(upstream, 1, rate)
+            if allowed:
+                return
+            await asyncio.sleep((1 - tokens) / rate)
+
+    async def _warm(self, kind: str, args: tuple) -> bool:
+        throttle = lambda: self._throttle(UPSTREAMS[kind])
+        if kind == "geocode":
+            return await google_maps_service.warm_geocode(*args, throttle=throttle)
+        if kind == "recommendations":
+            return await google_ai_service.warm_travel_recommendations(*args, throttle=throttle)
+        return await google_ai_service.warm_trip_options(*args, throttle=throttle)
+
+    async def run(self, jobs: List[Tuple[str, tuple]],
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Run the jobs; returns counts, the estimated spend and the first errors"""
+        available = {"gemini": await google_ai_service.available(), "maps": await google_maps_service.available()}
+        report = {"total": len(jobs), "warmed": 0, "cached": 0, "failed": 0, "skipped": 0,
+                  "cost_usd": 0.0, "errors": []}
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            if available[UPSTREAMS[job[0]]]:
+                queue.put_nowait(job)
+            else:
+                report["skipped"] += 1
+
+        async def worker():
+            while not queue.empty():
+                kind, args = queue.get_nowait()
+                try:
+                    if await self._warm(kind, args):
+                        report["warmed"] += 1
+                        report["cost_usd"] += ESTIMATED_COST_USD[kind]
+                    else:
+                        report["cached"] += 1
+                except Exception as e:
+                    report["failed"] += 1
+                    if len(report["errors"]) < 20:
+                        report["errors"].append(f"{describe(kind, args)}: {e}")
+                if progress:
+                    progress(report)
+
+        await asyncio.gather(*[worker() for _ in range(max(1, self.concurrency))])
+        return report
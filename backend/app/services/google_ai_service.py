@@ -1,66 +1,266 @@
-import google.generativeai as genai
-from typing import Dict, List, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
 import json
 import logging
+import threading
+import time
+from ..core.cache.cache import cache, make_key
+from ..core.circuit_breaker import CircuitOpenError, breaker_for
 from ..core.config import settings
+from ..core.deadline import DeadlineExceeded
+from ..core.hedging import HedgePolicy
+from ..core.metrics import metrics
+from ..core.timing import timed
+from ..core.tracing import KIND_CLIENT, span
+from .model_router import model_router
+from .semantic_cache import semantic_cache
 
 logger = logging.getLogger(__name__)
 
+# Opens when Gemini errors or is slow, so requests get the fallback immediately
+gemini_breaker = breaker_for(
+    "gemini",
+    timeout_seconds=settings.gemini_timeout_seconds,
+    slow_call_seconds=settings.gemini_slow_call_seconds
+)
+
+# Re-sends calls slower than the learned per-method percentile (off unless GEMINI_HEDGING_ENABLED)
+gemini_hedging = HedgePolicy(
+    "gemini",
+    percentile=settings.gemini_hedge_percentile,
+    min_samples=settings.gemini_hedge_min_samples,
+    budget_ratio=settings.gemini_hedge_budget_ratio,
+    enabled=settings.gemini_hedging_enabled
+)
+metrics.register_gauge("hedge.gemini", gemini_hedging.snapshot)
+
+# Parsed responses keyed by prompt; empty parses and fallbacks are never stored
+generation_caches = {
+    "trip_options": cache.namespace("trip_options", ttl=settings.cache_ttl_generated_seconds),
+    "daily_itinerary": cache.namespace("daily_itinerary", ttl=settings.cache_ttl_generated_seconds),
+}
+
+# Recommendations per destination and interests, served stale while a refresh runs
+recommendations_cache = cache.namespace("recommendations", ttl=settings.cache_ttl_recommendations_seconds)
+
+
+def trip_ai_data(trip) -> Dict[str, Any]:
+    """The trip fields prompts are built from (same input, same prompt, same cache key)"""
+    return {
+        "destination": trip.destination,
+        "start_date": trip.start_date.isoformat(),
+        "end_date": trip.end_date.isoformat(),
+        "total_budget": trip.total_budget,
+        "travelers": trip.travelers,
+        "themes": trip.themes or [],
+        "accommodation_preference": trip.accommodation_preference,
+        "transportation_preference": trip.transportation_preference,
+        "food_preference": trip.food_preference,
+        "special_requirements": trip.special_requirements,
+        "duration": (trip.end_date - trip.start_date).days + 1
+    }
+
+
+def recommendation_key(destination: str, interests: List[str]) -> str:
+    """Cache key for a destination and set of interests, ignoring case, spacing and order"""
+    normalized = sorted({interest.strip().lower() for interest in interests if interest and interest.strip()})
+    return make_key(" ".join(destination.lower().split()), *normalized)
+
+
+# Marks a client that has not been created yet (created once, under the lock)
+_UNSET = object()
+_init_lock = threading.Lock()
+
 
 class GoogleAIService:
+    """
+    Gemini-backed generation. The SDK is imported and configured on first
+    use (or by ``connect`` at startup), not when this module is imported.
+    Coroutines check ``available()``, which waits for that in a worker
+    thread instead of blocking the event loop on the lock.
+    """
+
     def __init__(self):
+        self._models = {}
+        self._model = _UNSET
+    
+    @property
+    def model(self):
+        """The default Gemini model, or None when the API key is not configured"""
+        if getattr(self, "_model", _UNSET) is _UNSET:
+            with _init_lock:
+                if getattr(self, "_model", _UNSET) is _UNSET:
+                    self._model = self._create_model()
+        return self._model
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+    
+    def connect(self) -> bool:
+        """Import and configure the SDK now (blocking); True if Gemini is available"""
+        return self.model is not None
+    
+    async def available(self) -> bool:
+        """``connect`` for the event loop: True if Gemini is available"""
+        if getattr(self, "_model", _UNSET) is _UNSET:
+            await asyncio.to_thread(self.connect)
+        return self._model is not None
+    
+    def _create_model(self):
         if not settings.google_ai_api_key or settings.google_ai_api_key == "your_google_ai_studio_api_key_here":
             logger.warning("Google AI API key not configured")
-            self.model = None
-            return
+            return None
         
         try:
+            import google.generativeai as genai
             genai.configure(api_key=settings.google_ai_api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            return genai.GenerativeModel(settings.gemini_model)
         except Exception as e:
             logger.error(f"Error initializing Google AI service: {e}")
-            self.model = None
+            return None
     
-    async def generate_trip_options(self, trip_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def generate_trip_options(self, trip_data: Dict[str, Any], refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Generate multiple trip options using Google Gemini AI
+
+        Options generated for a similar trip (see ``semantic_cache``) are
+        reused, re-dated and rescaled to this trip's budget. ``refresh``
+        skips both caches and always calls Gemini.
         """
-        if not self.model:
+        if not await self.available():
             logger.warning("Google AI model not available, using fallback options")
             return self._get_fallback_trip_options(trip_data)
         
         try:
+            similar = None if refresh else semantic_cache.lookup(trip_data)
+            if similar:
+                return similar
+            
             prompt = self._create_trip_options_prompt(trip_data)
-            response = await self._generate_content(prompt)
-            return self._parse_trip_options_response(response)
+            options = await self._generate(
+                "trip_options", prompt, self._parse_trip_options_response, request=trip_data, refresh=refresh
+            )
+            semantic_cache.add(trip_data, options)
+            return options
+        except CircuitOpenError:
+            logger.warning("Gemini circuit open, using fallback options")
+            return self._get_fallback_trip_options(trip_data)
         except Exception as e:
             logger.error(f"Error generating trip options: {e}")
             return self._get_fallback_trip_options(trip_data)
     
+    async def regenerate_trip_options(self, trip_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Generate a new set of trip options, bypassing both caches
+
+        Unlike ``generate_trip_options`` this raises instead of returning
+        the sample fallback, so callers never replace real options with it.
+        """
+        prompt = self._create_trip_options_prompt(trip_data)
+        options = await self._generate(
+            "trip_options", prompt, self._parse_trip_options_response, request=trip_data, refresh=True
+        )
+        if not options:
+            raise ValueError("Could not parse the trip options generated")
+        semantic_cache.add(trip_data, options)
+        return options
+    
     async def generate_daily_itinerary(self, trip_data: Dict[str, Any], day_number: int) -> Dict[str, Any]:
         """
         Generate detailed daily itinerary for a specific day
         """
         try:
             prompt = self._create_daily_itinerary_prompt(trip_data, day_number)
-            response = await self._generate_content(prompt)
-            return self._parse_daily_itinerary_response(response)
+            return await self._generate(
+                "daily_itinerary", prompt, self._parse_daily_itinerary_response, request=trip_data
+            )
+        except CircuitOpenError:
+            logger.warning("Gemini circuit open, using fallback itinerary")
+            return self._get_fallback_daily_itinerary(trip_data, day_number)
         except Exception as e:
             logger.error(f"Error generating daily itinerary: {e}")
             return self._get_fallback_daily_itinerary(trip_data, day_number)
     
+    async def regenerate_daily_itinerary(self, trip_data: Dict[str, Any], day_number: int) -> Dict[str, Any]:
+        """
+        Generate a new itinerary for one day, bypassing the cache
+
+        Unlike ``generate_daily_itinerary`` this raises instead of returning
+        the sample fallback, so callers never overwrite a real plan with it.
+        """
+        prompt = self._create_daily_itinerary_prompt(trip_data, day_number)
+        itinerary = await self._generate(
+            "daily_itinerary", prompt, self._parse_daily_itinerary_response, request=trip_data, refresh=True
+        )
+        if not itinerary:
+            raise ValueError(f"Could not parse the itinerary generated for day {day_number}")
+        return itinerary
+    
     async def get_travel_recommendations(self, destination: str, interests: List[str]) -> Dict[str, Any]:
         """
         Get travel recommendations for a destination
+
+        Cached per destination and interests: a cached answer is returned
+        immediately, and one older than RECOMMENDATIONS_FRESH_SECONDS is
+        refreshed in the background.
         """
         try:
-            prompt = self._create_recommendations_prompt(destination, interests)
-            response = await self._generate_content(prompt)
-            return self._parse_recommendations_response(response)
+            return await recommendations_cache.get_or_revalidate(
+                recommendation_key(destination, interests),
+                lambda: self._fetch_recommendations(destination, interests),
+                fresh_seconds=settings.recommendations_fresh_seconds,
+                should_cache=bool
+            )
+        except CircuitOpenError:
+            logger.warning("Gemini circuit open, using fallback recommendations")
+            return self._get_fallback_recommendations(destination, interests)
         except Exception as e:
             logger.error(f"Error getting travel recommendations: {e}")
             return self._get_fallback_recommendations(destination, interests)
     
+    async def warm_travel_recommendations(self, destination: str, interests: List[str],
+                                          throttle: Optional[Callable[[], Awaitable[None]]] = None) -> bool:
+        """
+        Fetch recommendations into the cache unless a fresh entry exists
+
+        Returns True if Gemini was called, False if the entry was fresh;
+        raises if nothing could be cached. ``throttle`` is awaited just
+        before Gemini is called.
+        """
+        key = recommendation_key(destination, interests)
+        age = await recommendations_cache.age(key)
+        if age is not None and age < settings.recommendations_fresh_seconds:
+            return False
+        if throttle:
+            await throttle()
+        if not await recommendations_cache.refresh(
+            key, lambda: self._fetch_recommendations(destination, interests), should_cache=bool
+        ):
+            raise RuntimeError(f"No recommendations cached for {destination}")
+        return True
+    
+    async def warm_trip_options(self, trip_data: Dict[str, Any],
+                                throttle: Optional[Callable[[], Awaitable[None]]] = None) -> bool:
+        """Generate trip options into the cache unless cached; True if Gemini was called"""
+        prompt = self._create_trip_options_prompt(trip_data)
+        if await generation_caches["trip_options"].get(make_key("trip_options", prompt)) is not None:
+            return False
+        if throttle:
+            await throttle()
+        options = await self._generate(
+            "trip_options", prompt, self._parse_trip_options_response, request=trip_data
+        )
+        if not options:
+            raise RuntimeError(f"No trip options generated for {trip_data.get('destination')}")
+        return True
+    
+    async def _fetch_recommendations(self, destination: str, interests: List[str]) -> Dict[str, Any]:
+        prompt = self._create_recommendations_prompt(destination, interests)
+        return await self._generate(
+            "recommendations", prompt, self._parse_recommendations_response, request={"themes": interests}
+        )
+    
     def _create_trip_options_prompt(self, trip_data: Dict[str, Any]) -> str:
         """Create prompt for generating trip options"""
         return f"""
@@ -256,12 +456,86 @@ class GoogleAIService:
         }}
         """
     
-    async def _generate_content(self, prompt: str) -> str:
-        """Generate content using Gemini AI"""
-        if not self.model:
+    async def _generate(self, method: str, prompt: str, parse: Callable[[str], Any],
+                        request: Optional[Dict[str, Any]] = None, refresh: bool = False) -> Any:
+        """
+        Generate with the model the router picks for this request and parse the response
+
+        Upstream errors and unparseable responses are reported to the
+        router as failures of that model for ``method``. Non-empty results
+        of methods in ``generation_caches`` are cached by prompt, and
+        identical concurrent prompts share one call. With ``refresh`` the
+        cached result is ignored and replaced.
+        """
+        with span(f"ai.{method}", **{
+            "trip.destination": (request or {}).get("destination"),
+            "ai.prompt_chars": len(prompt),
+            "ai.refresh": refresh,
+        }):
+            if method not in generation_caches:
+                return await self._generate_uncached(method, prompt, parse, request)
+            key = make_key(method, prompt)
+            if refresh:
+                result = await self._generate_uncached(method, prompt, parse, request)
+                if result:
+                    await generation_caches[method].set(key, result)
+                return result
+            return await generation_caches[method].get_or_set(
+                key,
+                lambda: self._generate_uncached(method, prompt, parse, request),
+                should_cache=bool
+            )
+    
+    async def _generate_uncached(self, method: str, prompt: str, parse: Callable[[str], Any],
+                                 request: Optional[Dict[str, Any]] = None) -> Any:
+        model_name = model_router.choose(method, request)
+        start = time.perf_counter()
+        try:
+            response = await self._generate_content(prompt, method=method, model_name=model_name)
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except Exception:
+            model_router.record(method, model_name, False, time.perf_counter() - start)
+            raise
+        
+        with span("ai.parse", **{"ai.response_chars": len(response)}):
+            parsed = parse(response)
+        model_router.record(method, model_name, bool(parsed), time.perf_counter() - start)
+        return parsed
+    
+    def _get_model(self, model_name: Optional[str] = None):
+        """The configured default model, or another Gemini model created on first use"""
+        if model_name is None or model_name == settings.gemini_model:
+            return self.model
+        model = self._models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+            model = self._models[model_name] = genai.GenerativeModel(model_name)
+        return model
+    
+    async def _generate_content(self, prompt: str, method: str = "generate", model_name: Optional[str] = None) -> str:
+        """
+        Generate content using Gemini AI
+
+        Runs in a worker thread through the circuit breaker; with hedging
+        enabled, a call slower than usual for ``method`` on this model is
+        sent twice.
+        """
+        if not await self.available():
             raise Exception("Google AI model not available")
         
-        response = self.model.generate_content(prompt)
+        model = self._get_model(model_name)
+        with timed("gemini"), span("gemini.generate_content", KIND_CLIENT, **{
+            "ai.method": method,
+            "ai.model": model_name or settings.gemini_model,
+            "ai.prompt_chars": len(prompt),
+        }) as call:
+            response = await gemini_hedging.run(
+                f"{method}:{model_name or settings.gemini_model}",
+                lambda: gemini_breaker.call(model.generate_content, prompt)
+            )
+            if call:
+                call.set("ai.response_chars", len(response.text))
         return response.text
     
     def _parse_trip_options_response(self, response: str) -> List[Dict[str, Any]]:
@@ -1,31 +1,102 @@
-import googlemaps
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
 import logging
+import threading
+from ..core.cache.cache import cache, make_key
+from ..core.circuit_breaker import CircuitOpenError, breaker_for
 from ..core.config import settings
+from ..core.timing import timed
+from ..core.tracing import KIND_CLIENT, span
 
 logger = logging.getLogger(__name__)
 
+# Opens when Maps errors or is slow, so requests get the fallback immediately
+maps_breaker = breaker_for(
+    "maps",
+    timeout_seconds=settings.maps_timeout_seconds,
+    slow_call_seconds=settings.maps_slow_call_seconds
+)
+
+# Only real Maps results are cached; fallbacks are returned but never stored
+geocode_cache = cache.namespace("geocode", ttl=settings.cache_ttl_geocode_seconds)
+places_cache = cache.namespace("places", ttl=settings.cache_ttl_places_seconds)
+directions_cache = cache.namespace("directions", ttl=settings.cache_ttl_directions_seconds)
+
+
+# Marks a client that has not been created yet (created once, under the lock)
+_UNSET = object()
+_init_lock = threading.Lock()
+
 
 class GoogleMapsService:
+    """
+    Google Maps lookups. The googlemaps client is imported and created on
+    first use (or by ``connect`` at startup), not when this module is imported.
+    Coroutines check ``available()``, which waits for that in a worker
+    thread instead of blocking the event loop on the lock.
+    """
+
     def __init__(self):
+        self._client = _UNSET
+    
+    @property
+    def client(self):
+        """The googlemaps client, or None when the API key is not configured"""
+        if getattr(self, "_client", _UNSET) is _UNSET:
+            with _init_lock:
+                if getattr(self, "_client", _UNSET) is _UNSET:
+                    self._client = self._create_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    def connect(self) -> bool:
+        """Import and create the client now (blocking); True if Maps is available"""
+        return self.client is not None
+    
+    async def available(self) -> bool:
+        """``connect`` for the event loop: True if Maps is available"""
+        if getattr(self, "_client", _UNSET) is _UNSET:
+            await asyncio.to_thread(self.connect)
+        return self._client is not None
+    
+    def _create_client(self):
         if not settings.google_maps_api_key or settings.google_maps_api_key == "your_google_maps_api_key_here":
             logger.warning("Google Maps API key not configured")
-            self.client = None
-        else:
-            try:
-                self.client = googlemaps.Client(key=settings.google_maps_api_key)
-            except Exception as e:
-                logger.error(f"Error initializing Google Maps client: {e}")
-                self.client = None
+            return None
+        
+        try:
+            import googlemaps
+            return googlemaps.Client(key=settings.google_maps_api_key)
+        except Exception as e:
+            logger.error(f"Error initializing Google Maps client: {e}")
+            return None
+    
+    async def _call(self, method: str, **kwargs) -> Any:
+        """Call a googlemaps client method in a worker thread, through the circuit breaker"""
+        attributes = {f"maps.{key}": value for key, value in kwargs.items() if isinstance(value, (str, int, float))}
+        with timed("maps"), span(f"maps.{method}", KIND_CLIENT, **attributes) as call:
+            result = await maps_breaker.call(getattr(self.client, method), **kwargs)
+            if call and isinstance(result, dict) and isinstance(result.get("results"), list):
+                call.set("maps.results", len(result["results"]))
+            return result
     
     async def get_place_details(self, place_id: str) -> Dict[str, Any]:
         """Get detailed information about a place"""
-        if not self.client:
+        if not await self.available():
             return self._get_fallback_place_details(place_id)
         
         try:
-            place = self.client.place(place_id=place_id)
-            return self._format_place_details(place)
+            async def fetch():
+                place = await self._call("place", place_id=place_id)
+                return self._format_place_details(place)
+            
+            return await places_cache.get_or_set(make_key("details", place_id), fetch)
+        except CircuitOpenError:
+            logger.warning("Maps circuit open, using fallback")
+            return self._get_fallback_place_details(place_id)
         except Exception as e:
             logger.error(f"Error getting place details: {e}")
             return self._get_fallback_place_details(place_id)
@@ -33,21 +104,29 @@ class GoogleMapsService:
     async def search_places(self, query: str, location: Optional[Tuple[float, float]] = None, 
                           radius: int = 5000, place_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Search for places near a location"""
-        if not self.client:
+        if not await self.available():
             return self._get_fallback_search_results(query)
         
-        try:
+        async def fetch():
             if location:
-                places = self.client.places_nearby(
+                places = await self._call(
+                    "places_nearby",
                     location=location,
                     radius=radius,
                     keyword=query,
                     type=place_type
                 )
             else:
-                places = self.client.places(query=query, type=place_type)
+                places = await self._call("places", query=query, type=place_type)
             
             return [self._format_place_details(place) for place in places.get('results', [])]
+        
+        try:
+            key = make_key("search", query, *(location or ()), radius, place_type)
+            return await places_cache.get_or_set(key, fetch)
+        except CircuitOpenError:
+            logger.warning("Maps circuit open, using fallback")
+            return self._get_fallback_search_results(query)
         except Exception as e:
             logger.error(f"Error searching places: {e}")
             return self._get_fallback_search_results(query)
@@ -55,35 +134,68 @@ class GoogleMapsService:
     async def get_directions(self, origin: str, destination: str, 
                            mode: str = "driving") -> Dict[str, Any]:
         """Get directions between two points"""
-        if not self.client:
+        if not await self.available():
             return self._get_fallback_directions(origin, destination)
         
-        try:
-            directions = self.client.directions(
+        async def fetch():
+            directions = await self._call(
+                "directions",
                 origin=origin,
                 destination=destination,
                 mode=mode
             )
             return self._format_directions(directions)
+        
+        try:
+            return await directions_cache.get_or_set(make_key(origin, destination, mode), fetch, should_cache=bool)
+        except CircuitOpenError:
+            logger.warning("Maps circuit open, using fallback")
+            return self._get_fallback_directions(origin, destination)
         except Exception as e:
             logger.error(f"Error getting directions: {e}")
             return self._get_fallback_directions(origin, destination)
     
     async def geocode_address(self, address: str) -> Optional[Tuple[float, float]]:
         """Convert address to coordinates"""
-        if not self.client:
+        if not await self.available():
             return self._get_fallback_coordinates(address)
         
-        try:
-            geocode_result = self.client.geocode(address)
+        async def fetch():
+            geocode_result = await self._call("geocode", address=address)
             if geocode_result:
                 location = geocode_result[0]['geometry']['location']
                 return (location['lat'], location['lng'])
+            return None
+        
+        try:
+            coordinates = await geocode_cache.get_or_set(self._geocode_key(address), fetch)
+            if coordinates:
+                return tuple(coordinates)
+        except CircuitOpenError:
+            logger.warning("Maps circuit open, using fallback")
         except Exception as e:
             logger.error(f"Error geocoding address: {e}")
         
         return self._get_fallback_coordinates(address)
     
+    async def warm_geocode(self, address: str, throttle: Optional[Callable[[], Awaitable[None]]] = None) -> bool:
+        """Geocode into the cache unless cached; True if Maps was called (after awaiting ``throttle``)"""
+        if not await self.available():
+            raise RuntimeError("Google Maps client not available")
+        key = self._geocode_key(address)
+        if await geocode_cache.get(key) is not None:
+            return False
+        if throttle:
+            await throttle()
+        await self.geocode_address(address)
+        if await geocode_cache.get(key) is None:
+            raise RuntimeError(f"Could not geocode {address}")
+        return True
+    
+    @staticmethod
+    def _geocode_key(address: str) -> str:
+        return " ".join(address.lower().split())
+    
     async def get_nearby_restaurants(self, location: Tuple[float, float], 
                                    radius: int = 1000) -> List[Dict[str, Any]]:
         """Get nearby restaurants"""
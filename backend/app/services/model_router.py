@@ -0,0 +1,136 @@
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+import itertools
+import logging
+
+from ..core.config import settings
+from ..core.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def parse_method_models(value: str) -> Dict[str, str]:
+    """Parse "method=model,method=model" into a dict"""
+    routes = {}
+    for item in value.split(","):
+        if "=" in item:
+            method, model = item.split("=", 1)
+            routes[method.strip()] = model.strip()
+    return routes
+
+
+class ModelRouter:
+    """
+    Picks the Gemini model for each call.
+
+    Each method has a base model (``method_models``, else
+    ``default_model``). Large requests go to ``strong_model``: trips of
+    at least ``strong_min_days`` days or with at least
+    ``strong_min_themes`` themes. The choice then adapts to the
+    outcomes observed per method and model:
+
+    - if the base model's responses fail to parse at
+      ``failure_threshold`` or more, the method escalates to the strong
+      model;
+    - if the strong model fails that often, or its p90 latency exceeds
+      ``max_latency_seconds``, the method falls back to its base model.
+
+    While a method is rerouted, one call in ``1 / explore_ratio`` still
+    goes to the preferred model, so recovery is noticed.
+    """
+
+    def __init__(self, default_model: str, strong_model: str, method_models: Optional[Dict[str, str]] = None,
+                 strong_min_days: int = 7, strong_min_themes: int = 3, failure_threshold: float = 0.3,
+                 max_latency_seconds: Optional[float] = None, min_samples: int = 10,
+                 window_size: int = 50, explore_ratio: float = 0.1):
+        self.default_model = default_model
+        self.strong_model = strong_model
+        self.method_models = method_models or {}
+        self.strong_min_days = strong_min_days
+        self.strong_min_themes = strong_min_themes
+        self.failure_threshold = failure_threshold
+        self.max_latency_seconds = max_latency_seconds
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.explore_every = max(1, round(1 / explore_ratio)) if explore_ratio > 0 else 0
+        self._outcomes: Dict[Tuple[str, str], deque] = {}
+        self._latencies: Dict[Tuple[str, str], Histogram] = {}
+        self._counter = itertools.count(1)
+
+    def base_model(self, method: str) -> str:
+        return self.method_models.get(method, self.default_model)
+
+    def is_large(self, request: Optional[Dict[str, Any]]) -> bool:
+        """Whether a request is big enough for the strong model"""
+        if not request:
+            return False
+        duration = request.get("duration")
+        if isinstance(duration, (int, float)) and duration >= self.strong_min_days:
+            return True
+        return len(request.get("themes") or []) >= self.strong_min_themes
+
+    def failure_rate(self, method: str, model: str) -> Optional[float]:
+        """Recent failure rate, or None while there are too few samples"""
+        outcomes = self._outcomes.get((method, model))
+        if not outcomes or len(outcomes) < self.min_samples:
+            return None
+        return outcomes.count(False) / len(outcomes)
+
+    def _unhealthy(self, method: str, model: str) -> bool:
+        rate = self.failure_rate(method, model)
+        if rate is not None and rate >= self.failure_threshold:
+            return True
+        if model == self.strong_model and self.max_latency_seconds:
+            latencies = self._latencies.get((method, model))
+            if latencies and len(latencies.samples) >= self.min_samples:
+                return latencies.percentile(90) > self.max_latency_seconds
+        return False
+
+    def choose(self, method: str, request: Optional[Dict[str, Any]] = None) -> str:
+        """Model to use for one call of ``method`` on ``request``"""
+        base = self.base_model(method)
+        preferred = self.strong_model if self.is_large(request) else base
+        alternative = base if preferred == self.strong_model else self.strong_model
+
+        model = preferred
+        if preferred != alternative and self._unhealthy(method, preferred):
+            exploring = self.explore_every and next(self._counter) % self.explore_every == 0
+            if not exploring and not self._unhealthy(method, alternative):
+                model = alternative
+
+        metrics.increment(f"model_router.{method}.{model}")
+        return model
+
+    def record(self, method: str, model: str, ok: bool, latency: float) -> None:
+        """Record whether a call produced a usable response, and how long it took"""
+        key = (method, model)
+        outcomes = self._outcomes.get(key)
+        if outcomes is None:
+            outcomes = self._outcomes[key] = deque(maxlen=self.window_size)
+            self._latencies[key] = Histogram(max_samples=self.window_size)
+        outcomes.append(ok)
+        if ok:
+            self._latencies[key].observe(latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            f"{method}:{model}": {
+                "failure_rate": self.failure_rate(method, model),
+                "p90_seconds": round(self._latencies[(method, model)].percentile(90), 3),
+                "samples": len(outcomes),
+            }
+            for (method, model), outcomes in self._outcomes.items()
+        }
+
+
+# Create router instance
+model_router = ModelRouter(
+    default_model=settings.gemini_model,
+    strong_model=settings.gemini_strong_model,
+    method_models=parse_method_models(settings.gemini_method_models),
+    strong_min_days=settings.gemini_strong_min_days,
+    strong_min_themes=settings.gemini_strong_min_themes,
+    failure_threshold=settings.gemini_router_failure_threshold,
+    max_latency_seconds=settings.gemini_router_max_latency_seconds,
+)
+metrics.register_gauge("model_router.gemini", model_router.snapshot)
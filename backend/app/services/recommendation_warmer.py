@@ -0,0 +1,110 @@
+from collections import Counter
+from sqlalchemy import select
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import logging
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.rate_limit import MemoryStore
+from ..models.trip import Trip
+from .google_ai_service import google_ai_service, recommendation_key
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationWarmer:
+    """
+    Keeps cached recommendations for the most common destination and
+    interest combinations fresh, so those trips never wait for Gemini.
+
+    Popularity comes from the most recent ``sample_size`` trips. Each pass
+    fetches the top ``top`` combinations one at a time, skipping those
+    whose cache entry is still fresh, at most ``gemini_per_minute`` Gemini
+    calls a minute (a token bucket, as in ``CacheWarmer``).
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal, top: int = 50,
+                 interval_seconds: float = 3600, sample_size: int = 5000, gemini_per_minute: float = 10):
+        self.session_factory = session_factory
+        self.top = top
+        self.interval_seconds = interval_seconds
+        self.sample_size = sample_size
+        self.gemini_per_minute = gemini_per_minute
+        self._buckets = MemoryStore()
+        self._task: Optional[asyncio.Task] = None
+
+    def popular_combinations(self) -> List[Tuple[str, List[str]]]:
+        """The most requested (destination, interests) pairs among recent trips"""
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(Trip.destination, Trip.themes)
+                .where(Trip.deleted_at.is_(None))
+                .order_by(Trip.created_at.desc())
+                .limit(self.sample_size)
+            ).all()
+        finally:
+            db.close()
+
+        counts = Counter()
+        examples = {}
+        for destination, themes in rows:
+            key = recommendation_key(destination, themes or [])
+            counts[key] += 1
+            examples.setdefault(key, (destination, list(themes or [])))
+        return [examples[key] for key, _ in counts.most_common(self.top)]
+
+    async def _throttle(self) -> None:
+        """Wait for a token in the Gemini bucket"""
+        rate = self.gemini_per_minute / 60
+        while True:
+            allowed, tokens = await self._buckets.consume("gemini", 1, rate)
+            if allowed:
+                return
+            await asyncio.sleep((1 - tokens) / rate)
+
+    async def warm(self) -> int:
+        """Fetch recommendations for popular combinations that are missing or stale"""
+        if not await google_ai_service.available():
+            return 0
+        warmed = 0
+        for destination, interests in await asyncio.to_thread(self.popular_combinations):
+            try:
+                if await google_ai_service.warm_travel_recommendations(destination, interests, throttle=self._throttle):
+                    warmed += 1
+            except Exception as e:
+                logger.warning(f"Could not warm recommendations for {destination}: {e}")
+        return warmed
+
+    async def run(self) -> None:
+        """Warm periodically in the background"""
+        while True:
+            try:
+                warmed = await self.warm()
+                if warmed:
+                    logger.info(f"Warmed recommendations for {warmed} destinations")
+            except Exception as e:
+                logger.error(f"Error warming recommendations: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create warmer instance
+recommendation_warmer = RecommendationWarmer(
+    top=settings.recommendations_warm_top,
+    interval_seconds=settings.recommendations_warm_interval_seconds,
+    gemini_per_minute=settings.recommendations_warm_per_minute
+)
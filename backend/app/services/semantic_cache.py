@@ -0,0 +1,287 @@
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import copy
+import logging
+import math
+import re
+import zlib
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words that do not distinguish one destination from another
+DESTINATION_STOPWORDS = {"india", "trip", "to", "the", "city", "state", "district", "tour", "holiday", "in"}
+
+# Feature blocks: (hashed dimensions, weight). Weights sum to 1, so the dot
+# product of two vectors is the weighted mean of the per-block cosines.
+DESTINATION_DIMS, THEME_DIMS, REQUIREMENT_DIMS = 256, 128, 256
+DESTINATION_WEIGHT, THEME_WEIGHT, REQUIREMENT_WEIGHT = 0.45, 0.25, 0.1
+BUDGET_WEIGHT, TRAVELERS_WEIGHT = 0.15, 0.05
+
+# Whatever the overall threshold, the destination must match closely and any
+# special requirements (accessibility, diet, ...) must largely agree
+DESTINATION_SLICE = slice(0, DESTINATION_DIMS)
+REQUIREMENT_SLICE = slice(DESTINATION_DIMS + THEME_DIMS, DESTINATION_DIMS + THEME_DIMS + REQUIREMENT_DIMS)
+MIN_DESTINATION_SIMILARITY = 0.8
+MIN_REQUIREMENT_SIMILARITY = 0.6
+
+# Radial bins for numeric features: log2 of budget per traveler per day, and
+# travelers, as (first center, spacing, count)
+BUDGET_BINS = (7.0, 0.25, 40)
+BUDGET_WIDTH = 0.35
+TRAVELER_BINS = (1.0, 1.0, 12)
+TRAVELER_WIDTH = 1.0
+
+DIMS = DESTINATION_DIMS + THEME_DIMS + REQUIREMENT_DIMS + BUDGET_BINS[2] + TRAVELER_BINS[2]
+
+# Rows the index starts with on its first add; it doubles up to max_entries
+INITIAL_CAPACITY = 64
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding ("beaches" -> "beach", "temples" -> "temple")"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _words(text: str) -> List[str]:
+    return [_stem(word) for word in WORD.findall(text.lower())]
+
+
+def _hashed(features: List[str], dims: int) -> "np.ndarray":
+    """Signed feature hashing into a unit vector (zero-safe)"""
+    import numpy as np
+
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature in features:
+        digest = zlib.crc32(feature.encode())
+        vector[digest % dims] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _radial(value: float, bins: tuple, width: float) -> "np.ndarray":
+    import numpy as np
+
+    first, spacing, count = bins
+    centers = first + spacing * np.arange(count)
+    vector = np.exp(-(((centers - value) / width) ** 2)).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def normalize_destination(destination: str) -> str:
+    words = [word for word in _words(destination) if word not in DESTINATION_STOPWORDS]
+    return " ".join(words) or destination.strip().lower()
+
+
+def embed_trip(trip_data: Dict[str, Any]) -> "np.ndarray":
+    """
+    Embed a trip request as a unit vector.
+
+    Destination uses character trigrams (so spelling variants stay close),
+    themes and special requirements use words and word pairs, and budget
+    per traveler per day and party size use radial bins, so 40k and 42k
+    budgets are near each other. Duration is not embedded: it must match.
+    """
+    import numpy as np
+
+    destination = normalize_destination(trip_data.get("destination") or "")
+    padded = f"  {destination}  "
+    trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    themes = sorted({word for theme in trip_data.get("themes") or [] for word in _words(theme)})
+    requirement_words = _words(trip_data.get("special_requirements") or "")
+    requirements = requirement_words + [" ".join(pair) for pair in zip(requirement_words, requirement_words[1:])]
+
+    travelers = max(1, int(trip_data.get("travelers") or 1))
+    duration = max(1, int(trip_data.get("duration") or 1))
+    per_day = max(1.0, float(trip_data.get("total_budget") or 1)) / travelers / duration
+
+    return np.concatenate([
+        math.sqrt(DESTINATION_WEIGHT) * _hashed(trigrams, DESTINATION_DIMS),
+        math.sqrt(THEME_WEIGHT) * _hashed(themes or ["<none>"], THEME_DIMS),
+        math.sqrt(REQUIREMENT_WEIGHT) * _hashed(requirements or ["<none>"], REQUIREMENT_DIMS),
+        math.sqrt(BUDGET_WEIGHT) * _radial(math.log2(per_day), BUDGET_BINS, BUDGET_WIDTH),
+        math.sqrt(TRAVELERS_WEIGHT) * _radial(min(travelers, 12), TRAVELER_BINS, TRAVELER_WIDTH),
+    ])
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+
+
+# Amounts that follow the trip's budget when options are reused for another one
+COST_KEYS = ("cost", "total_cost", "daily_budget")
+
+
+def _scale_costs(value: Any, ratio: float) -> Any:
+    """Scale every cost, total_cost and daily_budget number in the options by ``ratio``"""
+    if isinstance(value, list):
+        return [_scale_costs(item, ratio) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: round(item * ratio) if key in COST_KEYS and isinstance(item, (int, float))
+            else _scale_costs(item, ratio)
+            for key, item in value.items()
+        }
+    return value
+
+
+def adapt_options(options: List[Dict[str, Any]], source: Dict[str, Any], target: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Re-date the daily itineraries and rescale costs from ``source``'s trip to ``target``'s"""
+    source_budget = float(source.get("total_budget") or 0)
+    target_budget = float(target.get("total_budget") or 0)
+    adapted = copy.deepcopy(options)
+    if source_budget and target_budget and source_budget != target_budget:
+        adapted = _scale_costs(adapted, target_budget / source_budget)
+
+    start = _parse_date(target.get("start_date"))
+    if start is not None:
+        for option in adapted:
+            for index, day in enumerate(option.get("daily_itineraries") or []):
+                if isinstance(day, dict) and "date" in day:
+                    day_number = day.get("day_number") if isinstance(day.get("day_number"), int) else index + 1
+                    day["date"] = (start + timedelta(days=day_number - 1)).isoformat()
+    return adapted
+
+
+class SemanticCache:
+    """
+    In-process vector index of generated trip options.
+
+    A request whose embedding has cosine similarity of at least
+    ``threshold`` with a stored request of the same duration (and a budget
+    within ``max_budget_ratio``) reuses that request's options, re-dated
+    and with costs rescaled. Vectors live in one NumPy matrix searched
+    with a single matrix-vector product; it is allocated on the first
+    ``add`` (NumPy is imported then, not with this module) and doubled as
+    needed up to ``max_entries`` rows, after which the oldest entries are
+    overwritten.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 5000, max_budget_ratio: float = 1.5,
+                 enabled: bool = True):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_budget_ratio = max_budget_ratio
+        self.enabled = enabled
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        """Make room for one more row, doubling the arrays up to max_entries"""
+        import numpy as np
+
+        capacity = min(self.max_entries, max(INITIAL_CAPACITY, 2 * len(self._entries)))
+        vectors = np.zeros((capacity, DIMS), dtype=np.float32)
+        durations = np.zeros(capacity, dtype=np.int32)
+        budgets = np.zeros(capacity, dtype=np.float64)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            durations[:self._size] = self._durations[:self._size]
+            budgets[:self._size] = self._budgets[:self._size]
+        self._vectors, self._durations, self._budgets = vectors, durations, budgets
+        self._entries.extend([None] * (capacity - len(self._entries)))
+
+    def _candidates(self, trip_data: Dict[str, Any]) -> "np.ndarray":
+        """Indices of stored entries with the same duration and a comparable budget"""
+        import numpy as np
+
+        duration = int(trip_data.get("duration") or 0)
+        budget = float(trip_data.get("total_budget") or 0)
+        mask = self._durations[:self._size] == duration
+        if budget > 0:
+            ratio = self._budgets[:self._size] / budget
+            mask &= (ratio <= self.max_budget_ratio) & (ratio >= 1 / self.max_budget_ratio)
+        return np.flatnonzero(mask)
+
+    def lookup(self, trip_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Adapted options of the most similar stored request, or None below the threshold"""
+        if not self.enabled or not self._size:
+            return None
+        candidates = self._candidates(trip_data)
+        if not len(candidates):
+            metrics.increment("semantic_cache.misses")
+            return None
+
+        import numpy as np
+
+        query = embed_trip(trip_data)
+        vectors = self._vectors[candidates]
+        scores = vectors @ query
+        destination = vectors[:, DESTINATION_SLICE] @ query[DESTINATION_SLICE] / DESTINATION_WEIGHT
+        requirements = vectors[:, REQUIREMENT_SLICE] @ query[REQUIREMENT_SLICE] / REQUIREMENT_WEIGHT
+        scores[(destination < MIN_DESTINATION_SIMILARITY) | (requirements < MIN_REQUIREMENT_SIMILARITY)] = -1
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            metrics.increment("semantic_cache.misses")
+            return None
+
+        entry = self._entries[candidates[best]]
+        metrics.increment("semantic_cache.hits")
+        logger.info(
+            f"Reusing trip options for {entry['trip_data'].get('destination')} "
+            f"for {trip_data.get('destination')} (similarity {scores[best]:.2f})"
+        )
+        return adapt_options(entry["options"], entry["trip_data"], trip_data)
+
+    def add(self, trip_data: Dict[str, Any], options: List[Dict[str, Any]]) -> None:
+        """Store generated options for later similar requests"""
+        if not self.enabled or not options:
+            return
+        slot = self._next
+        if slot >= len(self._entries):
+            self._grow()
+        self._vectors[slot] = embed_trip(trip_data)
+        self._durations[slot] = int(trip_data.get("duration") or 0)
+        self._budgets[slot] = float(trip_data.get("total_budget") or 0)
+        self._entries[slot] = {"trip_data": dict(trip_data), "options": copy.deepcopy(options)}
+        self._next = (slot + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self) -> None:
+        self._vectors = self._durations = self._budgets = None
+        self._entries: List[Optional[Dict[str, Any]]] = []
+        self._size = 0
+        self._next = 0
+
+    def stats(self) -> Dict[str, Any]:
+        hits = metrics.counter("semantic_cache.hits")
+        misses = metrics.counter("semantic_cache.misses")
+        return {
+            "entries": self._size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+# Create semantic cache instance
+semantic_cache = SemanticCache(
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    max_budget_ratio=settings.semantic_cache_max_budget_ratio,
+    enabled=settings.semantic_cache_enabled
+)
+metrics.register_gauge("semantic_cache", semantic_cache.stats)
@@ -0,0 +1,225 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List, Optional
+from collections import defaultdict
+from datetime import datetime
+import csv
+import io
+
+import orjson
+
+from ..api.serializers import serialize_trip, serialize_option, serialize_itinerary, TRIP_FIELDS
+from ..models.trip import Trip, DailyItinerary, TripOption
+
+SUPPORTED_FORMATS = ("ndjson", "csv", "parquet")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Trip columns in export order; options and itinerary are nested per trip
+EXPORT_FIELDS = tuple(field for field in TRIP_FIELDS if field != "selected_option")
+SCALAR_FIELDS = tuple(field for field in EXPORT_FIELDS if field != "themes")
+
+
+def _pyarrow():
+    """Import pyarrow lazily; it is only needed for Parquet exports"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("pyarrow is not installed; install it to export Parquet") from e
+    return pyarrow
+
+
+def _json_text(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class TripExporter:
+    """
+    Streams active trips, with their options and daily itineraries, as
+    NDJSON, CSV or Parquet.
+
+    Trips are read through a server-side cursor (``yield_per``, which turns
+    on ``stream_results``) in chunks of ``chunk_size``; the options and
+    itinerary days of each chunk are fetched with one ``IN`` query each on
+    a second connection, since an unbuffered cursor keeps its connection
+    busy on MySQL. Each chunk is encoded and yielded before the next is
+    read, so memory use depends on the chunk size, not on the table size.
+    """
+
+    def __init__(self, bind: Engine, fmt: str = "ndjson", chunk_size: int = 500,
+                 status: Optional[str] = None, include_options: bool = True,
+                 include_itinerary: bool = True):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == "parquet":
+            _pyarrow()
+        self.bind = bind
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.status = status
+        self.include_options = include_options
+        self.include_itinerary = include_itinerary
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.fmt]
+
+    def _trip_chunks(self, db: Session) -> Iterator[List[Trip]]:
+        query = select(Trip).where(Trip.deleted_at.is_(None)).order_by(Trip.id)
+        if self.status:
+            query = query.where(Trip.status == self.status)
+        result = db.execute(query.execution_options(yield_per=self.chunk_size))
+        for chunk in result.scalars().partitions():
+            yield chunk
+
+    def _children(self, db: Session, model, trip_ids: List[str], order_by, serializer) -> Dict[str, List[Dict]]:
+        grouped = defaultdict(list)
+        rows = db.execute(
+            select(model).where(model.trip_id.in_(trip_ids)).order_by(model.trip_id, order_by)
+        ).scalars()
+        for row in rows:
+            grouped[row.trip_id].append(serializer(row))
+        return grouped
+
+    def iter_records(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield lists of export records, one list per chunk of trips"""
+        stream_db = Session(bind=self.bind)
+        child_db = Session(bind=self.bind)
+        try:
+            for trips in self._trip_chunks(stream_db):
+                trip_ids = [trip.id for trip in trips]
+                options = itinerary = {}
+                if self.include_options:
+                    options = self._children(
+                        child_db, TripOption, trip_ids, TripOption.created_at, serialize_option
+                    )
+                if self.include_itinerary:
+                    itinerary = self._children(
+                        child_db, DailyItinerary, trip_ids, DailyItinerary.day_number, serialize_itinerary
+                    )
+                child_db.expunge_all()
+
+                records = []
+                for trip in trips:
+                    record = serialize_trip(trip, fields=EXPORT_FIELDS)
+                    if self.include_options:
+                        record["options"] = options.get(trip.id, [])
+                    if self.include_itinerary:
+                        record["itinerary"] = itinerary.get(trip.id, [])
+                    records.append(record)
+                yield records
+        finally:
+            child_db.close()
+            stream_db.close()
+
+    def _nested_fields(self) -> List[str]:
+        fields = []
+        if self.include_options:
+            fields.append("options")
+        if self.include_itinerary:
+            fields.append("itinerary")
+        return fields
+
+    def _iter_ndjson(self) -> Iterator[bytes]:
+        option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        for records in self.iter_records():
+            yield b"".join(orjson.dumps(record, option=option) for record in records)
+
+    def _iter_csv(self) -> Iterator[bytes]:
+        """One row per trip; themes, options and itinerary are JSON-encoded cells"""
+        columns = list(EXPORT_FIELDS) + self._nested_fields()
+        json_columns = {"themes", *self._nested_fields()}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for records in self.iter_records():
+            for record in records:
+                writer.writerow([
+                    _json_text(record[column]) if column in json_columns and record[column] is not None
+                    else record[column].isoformat() if isinstance(record[column], datetime)
+                    else record[column]
+                    for column in columns
+                ])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def _parquet_schema(self):
+        pa = _pyarrow()
+        types = {
+            "total_budget": pa.float64(),
+            "travelers": pa.int64(),
+            "start_date": pa.timestamp("us"),
+            "end_date": pa.timestamp("us"),
+            "created_at": pa.timestamp("us"),
+            "updated_at": pa.timestamp("us"),
+        }
+        fields = [pa.field(name, types.get(name, pa.string())) for name in SCALAR_FIELDS]
+        fields.append(pa.field("themes", pa.list_(pa.string())))
+        fields.extend(pa.field(name, pa.string()) for name in self._nested_fields())
+        return pa.schema(fields)
+
+    def _iter_parquet(self) -> Iterator[bytes]:
+        """One row group per chunk; nested options and itinerary are JSON strings"""
+        pa = _pyarrow()
+        schema = self._parquet_schema()
+        sink = _ChunkSink()
+        writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for records in self.iter_records():
+                columns = {name: [record[name] for record in records] for name in SCALAR_FIELDS}
+                columns["themes"] = [record["themes"] or [] for record in records]
+                for name in self._nested_fields():
+                    columns[name] = [_json_text(record[name]) for record in records]
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Yield the encoded export chunk by chunk"""
+        if self.fmt == "csv":
+            return self._iter_csv()
+        if self.fmt == "parquet":
+            return self._iter_parquet()
+        return self._iter_ndjson()
+
+    def write_to(self, output) -> int:
+        """Write the whole export to a binary file object; returns the number of bytes"""
+        written = 0
+        for data in self.iter_bytes():
+            output.write(data)
+            written += len(data)
+        return written
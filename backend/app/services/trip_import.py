@@ -0,0 +1,207 @@
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import csv
+import logging
+import uuid
+
+import orjson
+
+from ..api.schemas.trip import TripCreate
+from ..core.bulk import bulk_insert
+from ..models.trip import Trip
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+# Longest line held in memory while streaming; a longer one stops the import
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def _csv_themes(value: str) -> List[str]:
+    """CSV themes are either a JSON array or a pipe-separated list"""
+    value = value.strip()
+    if not value:
+        return []
+    if value.startswith("["):
+        return orjson.loads(value)
+    return [theme.strip() for theme in value.split("|") if theme.strip()]
+
+
+def _body_lines(chunks: Iterable[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> Iterator[str]:
+    """Split body chunks into text lines, keeping line endings (CSV fields may span lines)"""
+    pending = b""
+    first = True
+    for data in chunks:
+        *complete, pending = (pending + data).split(b"\n")
+        for raw in complete:
+            yield (raw + b"\n").decode("utf-8-sig" if first else "utf-8", errors="replace")
+            first = False
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Line is longer than {max_line_bytes} bytes")
+    if pending:
+        yield pending.decode("utf-8-sig" if first else "utf-8", errors="replace")
+
+
+class TripImporter:
+    """
+    Imports trips from NDJSON (one record per line) or CSV (one record per
+    row; quoted fields may contain newlines).
+
+    Records are parsed and validated with TripCreate in chunks, and each
+    chunk is written with one bulk INSERT in its own transaction, so
+    memory stays bounded by the chunk size whatever the input size.
+    Invalid rows are recorded in the report and skipped; if a chunk's
+    INSERT fails, its rows are retried one by one to isolate the bad ones.
+    """
+
+    def __init__(self, db: Session, fmt: str = "ndjson", chunk_size: int = 1000, max_errors: int = 1000,
+                 max_line_bytes: int = MAX_LINE_BYTES):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.db = db
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.max_line_bytes = max_line_bytes
+        self.header: Optional[List[str]] = None
+        self.report: Dict[str, Any] = {"imported": 0, "failed": 0, "errors": []}
+
+    def _record_error(self, line_number: int, error: str) -> None:
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"line": line_number, "error": error})
+
+    def _parse(self, raw: Any) -> Dict[str, Any]:
+        """Parse one NDJSON line or CSV row into a raw record"""
+        if self.fmt == "ndjson":
+            record = orjson.loads(raw)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            return record
+
+        values = raw
+        if len(values) != len(self.header):
+            raise ValueError(f"Expected {len(self.header)} columns, got {len(values)}")
+        record = {key: value for key, value in zip(self.header, values) if value != ""}
+        if "themes" in record:
+            record["themes"] = _csv_themes(record["themes"])
+        return record
+
+    def _to_row(self, trip: TripCreate) -> Dict[str, Any]:
+        row = trip.model_dump()
+        row["id"] = str(uuid.uuid4())
+        row["status"] = "draft"
+        return row
+
+    def _insert(self, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Insert a chunk in one transaction, falling back to row-by-row on failure"""
+        try:
+            bulk_insert(self.db, Trip, [row for _, row in rows])
+            self.db.commit()
+            self.report["imported"] += len(rows)
+            return
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Bulk insert of {len(rows)} trips failed, retrying row by row: {e}")
+
+        for line_number, row in rows:
+            try:
+                bulk_insert(self.db, Trip, [row])
+                self.db.commit()
+                self.report["imported"] += 1
+            except Exception as e:
+                self.db.rollback()
+                self._record_error(line_number, f"Database error: {e}")
+
+    def process_chunk(self, records: List[Tuple[int, Any]]) -> None:
+        """Validate and insert a chunk of (line number, NDJSON line or CSV row) pairs"""
+        rows = []
+        for line_number, raw in records:
+            try:
+                trip = TripCreate.model_validate(self._parse(raw))
+            except ValidationError as e:
+                errors = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+                self._record_error(line_number, errors)
+                continue
+            except Exception as e:
+                self._record_error(line_number, f"Parse error: {e}")
+                continue
+            rows.append((line_number, self._to_row(trip)))
+
+        if rows:
+            self._insert(rows)
+
+    def _records(self, lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+        """
+        (line number, record) pairs, skipping blank lines and taking the CSV header
+
+        Input that cannot be read further (an over-long line, a malformed
+        CSV field) is reported at the line it starts on and ends the import.
+        """
+        line_number = 1
+        try:
+            if self.fmt == "ndjson":
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        yield line_number, line
+                    line_number += 1
+                return
+
+            reader = csv.reader(lines)
+            for values in reader:
+                start, line_number = line_number, reader.line_num + 1
+                if not values:
+                    continue
+                if self.header is None:
+                    self.header = [column.strip() for column in values]
+                    continue
+                yield start, values
+        except (ValueError, csv.Error) as e:
+            self._record_error(line_number, f"{e}; import stopped")
+
+    def import_lines(self, lines: Iterable[str],
+                     progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Import from any iterable of text lines (files opened with newline="", stdin)"""
+        chunk = []
+        for record in self._records(lines):
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self.process_chunk(chunk)
+                chunk = []
+                if progress:
+                    progress(self.report)
+        if chunk:
+            self.process_chunk(chunk)
+        return self.report
+
+    async def import_stream(self, stream: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """
+        Import from a streamed request body
+
+        Runs in a worker thread that pulls body chunks from the event loop
+        as it needs them, so memory holds at most one line and one chunk
+        of records however large the body is.
+        """
+        loop = asyncio.get_running_loop()
+        iterator = stream.__aiter__()
+
+        async def next_chunk() -> Optional[bytes]:
+            try:
+                return await iterator.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        def chunks() -> Iterator[bytes]:
+            while True:
+                data = asyncio.run_coroutine_threadsafe(next_chunk(), loop).result()
+                if data is None:
+                    return
+                yield data
+
+        return await asyncio.to_thread(self.import_lines, _body_lines(chunks(), self.max_line_bytes))
@@ -0,0 +1,89 @@
+from sqlalchemy import delete, select
+from typing import Callable, Optional
+import asyncio
+import logging
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.trip import Trip, DailyItinerary, TripOption
+
+logger = logging.getLogger(__name__)
+
+
+class TripPurger:
+    """
+    Hard-deletes soft-deleted trips in batches.
+
+    Each batch is a fixed number of set-based DELETE statements, so no
+    option or itinerary row (or its JSON) is ever loaded into memory.
+    Children are deleted explicitly as well as through ON DELETE CASCADE
+    so that tables created before the cascade foreign keys are purged too.
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal, batch_size: int = 500,
+                 interval_seconds: float = 60):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def purge_batch(self) -> int:
+        """Purge up to batch_size deleted trips, returning how many were removed"""
+        db = self.session_factory()
+        try:
+            trip_ids = db.scalars(
+                select(Trip.id).where(Trip.deleted_at.is_not(None)).limit(self.batch_size)
+            ).all()
+            if not trip_ids:
+                return 0
+
+            db.execute(delete(DailyItinerary).where(DailyItinerary.trip_id.in_(trip_ids)))
+            db.execute(delete(TripOption).where(TripOption.trip_id.in_(trip_ids)))
+            db.execute(delete(Trip).where(Trip.id.in_(trip_ids), Trip.deleted_at.is_not(None)))
+            db.commit()
+            return len(trip_ids)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def purge_all(self) -> int:
+        """Purge batches until no deleted trips remain"""
+        total = 0
+        while True:
+            purged = self.purge_batch()
+            total += purged
+            if purged < self.batch_size:
+                return total
+
+    async def run(self) -> None:
+        """Purge periodically without blocking the event loop"""
+        while True:
+            try:
+                purged = await asyncio.to_thread(self.purge_all)
+                if purged:
+                    logger.info(f"Purged {purged} deleted trips")
+            except Exception as e:
+                logger.error(f"Error purging deleted trips: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create purger instance
+trip_purger = TripPurger(
+    batch_size=settings.trip_purge_batch_size,
+    interval_seconds=settings.trip_purge_interval_seconds
+)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Simulate hedged Gemini calls against a long-tailed latency distribution.
+
+A stand-in model sleeps for a lognormal latency, with a fraction of calls
+taking 5-10x the median (the tail seen from Gemini). The same call
+sequence runs through GoogleAIService._generate_content with hedging off
+and on. The script reports p50/p99 latency, the hedge rate, how often
+the hedge won, and the extra calls made.
+
+Usage:
+    python benchmarks/bench_hedging.py
+    python benchmarks/bench_hedging.py --calls 3000 --median-ms 50 --tail 0.08 --budget 0.15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./trip_planner.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.hedging import HedgePolicy
+from app.services import google_ai_service as ai_module
+from app.services.google_ai_service import GoogleAIService
+
+
+class LongTailModel:
+    """Sleeps like a model whose latency has a heavy tail"""
+
+    def __init__(self, median_ms: float, tail: float, seed: int):
+        self.median = median_ms / 1000
+        self.tail = tail
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.calls += 1
+            latency = self.median * self.random.lognormvariate(0, 0.25)
+            if self.random.random() < self.tail:
+                latency *= self.random.uniform(5, 10)
+        time.sleep(latency)
+        return type("Response", (), {"text": "[]"})()
+
+
+async def run_calls(service, calls: int, concurrency: int):
+    # Room for the abandoned hedge losers, which keep their worker thread until they finish
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 4))
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await service._generate_content("prompt", method="trip_options")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return latencies
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hedged Gemini calls")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per run")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight")
+    parser.add_argument("--median-ms", type=float, default=40, help="Median simulated latency")
+    parser.add_argument("--tail", type=float, default=0.05, help="Fraction of calls that are 5-10x slower")
+    parser.add_argument("--budget", type=float, default=0.1, help="Hedge budget (extra calls per call)")
+    args = parser.parse_args()
+
+    # Breaker thresholds that the simulated tail never trips
+    ai_module.gemini_breaker = CircuitBreaker("bench", slow_call_seconds=60, timeout_seconds=60)
+
+    print(f"\n📊 {args.calls} calls, median {args.median_ms:.0f} ms, {args.tail:.0%} tail at 5-10x")
+    print(f"   {'policy':<10}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'hedge rate':>12}{'win rate':>10}{'extra calls':>13}")
+    results = {}
+    for name, enabled in (("no hedge", False), ("hedged", True)):
+        policy = HedgePolicy(f"bench_{name.replace(' ', '_')}", budget_ratio=args.budget, enabled=enabled)
+        ai_module.gemini_hedging = policy
+        model = LongTailModel(args.median_ms, args.tail, seed=42)
+        service = GoogleAIService.__new__(GoogleAIService)
+        service.model = model
+
+        latencies = asyncio.run(run_calls(service, args.calls, args.concurrency))
+        snapshot = policy.snapshot()
+        results[name] = percentile(latencies, 99)
+        print(
+            f"   {name:<10}{statistics.median(latencies):>9.1f}{percentile(latencies, 90):>9.1f}"
+            f"{results[name]:>9.1f}{max(latencies):>9.1f}{snapshot['hedge_rate']:>12.1%}"
+            f"{snapshot['win_rate']:>10.1%}{model.calls / args.calls - 1:>13.1%}"
+        )
+
+    improvement = 1 - results["hedged"] / results["no hedge"]
+    print(f"\n   p99 improvement: {improvement:.0%}")
+
+
+if __name__ == "__main__":
+    main()
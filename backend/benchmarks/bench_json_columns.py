@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compare plain JSON columns with CompressedJSON columns.
+
+Stores the same 3-option itineraries in two SQLite databases, one per
+column type, and reports table size, row read time and the CPU spent
+encoding and decoding the payloads.
+
+Usage:
+    python benchmarks/bench_json_columns.py
+    python benchmarks/bench_json_columns.py --trips 500 --days 14
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./trip_planner.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, Column, String, JSON, MetaData, Table, select, text
+
+from app.core.types import CompressedJSON
+from app.services.google_ai_service import GoogleAIService
+
+
+def sample_options(days: int):
+    """Build a realistic 3-option payload using the fallback generator"""
+    service = GoogleAIService.__new__(GoogleAIService)
+    return service._get_fallback_trip_options({
+        "destination": "Rajasthan",
+        "start_date": "2024-01-15T00:00:00",
+        "total_budget": 120000,
+        "duration": days,
+    })
+
+
+def run(column_type, path: str, trips: int, options: list) -> dict:
+    """Populate one database and measure it"""
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    table = Table(
+        "trip_options", metadata,
+        Column("id", String(255), primary_key=True),
+        Column("trip_id", String(255), index=True),
+        Column("daily_itineraries", column_type),
+    )
+    metadata.create_all(engine)
+
+    bind = table.c.daily_itineraries.type.bind_processor(engine.dialect)
+    result = table.c.daily_itineraries.type.result_processor(engine.dialect, None)
+
+    payloads = [option["daily_itineraries"] for option in options]
+    start = time.process_time()
+    encoded = [bind(payload) if bind else payload for payload in payloads]
+    encode_ms = (time.process_time() - start) * 1000 / len(payloads)
+
+    start = time.process_time()
+    for value in encoded:
+        result(value) if result else value
+    decode_ms = (time.process_time() - start) * 1000 / len(encoded)
+
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [
+            {"id": f"{trip}-{index}", "trip_id": str(trip), "daily_itineraries": payload}
+            for trip in range(trips)
+            for index, payload in enumerate(payloads)
+        ])
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+
+    read_times = []
+    with engine.connect() as connection:
+        for trip in range(0, trips, max(1, trips // 100)):
+            start = time.perf_counter()
+            connection.execute(select(table).where(table.c.trip_id == str(trip))).all()
+            read_times.append((time.perf_counter() - start) * 1000)
+
+    engine.dispose()
+    return {
+        "size_kb": os.path.getsize(path) / 1024,
+        "row_kb": sum(len(value) for value in encoded) / len(encoded) / 1024,
+        "encode_ms": encode_ms,
+        "decode_ms": decode_ms,
+        "read_ms": statistics.median(read_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs CompressedJSON columns")
+    parser.add_argument("--trips", type=int, default=300, help="Number of trips to store")
+    parser.add_argument("--days", type=int, default=14, help="Trip length in days")
+    args = parser.parse_args()
+
+    options = sample_options(args.days)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {
+            "JSON": run(JSON, f"{tmp_dir}/json.db", args.trips, options),
+            "CompressedJSON": run(CompressedJSON, f"{tmp_dir}/compressed.db", args.trips, options),
+        }
+
+    print(f"\n📊 {args.trips} trips x 3 options, {args.days} days each")
+    print(f"   {'column':<16}{'table KB':>10}{'row KB':>9}{'read ms/trip':>14}{'encode ms':>11}{'decode ms':>11}")
+    for name, result in results.items():
+        print(
+            f"   {name:<16}{result['size_kb']:>10.0f}{result['row_kb']:>9.1f}"
+            f"{result['read_ms']:>14.3f}{result['encode_ms']:>11.3f}{result['decode_ms']:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the per-request overhead of the rate limiting middleware.
+
+Drives a trivial ASGI app directly (no HTTP server or client in the way),
+with and without RateLimitMiddleware, and reports the added time per
+request for a single hot client and for many distinct clients.
+
+Usage:
+    python benchmarks/bench_rate_limit.py
+    python benchmarks/bench_rate_limit.py --requests 200000 --clients 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./trip_planner.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware
+
+
+async def app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"[]"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def make_scopes(count: int, clients: int):
+    return [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/trips/",
+            "headers": [(b"host", b"localhost"), (b"accept", b"application/json")],
+            "client": (f"10.0.{index // 256 % 256}.{index % 256}", 50000 + index // 65536),
+        }
+        for index in (i % clients for i in range(count))
+    ]
+
+
+async def time_requests(handler, scopes):
+    start = time.perf_counter()
+    for scope in scopes:
+        await handler(scope, receive, send)
+    return (time.perf_counter() - start) / len(scopes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rate limiting overhead")
+    parser.add_argument("--requests", type=int, default=100000, help="Requests per measurement")
+    parser.add_argument("--clients", type=int, default=20000, help="Distinct clients in the many-clients run")
+    args = parser.parse_args()
+
+    # Limits high enough that nothing is rejected: only the bookkeeping is measured
+    limited = RateLimitMiddleware(app, RateLimiter(10**9, 10**9))
+
+    print(f"\n📊 Mean time per request ({args.requests} requests, in-memory store)")
+    print(f"   {'scenario':<16}{'bare µs':>10}{'limited µs':>12}{'overhead µs':>13}")
+    for name, clients in (("one client", 1), ("many clients", args.clients)):
+        scopes = make_scopes(args.requests, clients)
+        bare = asyncio.run(time_requests(app, scopes))
+        with_limit = asyncio.run(time_requests(limited, scopes))
+        print(f"   {name:<16}{bare:>10.2f}{with_limit:>12.2f}{with_limit - bare:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark response serialization for the options and itinerary endpoints.
+
+Compares FastAPI's response_model path (validation + jsonable_encoder +
+JSONResponse) with the orjson fast path used by the trips router, on
+in-memory ORM objects so that only serialization is measured.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --days 3 14 30 --runs 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./trip_planner.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+
+from app.main import app
+from app.api.serializers import serialize_option, serialize_itinerary
+from app.models.trip import DailyItinerary, TripOption
+from app.services.google_ai_service import GoogleAIService
+
+
+def build_rows(days: int):
+    """Build transient options and itinerary rows like the fallback generator would"""
+    service = GoogleAIService.__new__(GoogleAIService)
+    generated = service._get_fallback_trip_options({
+        "destination": "Rajasthan",
+        "start_date": "2024-01-15T00:00:00",
+        "total_budget": 120000,
+        "duration": days,
+    })
+    now = datetime.utcnow()
+    options = [
+        TripOption(
+            id=f"option-{index}", trip_id="trip", option_name=data["option_name"], theme=data["theme"],
+            description=data["description"], daily_itineraries=data["daily_itineraries"],
+            total_cost=data["total_cost"], highlights=data["highlights"], is_selected="False",
+            created_at=now, updated_at=now
+        )
+        for index, data in enumerate(generated)
+    ]
+    itinerary = [
+        DailyItinerary(
+            id=f"day-{day['day_number']}", trip_id="trip", day_number=day["day_number"],
+            date=datetime.fromisoformat(day["date"]), daily_budget=day["daily_budget"],
+            activities=day["activities"], meals=day["meals"], accommodation=day["accommodation"],
+            transport=day["transport"], created_at=now, updated_at=now
+        )
+        for day in generated[0]["daily_itineraries"]
+    ]
+    return options, itinerary
+
+
+def response_field(path: str):
+    return next(route for route in app.routes if getattr(route, "path", "") == path).response_field
+
+
+def time_runs(func, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 14, 30], help="Trip lengths to test")
+    parser.add_argument("--runs", type=int, default=100, help="Runs per measurement")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    endpoints = {
+        "get_trip_options": ("/api/v1/trips/{trip_id}/options", serialize_option, 0),
+        "get_trip_itinerary": ("/api/v1/trips/{trip_id}/itinerary", serialize_itinerary, 1),
+    }
+
+    print(f"\n📊 Median serialization time ({args.runs} runs)")
+    print(f"   {'endpoint':<20}{'days':>5}{'KB':>8}{'default ms':>12}{'orjson ms':>11}{'default ms/KB':>15}{'orjson ms/KB':>14}")
+    for days in args.days:
+        rows = build_rows(days)
+        for name, (path, serializer, index) in endpoints.items():
+            content = rows[index]
+            field = response_field(path)
+
+            def default_path():
+                validated = loop.run_until_complete(serialize_response(field=field, response_content=content))
+                return JSONResponse(validated).body
+
+            def fast_path():
+                return ORJSONResponse([serializer(row) for row in content]).body
+
+            default_ms, size = time_runs(default_path, args.runs)
+            fast_ms, _ = time_runs(fast_path, args.runs)
+            kb = size / 1024
+            print(
+                f"   {name:<20}{days:>5}{kb:>8.1f}{default_ms:>12.3f}{fast_ms:>11.3f}"
+                f"{default_ms / kb:>15.4f}{fast_ms / kb:>14.4f}"
+            )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
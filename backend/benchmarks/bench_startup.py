@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker cold start: importing the app and running its startup.
+
+Each run is a fresh interpreter started with ``python -X importtime``, so
+nothing is shared between runs. Reports the median time to import
+``app.main``, to finish the lifespan startup (tables, SDK setup) and to
+answer the first request, the slowest imports, and what importing the
+Google SDKs eagerly (as the services used to) would add.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --top 25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Runs in the child interpreter; prints one JSON line of timings (seconds)
+STARTUP = """
+import json, time
+start = time.perf_counter()
+{preload}
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    started = time.perf_counter()
+    client.get("/health")
+    answered = time.perf_counter()
+import sys
+print(json.dumps({{
+    "import": imported - start,
+    "startup": started - imported,
+    "first_request": answered - started,
+    "sdk_imported": "google.generativeai" in sys.modules,
+}}))
+"""
+
+SDK_PRELOAD = "import google.generativeai, googlemaps"
+
+
+def run_once(database_url: str, preload: str = ""):
+    """One cold start; returns the timings and the -X importtime lines"""
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key"),
+        "TRIP_PURGE_ENABLED": "False",
+        "RECOMMENDATIONS_WARM_ENABLED": "False",
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP.format(preload=preload)],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+
+
+def parse_importtime(lines):
+    """Self time in microseconds per top-level package, from -X importtime output"""
+    packages = {}
+    for line in lines[1:]:
+        _, self_us, _, name = line.replace("import time:", "|", 1).split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import and startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{directory}/startup.db"
+        lazy = [run_once(database_url) for _ in range(args.runs)]
+        eager = [run_once(database_url, SDK_PRELOAD) for _ in range(args.runs)]
+
+    print(f"\n📊 Median cold start over {args.runs} runs (seconds)")
+    print(f"   {'phase':<16}{'lazy SDKs':>12}{'eager SDKs':>12}")
+    for phase in ("import", "startup", "first_request"):
+        lazy_median = statistics.median(timings[phase] for timings, _ in lazy)
+        eager_median = statistics.median(timings[phase] for timings, _ in eager)
+        print(f"   {phase:<16}{lazy_median:>12.3f}{eager_median:>12.3f}")
+    print(f"   SDK imported when app.main is imported: {lazy[0][0]['sdk_imported']}")
+
+    packages = parse_importtime(lazy[len(lazy) // 2][1])
+    print("\n🐢 Import time by package (ms, lazy SDKs)")
+    for package, microseconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {package:<32}{microseconds / 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
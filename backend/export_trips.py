@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Trip Export Script
+Streams trips with their options and daily itineraries to NDJSON, CSV or Parquet
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.database import engine
+from app.services.trip_export import TripExporter, SUPPORTED_FORMATS
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Export trips with options and itineraries")
+    parser.add_argument("path", help="Output file, or - for stdout")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="Output format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Trips fetched per round trip")
+    parser.add_argument("--status", help="Only export trips with this status")
+    parser.add_argument("--no-options", action="store_true", help="Leave out trip options")
+    parser.add_argument("--no-itinerary", action="store_true", help="Leave out daily itineraries")
+    args = parser.parse_args()
+
+    suffix = Path(args.path).suffix.lstrip(".")
+    fmt = args.format or (suffix if suffix in SUPPORTED_FORMATS else "ndjson")
+    log = sys.stderr if args.path == "-" else sys.stdout
+
+    try:
+        exporter = TripExporter(
+            engine, fmt=fmt, chunk_size=args.chunk_size, status=args.status,
+            include_options=not args.no_options, include_itinerary=not args.no_itinerary
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}", file=log)
+        return False
+
+    print(f"🚀 Exporting trips ({fmt}, {args.chunk_size} trips per chunk)", file=log)
+    start = time.perf_counter()
+
+    output = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+    try:
+        written = exporter.write_to(output)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {written / 1024 / 1024:.1f} MB in {elapsed:.1f}s", file=log)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
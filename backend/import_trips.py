@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Bulk Trip Import Script
+Streams trips from an NDJSON or CSV file (or stdin) into the database in batches
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.database import SessionLocal
+from app.services.trip_import import TripImporter
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Bulk import trips from NDJSON or CSV")
+    parser.add_argument("path", help="Input file, or - for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--max-errors", type=int, default=100, help="Row errors to print")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8-sig", newline="")
+
+    print(f"🚀 Importing trips ({fmt}, {args.chunk_size} rows per batch)")
+    start = time.perf_counter()
+
+    def show_progress(report):
+        elapsed = time.perf_counter() - start
+        rate = report["imported"] / elapsed if elapsed else 0
+        print(f"\r🔄 {report['imported']} imported, {report['failed']} failed ({rate:,.0f} rows/s)", end="", flush=True)
+
+    db = SessionLocal()
+    try:
+        importer = TripImporter(db, fmt=fmt, chunk_size=args.chunk_size, max_errors=args.max_errors)
+        report = importer.import_lines(source, progress=show_progress)
+    finally:
+        db.close()
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Imported {report['imported']} trips in {elapsed:.1f}s ({report['failed']} failed)")
+    for error in report["errors"]:
+        print(f"   ❌ line {error['line']}: {error['error']}")
+    if report["failed"] > len(report["errors"]):
+        print(f"   ... and {report['failed'] - len(report['errors'])} more")
+
+    return report["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+JSON Column Migration Script
+Converts the large itinerary JSON columns to compressed binary storage in place
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.types import encode_json, decode_json, is_encoded
+
+# Tables and the columns stored with CompressedJSON
+COMPRESSED_COLUMNS = {
+    "trip_options": ["daily_itineraries"],
+    "daily_itineraries": ["activities", "meals", "accommodation", "transport"],
+}
+
+
+def alter_column_types():
+    """Switch MySQL JSON columns to LONGBLOB (SQLite columns are untyped)"""
+    if engine.dialect.name != "mysql":
+        print("📊 SQLite database: no column type changes needed")
+        return
+
+    with engine.begin() as connection:
+        for table, columns in COMPRESSED_COLUMNS.items():
+            for column in columns:
+                print(f"🔄 Altering {table}.{column} to LONGBLOB...")
+                connection.execute(text(f"ALTER TABLE {table} MODIFY {column} LONGBLOB NULL"))
+
+
+def reencode_table(table, columns, batch_size):
+    """Re-encode legacy JSON rows in primary key order, one batch per transaction"""
+    column_list = ", ".join(columns)
+    assignments = ", ".join(f"{column} = :{column}" for column in columns)
+    select_sql = text(
+        f"SELECT id, {column_list} FROM {table} WHERE id > :last_id ORDER BY id LIMIT :batch_size"
+    )
+    update_sql = text(f"UPDATE {table} SET {assignments} WHERE id = :id")
+
+    last_id = ""
+    converted = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(select_sql, {"last_id": last_id, "batch_size": batch_size}).all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                values = dict(zip(columns, row[1:]))
+                if all(value is None or is_encoded(value) for value in values.values()):
+                    continue
+                update = {"id": row[0]}
+                for column, value in values.items():
+                    if value is None or is_encoded(value):
+                        update[column] = value
+                    else:
+                        decoded = decode_json(value)
+                        update[column] = None if decoded is None else encode_json(decoded)
+                updates.append(update)
+
+            if updates:
+                connection.execute(update_sql, updates)
+            converted += len(updates)
+            last_id = rows[-1][0]
+
+        print(f"   {table}: {converted} rows converted")
+
+    return converted
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Compress itinerary JSON columns in place")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    args = parser.parse_args()
+
+    print("🚀 Trip Planner JSON Column Migration")
+    print("=" * 50)
+
+    try:
+        alter_column_types()
+        for table, columns in COMPRESSED_COLUMNS.items():
+            print(f"🔄 Re-encoding {table}...")
+            reencode_table(table, columns, args.batch_size)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        print("\n💡 Already converted batches are committed; re-run the script to resume")
+        return False
+
+    print("\n🎉 JSON column migration completed!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Schema Migration Script
+Brings an existing database up to date with the current models:
+missing tables, columns, indexes and ON DELETE CASCADE foreign keys
+"""
+
+import sys
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from sqlalchemy import inspect, text
+
+from app.core.database import engine, Base
+from app.models.trip import Trip, DailyItinerary, TripOption
+
+
+def _server_default_sql(column):
+    """Render a column's server default for ALTER TABLE, if it has one"""
+    if column.server_default is None:
+        return ""
+    default = column.server_default.arg
+    return f" DEFAULT {getattr(default, 'text', default)}"
+
+
+def add_missing_columns(connection, inspector):
+    """Add model columns that the database tables do not have yet"""
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            print(f"🔄 Adding column {table.name}.{column.name} ({column_type})")
+            connection.execute(text(
+                f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{_server_default_sql(column)}"
+            ))
+
+
+def create_missing_indexes(connection, inspector):
+    """Create model indexes that do not exist yet"""
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                print(f"🔄 Creating index {index.name}")
+                index.create(connection)
+
+
+def update_foreign_keys(connection, inspector):
+    """Recreate MySQL foreign keys whose ON DELETE rule differs from the models"""
+    if engine.dialect.name != "mysql":
+        print("📊 SQLite cannot alter foreign keys; the background purger deletes child rows explicitly")
+        return
+
+    for table in Base.metadata.sorted_tables:
+        current = {
+            tuple(fk["constrained_columns"]): fk
+            for fk in inspector.get_foreign_keys(table.name)
+        }
+        for constraint in table.foreign_key_constraints:
+            columns = tuple(constraint.column_keys)
+            wanted = (constraint.ondelete or "").upper()
+            existing = current.get(columns)
+            if existing and (existing.get("options", {}).get("ondelete") or "").upper() == wanted:
+                continue
+
+            referred = constraint.referred_table.name
+            referred_columns = ", ".join(element.column.name for element in constraint.elements)
+            if existing:
+                print(f"🔄 Dropping foreign key {existing['name']} on {table.name}")
+                connection.execute(text(f"ALTER TABLE {table.name} DROP FOREIGN KEY {existing['name']}"))
+            print(f"🔄 Adding foreign key on {table.name}({', '.join(columns)}) ON DELETE {wanted or 'NO ACTION'}")
+            on_delete = f" ON DELETE {wanted}" if wanted else ""
+            connection.execute(text(
+                f"ALTER TABLE {table.name} ADD FOREIGN KEY ({', '.join(columns)}) "
+                f"REFERENCES {referred} ({referred_columns}){on_delete}"
+            ))
+
+
+def main():
+    """Main function"""
+    print("🚀 Trip Planner Schema Migration")
+    print("=" * 50)
+
+    try:
+        # Create tables that do not exist at all
+        Base.metadata.create_all(bind=engine)
+
+        with engine.begin() as connection:
+            add_missing_columns(connection, inspect(connection))
+        with engine.begin() as connection:
+            create_missing_indexes(connection, inspect(connection))
+        with engine.begin() as connection:
+            update_foreign_keys(connection, inspect(connection))
+    except Exception as e:
+        print(f"❌ Schema migration failed: {e}")
+        return False
+
+    print("\n🎉 Schema is up to date!")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,34 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core import bulk
+from app.core.bulk import bulk_insert_returning
+
+Base = declarative_base()
+
+
+class Stop(Base):
+    __tablename__ = "stops"
+    id = Column(String, primary_key=True)
+    position = Column(Integer)
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_insert_returning_keeps_input_order(returning, monkeypatch):
+    """Test both the RETURNING path and the SELECT fallback return objects in input order"""
+    monkeypatch.setattr(bulk, "supports_bulk_returning", lambda db: returning)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    # Ids deliberately out of primary key order
+    rows = [{"id": f"{(index * 37) % 101:03d}", "position": index} for index in range(100)]
+    
+    with Session(engine) as db:
+        saved = bulk_insert_returning(db, Stop, rows)
+        assert [stop.id for stop in saved] == [row["id"] for row in rows]
+        assert [stop.position for stop in saved] == list(range(100))
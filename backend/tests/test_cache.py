@@ -0,0 +1,231 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache.base import CacheBackend
+from app.core.cache.cache import Cache, make_key
+from app.core.cache.memory import MemoryBackend
+from app.core.cache.resp import RESPBackend
+from app.core.cache.resp_server import RESPServerThread
+from app.core.cache.sqlite import SQLiteBackend
+
+
+async def _exercise(backend: CacheBackend):
+    """The contract every backend meets"""
+    await backend.set("a:1", b"one")
+    await backend.set("a:2", b"two", ttl=0.05)
+    await backend.set("b:1", b"other")
+    assert await backend.get("a:1") == b"one"
+    assert await backend.get("a:2") == b"two"
+    assert await backend.get("missing") is None
+
+    assert await backend.add("lock", b"1", ttl=10) is True
+    assert await backend.add("lock", b"1", ttl=10) is False
+    await backend.delete("lock")
+    assert await backend.add("lock", b"1", ttl=10) is True
+
+    await asyncio.sleep(0.1)
+    assert await backend.get("a:2") is None
+
+    await backend.clear("a:")
+    assert await backend.get("a:1") is None
+    assert await backend.get("b:1") == b"other"
+    await backend.close()
+
+
+def test_memory_backend_contract():
+    """Test the in-process backend stores, expires, locks and clears by prefix"""
+    asyncio.run(_exercise(MemoryBackend()))
+
+
+def test_sqlite_backend_contract_and_persistence(tmp_path):
+    """Test the SQLite backend meets the contract and keeps entries across instances"""
+    path = str(tmp_path / "cache.db")
+    asyncio.run(_exercise(SQLiteBackend(path)))
+
+    async def write_then_reopen():
+        first = SQLiteBackend(path)
+        await first.set("kept", b"value", ttl=60)
+        await first.close()
+        second = SQLiteBackend(path)
+        value = await second.get("kept")
+        await second.close()
+        return value
+
+    assert asyncio.run(write_then_reopen()) == b"value"
+
+
+def test_resp_backend_contract():
+    """Test the Redis-protocol backend against the stand-in server"""
+    with RESPServerThread() as url:
+        asyncio.run(_exercise(RESPBackend(url)))
+
+
+def test_memory_backend_evicts_least_recently_used():
+    """Test entry and byte limits evict the least recently used keys first"""
+    backend = MemoryBackend(max_entries=2, max_bytes=10)
+
+    async def scenario():
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        await backend.get("a")
+        await backend.set("c", b"3")
+        by_count = [await backend.get(key) for key in "abc"]
+        await backend.set("big", b"123456789")
+        return by_count, await backend.get("a"), await backend.get("big")
+
+    by_count, after_big, big = asyncio.run(scenario())
+    assert by_count == [b"1", None, b"3"]
+    assert after_big is None
+    assert big == b"123456789"
+    assert backend.stats()["bytes"] <= 10
+
+
+def test_get_or_set_coalesces_concurrent_misses():
+    """Test concurrent misses for one key call the factory once"""
+    namespace = Cache(MemoryBackend(), prefix="test").namespace("coalesce")
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        results = await asyncio.gather(*[namespace.get_or_set("key", factory) for _ in range(10)])
+        return results, await namespace.get_or_set("key", factory)
+
+    results, cached = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 10
+    assert cached == {"value": 42}
+
+
+def test_get_or_set_does_not_cache_rejected_values_or_errors():
+    """Test fallbacks and failures are returned or raised but never stored"""
+    namespace = Cache(MemoryBackend(), prefix="test").namespace("rejected")
+
+    async def empty():
+        return []
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        assert await namespace.get_or_set("empty", empty, should_cache=bool) == []
+        with pytest.raises(RuntimeError):
+            await namespace.get_or_set("failing", failing)
+        return await namespace.get("empty"), await namespace.get("failing")
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+def test_shared_backend_waits_for_other_worker():
+    """Test a worker that loses the lock uses the value the lock holder stores"""
+    with RESPServerThread() as url:
+        cache = Cache(RESPBackend(url), prefix="test", lock_wait_seconds=1)
+        namespace = cache.namespace("shared")
+
+        async def scenario():
+            try:
+                # Another process holds the lock and stores the value shortly after
+                await cache.backend.add(f"{namespace.prefix}key:lock", b"1", ttl=5)
+
+                async def other_worker():
+                    await asyncio.sleep(0.1)
+                    await namespace.set("key", "from other worker")
+
+                async def factory():
+                    return "computed here"
+
+                _, value = await asyncio.gather(other_worker(), namespace.get_or_set("key", factory))
+                return value
+            finally:
+                await cache.backend.close()
+
+        assert asyncio.run(scenario()) == "from other worker"
+        assert namespace.stats()["lock_waits"] >= 1
+
+
+def test_backend_errors_are_treated_as_misses():
+    """Test a failing backend never fails the caller"""
+    class BrokenBackend(MemoryBackend):
+        async def get(self, key):
+            raise ConnectionError("cache down")
+
+        async def set(self, key, value, ttl=None):
+            raise ConnectionError("cache down")
+
+    namespace = Cache(BrokenBackend(), prefix="test").namespace("broken")
+
+    async def factory():
+        return "fresh"
+
+    start = time.perf_counter()
+    assert asyncio.run(namespace.get_or_set("key", factory)) == "fresh"
+    assert time.perf_counter() - start < 1
+    assert namespace.stats()["errors"] == 2
+
+
+def test_make_key_hashes_long_keys():
+    """Test long keys such as prompts are replaced by a fixed-length hash"""
+    assert make_key("geocode", "goa") == "geocode:goa"
+    long_key = make_key("trip_options", "x" * 1000)
+    assert len(long_key) == 40
+    assert long_key == make_key("trip_options", "x" * 1000)
+
+
+def test_get_or_revalidate_serves_stale_and_refreshes_in_background():
+    """Test a stale entry is returned at once and replaced by a background refresh"""
+    namespace = Cache(MemoryBackend(), prefix="test").namespace("swr")
+    versions = iter(["v1", "v2"])
+
+    async def factory():
+        await asyncio.sleep(0.05)
+        return next(versions)
+
+    async def scenario():
+        first = await namespace.get_or_revalidate("key", factory, fresh_seconds=60)
+        entry = await namespace.get("key")
+        entry["stored_at"] -= 120
+        await namespace.set("key", entry)
+
+        start = time.perf_counter()
+        stale = await namespace.get_or_revalidate("key", factory, fresh_seconds=60)
+        elapsed = time.perf_counter() - start
+        again = await namespace.get_or_revalidate("key", factory, fresh_seconds=60)
+        await asyncio.sleep(0.1)
+        return first, stale, again, elapsed, await namespace.get_or_revalidate("key", factory, fresh_seconds=60)
+
+    first, stale, again, elapsed, refreshed = asyncio.run(scenario())
+    assert (first, stale, again, refreshed) == ("v1", "v1", "v1", "v2")
+    assert elapsed < 0.05
+    assert namespace.stats()["refreshes"] == 1
+
+
+def test_failed_refresh_keeps_the_stale_entry():
+    """Test a refresh that fails or returns nothing leaves the old value in place"""
+    namespace = Cache(MemoryBackend(), prefix="test").namespace("swr_failure")
+
+    async def good():
+        return {"tips": ["go early"]}
+
+    async def failing():
+        raise ConnectionError("Gemini unavailable")
+
+    async def empty():
+        return {}
+
+    async def scenario():
+        await namespace.get_or_revalidate("key", good, fresh_seconds=60, should_cache=bool)
+        assert await namespace.refresh("key", failing) is False
+        assert await namespace.refresh("key", empty, should_cache=bool) is False
+        return await namespace.get_or_revalidate("key", failing, fresh_seconds=60)
+
+    assert asyncio.run(scenario()) == {"tips": ["go early"]}
@@ -0,0 +1,93 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from app.core.metrics import metrics
+from app.services.google_ai_service import GoogleAIService
+
+
+def _fail():
+    raise ConnectionError("upstream down")
+
+
+def _slow():
+    time.sleep(0.05)
+    return "late"
+
+
+def test_circuit_opens_and_recovers_through_half_open():
+    """Test failures open the circuit, and a successful probe closes it"""
+    breaker = CircuitBreaker("test_recover", minimum_calls=3, window_size=5, open_seconds=0.05)
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(_fail)
+        assert breaker.state == OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(lambda: "never called")
+
+        await asyncio.sleep(0.06)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()  # only one probe at a time
+        breaker.record(True, 0.001)
+        assert breaker.state == CLOSED
+        assert await breaker.call(lambda: "ok") == "ok"
+
+    asyncio.run(scenario())
+    assert metrics.counter("circuit.test_recover.rejected") >= 1
+
+
+def test_circuit_counts_slow_calls_and_timeouts_as_failures():
+    """Test latency alone can open the circuit, and a failed probe re-opens it"""
+    breaker = CircuitBreaker("test_slow", minimum_calls=2, window_size=4, open_seconds=0.01,
+                             slow_call_seconds=0.01)
+
+    async def scenario():
+        assert await breaker.call(_slow) == "late"
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(_slow, timeout=0.01)
+        assert breaker.state == OPEN
+
+        await asyncio.sleep(0.02)
+        with pytest.raises(ConnectionError):
+            await breaker.call(_fail)
+        assert breaker.state == OPEN
+
+    asyncio.run(scenario())
+
+
+def test_open_gemini_circuit_serves_fallback_without_calling_model(monkeypatch):
+    """Test an outage costs the first few calls, then fallbacks are immediate"""
+    from app.services import google_ai_service as module
+
+    calls = []
+
+    class FailingModel:
+        def generate_content(self, prompt):
+            calls.append(prompt)
+            raise ConnectionError("Gemini unavailable")
+
+    breaker = CircuitBreaker("test_gemini", minimum_calls=2, window_size=4, open_seconds=60)
+    monkeypatch.setattr(module, "gemini_breaker", breaker)
+    service = GoogleAIService.__new__(GoogleAIService)
+    service.model = FailingModel()
+    trip_data = {"destination": "Goa", "start_date": "2024-01-15T00:00:00", "total_budget": 30000, "duration": 3}
+
+    async def scenario():
+        for _ in range(5):
+            options = await service.generate_trip_options(trip_data)
+            assert len(options) == 3
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert breaker.state == OPEN
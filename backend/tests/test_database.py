@@ -0,0 +1,92 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from sqlalchemy import text
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import ReplicaRouter, _create_engine, get_db
+from app.core.metrics import metrics
+
+
+def _replica_urls(tmp_path, count):
+    return [f"sqlite:///{tmp_path}/replica{index}.db" for index in range(count)]
+
+
+def test_replica_router_round_robin(tmp_path):
+    """Test reads rotate across healthy replicas"""
+    router = ReplicaRouter(_replica_urls(tmp_path, 2))
+    
+    picks = [router.pick() for _ in range(4)]
+    assert picks == [0, 1, 0, 1]
+    
+    session = router.session(picks[0])
+    assert session.execute(text("SELECT 1")).scalar() == 1
+    session.close()
+
+
+def test_replica_router_skips_unhealthy_replica(tmp_path):
+    """Test a replica that fails its health check is taken out of rotation"""
+    urls = [f"sqlite:///{tmp_path}/missing/replica.db"] + _replica_urls(tmp_path, 1)
+    router = ReplicaRouter(urls, health_check_interval=60)
+    
+    assert [router.pick() for _ in range(3)] == [1, 1, 1]
+    
+    # No healthy replica left: fall back to the primary
+    router.mark_unhealthy(1)
+    assert router.pick() is None
+
+
+def test_replica_router_read_your_writes(tmp_path):
+    """Test recently written keys are pinned to the primary"""
+    router = ReplicaRouter(_replica_urls(tmp_path, 1), read_your_writes_seconds=60)
+    
+    router.record_write(["trip:abc"])
+    assert router.pick(["trip:abc"]) is None
+    assert router.pick(["trip:other"]) == 0
+    
+    router.read_your_writes_seconds = 0
+    router.record_write(["trip:abc"])
+    assert router.pick(["trip:abc"]) == 0
+
+
+def test_get_db_outside_a_request(tmp_path, monkeypatch):
+    """Test the session dependency also works without a request (scripts, background tasks)"""
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter(_replica_urls(tmp_path, 1)))
+    
+    sessions = get_db()
+    db = next(sessions)
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    assert "read_your_writes_keys" not in db.info
+    sessions.close()
+
+
+def test_pool_instrumentation(tmp_path):
+    """Test pool events report checkouts, churn, wait time and utilization"""
+    engine = _create_engine(f"sqlite:///{tmp_path}/pool.db", name="pooltest")
+    
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        snapshot = metrics.snapshot()
+        assert snapshot["gauges"]["db.pool.pooltest.checked_out"] == 1
+        assert snapshot["gauges"]["db.pool.pooltest.utilization"] > 0
+    
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["db.pool.pooltest.checkouts"] == 1
+    assert snapshot["counters"]["db.pool.pooltest.connections_opened"] == 1
+    assert snapshot["histograms"]["db.pool.pooltest.checkout_wait_ms"]["count"] == 1
+    assert snapshot["gauges"]["db.pool.pooltest.checked_out"] == 0
+    
+    engine.dispose()
+    assert metrics.counter("db.pool.pooltest.connections_closed") == 1
+
+
+def test_unknown_pre_ping_mode_is_rejected(tmp_path, monkeypatch):
+    """Test a misspelled DB_POOL_PRE_PING fails instead of silently disabling pre-ping"""
+    monkeypatch.setattr(settings, "db_pool_pre_ping", "Always")
+    
+    with pytest.raises(ValueError, match="pre-ping"):
+        _create_engine(f"sqlite:///{tmp_path}/pool.db", name="prepingtest")
@@ -0,0 +1,58 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import time
+
+import pytest
+
+from app.core import deadline
+from app.core.circuit_breaker import CircuitBreaker, CLOSED
+from app.core.deadline import DeadlineExceeded, cap_timeout, end_deadline, route_deadline, start_deadline
+
+
+def test_cap_timeout_uses_remaining_budget():
+    """Test upstream timeouts shrink to the request deadline and stop near it"""
+    assert cap_timeout(10) == 10
+
+    token = start_deadline(2)
+    try:
+        assert 1.9 < cap_timeout(10) <= 2
+        assert cap_timeout(1) == 1
+        deadline.current_deadline().expires_at = time.monotonic() + 0.1
+        with pytest.raises(DeadlineExceeded):
+            cap_timeout(10)
+    finally:
+        end_deadline(token)
+
+    assert deadline.remaining() is None
+
+
+def test_route_deadlines():
+    """Test expensive routes get their own default budgets"""
+    assert route_deadline("/api/v1/trips/abc/generate-options") == 45
+    assert route_deadline("/api/v1/trips/abc/places/search") == 10
+    assert route_deadline("/api/v1/trips/abc/options/def/regenerate") == 45
+    assert route_deadline("/api/v1/trips/") == deadline.settings.request_deadline_seconds
+
+
+def test_deadline_cut_does_not_open_circuit():
+    """Test calls cut short by the request deadline are not counted as upstream failures"""
+    breaker = CircuitBreaker("test_deadline", minimum_calls=1, timeout_seconds=5)
+
+    async def scenario():
+        token = start_deadline(0.6)
+        try:
+            with pytest.raises(DeadlineExceeded):
+                await breaker.call(time.sleep, 0.8)
+            with pytest.raises(DeadlineExceeded):
+                await breaker.call(lambda: "too late")
+            assert deadline.current_deadline().degraded == ["test_deadline"]
+        finally:
+            end_deadline(token)
+
+    asyncio.run(scenario())
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate == 0
@@ -0,0 +1,98 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import time
+
+from app.core.hedging import HedgePolicy
+from app.core.metrics import metrics
+
+
+def _attempts(latencies):
+    """An attempt factory whose calls take the given latencies in turn"""
+    calls = iter(latencies)
+    started = []
+
+    async def attempt():
+        latency = next(calls)
+        started.append(latency)
+        await asyncio.sleep(latency)
+        return latency
+
+    return attempt, started
+
+
+def test_slow_call_is_hedged_and_hedge_wins():
+    """Test a call slower than the learned p90 is re-sent and the faster answer used"""
+    policy = HedgePolicy("test_hedge", min_samples=5, budget_ratio=1)
+    for _ in range(10):
+        policy.observe("options", 0.01)
+
+    attempt, started = _attempts([1.0, 0.01])
+
+    async def scenario():
+        start = time.perf_counter()
+        result = await policy.run("options", attempt)
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == 0.01
+    assert started == [1.0, 0.01]
+    assert elapsed < 0.5
+    assert metrics.counter("hedge.test_hedge.hedge_wins") == 1
+    assert policy.snapshot()["win_rate"] == 1.0
+
+
+def test_hedging_waits_for_samples_and_respects_budget():
+    """Test no hedges before latencies are learned or once the budget is spent"""
+    policy = HedgePolicy("test_budget", min_samples=3, budget_ratio=0.5, max_burst=1)
+    attempt, started = _attempts([0.01, 0.01, 0.01, 0.05, 0.01, 0.05, 0.05])
+
+    async def scenario():
+        for _ in range(3):
+            await policy.run("itinerary", attempt)  # learning, never hedged
+        await policy.run("itinerary", attempt)  # slow: hedged with the budget earned so far
+        await policy.run("itinerary", attempt)  # slow again, but only half a hedge left
+
+    asyncio.run(scenario())
+    assert metrics.counter("hedge.test_budget.hedged") == 1
+    assert metrics.counter("hedge.test_budget.budget_exhausted") == 1
+    assert started == [0.01, 0.01, 0.01, 0.05, 0.01, 0.05]
+
+
+def test_failed_primary_falls_back_to_hedge():
+    """Test the hedge's answer is used when the primary fails after hedging"""
+    policy = HedgePolicy("test_failover", min_samples=1, budget_ratio=1)
+    policy.observe("recommendations", 0.01)
+    calls = []
+
+    async def attempt():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError("primary failed")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    assert asyncio.run(policy.run("recommendations", attempt)) == "hedge"
+
+
+def test_losing_primary_latency_is_still_learned():
+    """Test slow primaries that lose to a hedge are observed, and hedges are not"""
+    policy = HedgePolicy("test_learning", min_samples=5, budget_ratio=1)
+    for _ in range(10):
+        policy.observe("options", 0.01)
+
+    attempt, started = _attempts([0.2, 0.02])
+
+    async def scenario():
+        result = await policy.run("options", attempt)
+        await asyncio.sleep(0.3)  # the primary finishes in the background
+        return result
+
+    assert asyncio.run(scenario()) == 0.02
+    samples = policy._latencies["options"].samples
+    assert len(samples) == 11
+    assert max(samples) >= 0.2
@@ -0,0 +1,103 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+
+import pytest
+
+from app.core.coalesce import WriteCoalescer
+from app.core.json_patch import JsonPatchError, apply_patch, touched_members
+
+DAY = {
+    "activities": [{"activity": "Fort tour", "cost": 800}, {"activity": "Lake cruise", "cost": 1200}],
+    "meals": [],
+    "daily_budget": 5000,
+}
+
+
+def test_operations_follow_rfc_6902():
+    """Test add/remove/replace/move/copy/test, array appends and pointer escaping"""
+    patched = apply_patch(DAY, [
+        {"op": "add", "path": "/activities/-", "value": {"activity": "Night market"}},
+        {"op": "remove", "path": "/activities/0"},
+        {"op": "replace", "path": "/daily_budget", "value": 6000},
+        {"op": "copy", "from": "/activities/0", "path": "/meals/0"},
+        {"op": "move", "from": "/activities/1", "path": "/activities/0"},
+        {"op": "add", "path": "/meals/0/a~1b~0c", "value": True},
+        {"op": "test", "path": "/meals/0/a~1b~0c", "value": True},
+    ])
+    assert [item["activity"] for item in patched["activities"]] == ["Night market", "Lake cruise"]
+    assert patched["meals"] == [{"activity": "Lake cruise", "cost": 1200, "a/b~c": True}]
+    assert patched["daily_budget"] == 6000
+    assert DAY["daily_budget"] == 5000 and len(DAY["activities"]) == 2
+
+
+@pytest.mark.parametrize("operations", [
+    [{"op": "remove", "path": "/activities/5"}],
+    [{"op": "replace", "path": "/missing", "value": 1}],
+    [{"op": "add", "path": "/activities/01", "value": 1}],
+    [{"op": "test", "path": "/daily_budget", "value": 1}],
+    [{"op": "move", "from": "/activities", "path": "/activities/0"}],
+    [{"op": "replace", "path": "/daily_budget"}],
+    [{"op": "rename", "path": "/daily_budget"}],
+    {"op": "remove", "path": "/meals"},
+])
+def test_invalid_patches_are_rejected(operations):
+    """Test malformed or inapplicable patches raise JsonPatchError"""
+    with pytest.raises(JsonPatchError):
+        apply_patch(DAY, operations)
+
+
+def test_touched_members_lists_top_level_fields():
+    """Test the fields a patch reads or writes are known before loading the row"""
+    assert touched_members([
+        {"op": "move", "from": "/meals/0", "path": "/activities/1"},
+        {"op": "replace", "path": "/daily_budget", "value": 1},
+    ]) == {"meals", "activities", "daily_budget"}
+    with pytest.raises(JsonPatchError):
+        touched_members([{"op": "replace", "path": "", "value": {}}])
+
+
+def test_coalescer_applies_a_burst_in_one_batch():
+    """Test writes within the window share one apply, in order, with per-request results"""
+    coalescer = WriteCoalescer(window_seconds=0.05)
+    batches = []
+
+    def apply(payloads):
+        batches.append(payloads)
+        return [ValueError("bad") if payload == "bad" else payload.upper() for payload in payloads]
+
+    async def scenario():
+        burst = [coalescer.submit("trip", payload, apply) for payload in ("a", "bad", "b")]
+        results = await asyncio.gather(*burst, return_exceptions=True)
+        later = await coalescer.submit("trip", "c", apply)
+        return results, later
+
+    results, later = asyncio.run(scenario())
+    assert batches == [["a", "bad", "b"], ["c"]]
+    assert results[0] == "A" and results[2] == "B"
+    assert isinstance(results[1], ValueError)
+    assert later == "C"
+
+
+def test_coalescer_hands_over_when_the_leader_goes_away():
+    """Test a cancelled first request does not strand the others in its batch"""
+    coalescer = WriteCoalescer(window_seconds=0.05)
+    batches = []
+
+    def apply(payloads):
+        batches.append(payloads)
+        return payloads
+
+    async def scenario():
+        leader = asyncio.ensure_future(coalescer.submit("trip", "a", apply))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.submit("trip", "b", apply))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "b"
+    assert batches == [["b"]]
@@ -0,0 +1,75 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+
+from app.services import google_ai_service as ai_module
+from app.services.google_ai_service import GoogleAIService
+from app.services.model_router import ModelRouter, parse_method_models
+
+
+def _router(**kwargs):
+    return ModelRouter(
+        "flash", "pro", method_models={"recommendations": "flash-8b"},
+        min_samples=4, window_size=10, **kwargs
+    )
+
+
+def test_routes_by_method_and_request_size():
+    """Test short trips use the fast model and long or multi-theme trips the strong one"""
+    router = _router()
+
+    assert router.choose("trip_options", {"duration": 3, "themes": ["food"]}) == "flash"
+    assert router.choose("trip_options", {"duration": 10, "themes": []}) == "pro"
+    assert router.choose("trip_options", {"duration": 2, "themes": ["a", "b", "c"]}) == "pro"
+    assert router.choose("recommendations", {"themes": ["food"]}) == "flash-8b"
+    assert parse_method_models("recommendations=flash-8b, daily_itinerary = flash") == {
+        "recommendations": "flash-8b", "daily_itinerary": "flash"
+    }
+
+
+def test_escalates_on_parse_failures_and_explores_back():
+    """Test a model whose responses stop parsing is replaced, with occasional probes"""
+    router = _router(explore_ratio=0.25)
+    short_trip = {"duration": 3}
+
+    for ok in (False, False, True, False):
+        router.record("trip_options", "flash", ok, 1.0)
+    picks = [router.choose("trip_options", short_trip) for _ in range(8)]
+    assert picks.count("pro") == 6
+    assert picks.count("flash") == 2
+
+    for _ in range(10):
+        router.record("trip_options", "flash", True, 1.0)
+    assert router.choose("trip_options", short_trip) == "flash"
+
+
+def test_slow_strong_model_falls_back_to_base():
+    """Test long trips drop to the base model while the strong model is too slow"""
+    router = _router(max_latency_seconds=5, explore_ratio=0)
+    for _ in range(4):
+        router.record("daily_itinerary", "pro", True, 12.0)
+
+    assert router.choose("daily_itinerary", {"duration": 14}) == "flash"
+    assert router.choose("trip_options", {"duration": 14}) == "pro"
+
+
+def test_service_reports_unparseable_responses(monkeypatch):
+    """Test GoogleAIService records parse failures against the model that was used"""
+    router = _router()
+    monkeypatch.setattr(ai_module, "model_router", router)
+
+    class ProseModel:
+        def generate_content(self, prompt):
+            return type("Response", (), {"text": "Sorry, I cannot help with that."})()
+
+    service = GoogleAIService.__new__(GoogleAIService)
+    service._models = {}
+    service.model = ProseModel()
+    monkeypatch.setattr(ai_module.settings, "gemini_model", "flash")
+
+    result = asyncio.run(service.generate_trip_options({"destination": "Goa", "duration": 3}))
+    assert result == []
+    assert list(router._outcomes[("trip_options", "flash")]) == [False]
@@ -0,0 +1,92 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import metrics
+from app.core.rate_limit import MemoryStore, RateLimiter, RateLimitMiddleware, RedisStore
+
+
+def _client(default_per_minute=3, expensive_per_minute=1):
+    app = FastAPI()
+
+    @app.get("/api/v1/trips/")
+    async def list_trips():
+        return []
+
+    @app.post("/api/v1/trips/{trip_id}/generate-options")
+    async def generate_options(trip_id: str):
+        return []
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    limiter = RateLimiter(default_per_minute, expensive_per_minute, api_keys=["partner"])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(app)
+
+
+def test_rate_limit_rejects_with_retry_after():
+    """Test a client is held to its budget and told when to retry"""
+    client = _client()
+
+    remaining = [client.get("/api/v1/trips/").headers["x-ratelimit-remaining"] for _ in range(3)]
+    assert remaining == ["2", "1", "0"]
+
+    response = client.get("/api/v1/trips/")
+    assert response.status_code == 429
+    assert response.json() == {"error": "Rate limit exceeded", "status_code": 429}
+    assert 1 <= int(response.headers["retry-after"]) <= 20
+    assert response.headers["x-ratelimit-limit"] == "3"
+
+
+def test_rate_limit_budgets_and_clients_are_separate():
+    """Test expensive routes, cheap routes and API keys each get their own bucket"""
+    client = _client()
+
+    assert client.post("/api/v1/trips/abc/generate-options").status_code == 200
+    assert client.post("/api/v1/trips/abc/generate-options").status_code == 429
+    assert client.get("/api/v1/trips/").status_code == 200
+
+    other = {"X-API-Key": "partner"}
+    assert client.post("/api/v1/trips/abc/generate-options", headers=other).status_code == 200
+
+    # Keys that are not configured do not get a budget of their own
+    made_up = {"X-API-Key": "made-up"}
+    assert client.post("/api/v1/trips/abc/generate-options", headers=made_up).status_code == 429
+
+    for _ in range(5):
+        assert client.get("/health").status_code == 200
+
+
+def test_memory_store_refills_and_bounds_keys():
+    """Test buckets refill over time and idle buckets are evicted"""
+    store = MemoryStore(max_keys=4)
+
+    async def scenario():
+        assert await store.consume("a", 1, 1000) == (True, 0)
+        allowed, _ = await store.consume("a", 1, 0.001)
+        assert not allowed
+        await asyncio.sleep(0.01)
+        allowed, _ = await store.consume("a", 1, 1000)
+        assert allowed
+        for index in range(10):
+            await store.consume(f"client{index}", 5, 1)
+
+    asyncio.run(scenario())
+    assert len(store._buckets) <= 4
+
+
+def test_redis_store_lets_requests_through_when_unreachable():
+    """Test a limiter outage does not take the API down with it"""
+    store = RedisStore("redis://127.0.0.1:1/0")
+    errors = metrics.snapshot().get("counters", {}).get("rate_limit.backend_errors", 0)
+
+    assert asyncio.run(store.consume("default:ip:1.2.3.4", 5, 1)) == (True, 5.0)
+    assert metrics.snapshot()["counters"]["rate_limit.backend_errors"] == errors + 1
@@ -0,0 +1,123 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+
+from app.services import google_ai_service as ai_module
+from app.services.google_ai_service import GoogleAIService
+from app.services.semantic_cache import SemanticCache, embed_trip
+
+GOA = {
+    "destination": "Goa",
+    "start_date": "2024-12-01T00:00:00",
+    "end_date": "2024-12-04T00:00:00",
+    "duration": 4,
+    "total_budget": 40000,
+    "travelers": 2,
+    "themes": ["beach", "nightlife"],
+}
+
+OPTIONS = [{
+    "option_name": "Beach Hopper",
+    "theme": "balanced",
+    "daily_itineraries": [
+        {"day_number": day, "date": f"2024-12-0{day}", "daily_budget": 9000,
+         "accommodation": {"name": "Sea View", "cost": 3000}}
+        for day in range(1, 5)
+    ],
+    "total_cost": 36000,
+}]
+
+
+def _similar(**changes):
+    return {**GOA, **changes}
+
+
+def test_near_duplicate_request_reuses_adapted_options():
+    """Test a paraphrased request gets the stored options re-dated and rescaled"""
+    cache = SemanticCache()
+    cache.add(GOA, OPTIONS)
+
+    options = cache.lookup(_similar(
+        destination="goa india", themes=["Beaches"], total_budget=42000,
+        start_date="2025-01-10T00:00:00", end_date="2025-01-13T00:00:00"
+    ))
+    assert options is not None
+    assert options[0]["total_cost"] == 37800
+    assert options[0]["daily_itineraries"][0]["accommodation"]["cost"] == 3150
+    assert [day["daily_budget"] for day in options[0]["daily_itineraries"]] == [9450] * 4
+    assert [day["date"] for day in options[0]["daily_itineraries"]] == [
+        "2025-01-10", "2025-01-11", "2025-01-12", "2025-01-13"
+    ]
+    assert OPTIONS[0]["total_cost"] == 36000
+
+
+def test_different_trips_are_not_reused():
+    """Test destination, duration, budget band and special requirements all guard reuse"""
+    cache = SemanticCache()
+    cache.add(GOA, OPTIONS)
+
+    assert cache.lookup(_similar(destination="Manali")) is None
+    assert cache.lookup(_similar(duration=5)) is None
+    assert cache.lookup(_similar(total_budget=150000)) is None
+    assert cache.lookup(_similar(themes=["heritage", "food"])) is None
+    assert cache.lookup(_similar(special_requirements="wheelchair accessible hotels")) is None
+
+
+def test_embedding_is_normalized_and_deterministic():
+    """Test vectors are unit length and stable (hashing does not depend on the process)"""
+    vector = embed_trip(GOA)
+    assert abs(float(vector @ vector) - 1) < 1e-5
+    assert (vector == embed_trip(dict(GOA))).all()
+
+
+def test_oldest_entries_are_overwritten_when_full():
+    """Test the index keeps at most max_entries requests"""
+    cache = SemanticCache(max_entries=2)
+    for destination in ("Goa", "Manali", "Jaipur"):
+        cache.add(_similar(destination=destination), OPTIONS)
+
+    assert len(cache) == 2
+    assert cache.lookup(GOA) is None
+    assert cache.lookup(_similar(destination="Jaipur")) is not None
+
+
+def test_index_is_allocated_on_first_add_and_grows():
+    """Test an empty cache holds no matrix and grows it by doubling up to max_entries"""
+    cache = SemanticCache(max_entries=100)
+    assert cache._vectors is None and cache.lookup(GOA) is None
+
+    cache.add(GOA, OPTIONS)
+    assert cache._vectors.shape[0] == 64
+    for index in range(64):
+        cache.add(_similar(destination=f"Town {index}"), OPTIONS)
+
+    assert len(cache) == 65 and cache._vectors.shape[0] == 100
+    assert cache.lookup(GOA) is not None
+
+
+def test_service_calls_gemini_once_for_similar_requests(monkeypatch):
+    """Test GoogleAIService answers a near-duplicate request from the semantic cache"""
+    monkeypatch.setattr(ai_module, "semantic_cache", SemanticCache())
+    prompts = []
+
+    async def fake_generate_content(prompt, method="generate", model_name=None):
+        prompts.append(prompt)
+        return '[{"option_name": "Beach Hopper", "total_cost": 36000, "daily_itineraries": []}]'
+
+    service = GoogleAIService.__new__(GoogleAIService)
+    service._models = {}
+    service.model = object()
+    monkeypatch.setattr(service, "_generate_content", fake_generate_content)
+
+    async def scenario():
+        first = await service.generate_trip_options(GOA)
+        second = await service.generate_trip_options(_similar(destination="goa", total_budget=44000))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert len(prompts) == 1
+    assert first[0]["total_cost"] == 36000
+    assert second[0]["total_cost"] == 39600
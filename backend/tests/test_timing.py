@@ -0,0 +1,96 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import logging
+import pstats
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import timing
+from app.core.profiling import SlowRequestProfiler
+from app.core.timing import TimingMiddleware, instrument_engine, timed
+
+SCOPE = {"type": "http", "method": "POST", "path": "/api/v1/trips/abc/generate-options"}
+
+
+def test_server_timing_header_and_log_fields(monkeypatch, caplog):
+    """Test database and upstream time are attributed to the request that spent it"""
+    monkeypatch.setattr(timing.settings, "request_timing_log_ms", 0)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        with timed("gemini"):
+            await asyncio.sleep(0.02)
+        return {"ok": True}
+
+    with caplog.at_level(logging.INFO, logger="app.core.timing"):
+        response = TestClient(app).get("/work")
+
+    header = response.headers["server-timing"]
+    assert header.startswith('db;dur=')
+    assert 'desc="2 calls"' in header
+    gemini = float(header.split("gemini;dur=")[1].split(";")[0])
+    total = float(header.split("total;dur=")[1])
+    assert 20 <= gemini <= total
+    fields = caplog.records[-1].timing
+    assert fields["path"] == "/work" and fields["status"] == 200
+    assert fields["db_count"] == 2 and fields["gemini_count"] == 1
+
+
+def test_timing_outside_a_request_is_a_no_op():
+    """Test hooks do nothing for background work that has no request"""
+    with timed("maps"):
+        pass
+    assert timing.current_timings() is None
+
+
+def test_stack_mode_dumps_requests_still_running(tmp_path):
+    """Test a request running past slow_ms gets its task and thread stacks written"""
+    profiler = SlowRequestProfiler(str(tmp_path), mode="stack", slow_ms=50)
+
+    async def slow_handler():
+        with profiler.profile(SCOPE):
+            await asyncio.sleep(0.15)
+
+    async def fast_handler():
+        with profiler.profile(SCOPE):
+            await asyncio.sleep(0)
+
+    asyncio.run(fast_handler())
+    assert not list(tmp_path.iterdir())
+    asyncio.run(slow_handler())
+    [dump] = tmp_path.iterdir()
+    assert dump.suffix == ".txt" and "generate_options" in dump.name
+    content = dump.read_text()
+    assert "Request task" in content and "slow_handler" in content
+
+
+def test_cprofile_mode_keeps_only_slow_requests(tmp_path):
+    """Test sampled requests are profiled and the profile is kept only when slow"""
+    profiler = SlowRequestProfiler(str(tmp_path), mode="cprofile", slow_ms=100, sample_rate=1.0)
+
+    def handle(seconds):
+        start = time.perf_counter()
+        with profiler.profile(SCOPE) as sample:
+            time.sleep(seconds)
+            sample.keep_if((time.perf_counter() - start) * 1000, {})
+
+    handle(0)
+    assert not list(tmp_path.iterdir())
+    handle(0.12)
+    [dump] = tmp_path.iterdir()
+    assert dump.suffix == ".prof"
+    assert any("sleep" in name for _, _, name in pstats.Stats(str(dump)).stats)
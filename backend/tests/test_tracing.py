@@ -0,0 +1,135 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import tracing
+from app.core.otlp_collector import CollectorThread, flatten, waterfall
+from app.core.tracing import Span, SpanExporter, TracingMiddleware, span, trace_engine
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+def traces(monkeypatch, tmp_path):
+    """Trace every request into a file; returns a function reading back the exported spans"""
+    path = tmp_path / "traces.jsonl"
+    exporter = SpanExporter("file", str(path), flush_seconds=0.05)
+    monkeypatch.setattr(tracing.tracer, "exporter", exporter)
+    monkeypatch.setattr(tracing.tracer, "enabled", True)
+    monkeypatch.setattr(tracing.tracer, "sample_rate", 1.0)
+
+    def read():
+        exporter.shutdown()
+        if not path.exists():
+            return []
+        return [span for line in path.read_text().splitlines() for span in flatten(json.loads(line))]
+
+    yield read
+    exporter.shutdown()
+
+
+def _app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    trace_engine(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE stops (name TEXT)"))
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.post("/trips/{trip_id}/plan")
+    async def plan(trip_id: str):
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO stops VALUES ('a'), ('b'), ('c')"))
+
+        async def call(name):
+            with span(name, **{"trip.destination": "Goa"}):
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(call("gemini.day_1"), call("gemini.day_2"))
+        with span("serialize", **{"serialize.rows": 2}):
+            pass
+        return {"ok": True}
+
+    return app
+
+
+def test_request_span_tree_covers_fan_out_and_sql(traces):
+    """Test services, SQL statements and serialization nest under the request's server span"""
+    response = TestClient(_app()).post("/trips/trip-1/plan")
+    spans = {span["name"]: span for span in traces()}
+
+    root = spans["POST /trips/{trip_id}/plan"]
+    assert root["parentSpanId"] == "" and root["kind"] == tracing.KIND_SERVER
+    assert root["attributes"]["trip.id"] == "trip-1"
+    assert root["attributes"]["http.route"] == "/trips/{trip_id}/plan"
+    assert root["attributes"]["http.response.status_code"] == 200
+    assert response.headers["traceparent"] == f"00-{root['traceId']}-{root['spanId']}-01"
+
+    insert = spans["db.insert"]
+    assert insert["parentSpanId"] == root["spanId"]
+    assert insert["attributes"]["db.rows"] == 3
+    assert insert["attributes"]["db.statement"].startswith("INSERT INTO stops")
+
+    first, second = spans["gemini.day_1"], spans["gemini.day_2"]
+    assert first["parentSpanId"] == second["parentSpanId"] == root["spanId"]
+    assert first["attributes"]["trip.destination"] == "Goa"
+    # Fanned-out calls overlap instead of running one after the other
+    assert second["startTimeUnixNano"] < first["endTimeUnixNano"]
+    assert spans["serialize"]["startTimeUnixNano"] >= second["endTimeUnixNano"]
+
+    rendered = waterfall(spans.values())
+    assert "  gemini.day_1" in rendered and "db.insert" in rendered
+
+
+def test_incoming_traceparent_is_continued_or_not_sampled(traces):
+    """Test a sampled W3C traceparent joins its trace and an unsampled one is not traced"""
+    client = TestClient(_app())
+    continued = client.post("/trips/t/plan", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+    skipped = client.post("/trips/t/plan", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"})
+
+    spans = traces()
+    assert spans and all(span["traceId"] == TRACE_ID for span in spans)
+    root = next(span for span in spans if span["kind"] == tracing.KIND_SERVER)
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+    assert len([span for span in spans if span["kind"] == tracing.KIND_SERVER]) == 1
+    assert continued.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+    assert "traceparent" not in skipped.headers
+
+
+def test_spans_outside_a_traced_request_are_no_ops(traces):
+    """Test hooks do nothing for background work and untraced requests"""
+    with span("warm") as current:
+        assert current is None
+    tracing.set_attribute("trip.id", "x")
+    assert traces() == []
+
+
+def test_otlp_exporter_posts_to_collector():
+    """Test the OTLP/HTTP exporter round trip through the collector stand-in"""
+    server = CollectorThread()
+    exporter = SpanExporter("otlp", endpoint=server.start(), flush_seconds=0.05)
+    try:
+        root = Span("GET /trips/{trip_id}", TRACE_ID, kind=tracing.KIND_SERVER, attributes={"trip.id": "t1"})
+        child = Span("db.select", TRACE_ID, root.span_id, tracing.KIND_CLIENT, {"db.rows": 4})
+        for item in (child, root):
+            item.end_ns = item.start_ns + 1_000_000
+            exporter.export(item)
+        exporter.shutdown()
+    finally:
+        server.stop()
+
+    spans = {span["name"]: span for span in server.collector.spans(TRACE_ID)}
+    assert spans["GET /trips/{trip_id}"]["attributes"] == {"trip.id": "t1"}
+    assert spans["db.select"]["parentSpanId"] == root.span_id
+    assert spans["db.select"]["attributes"]["db.rows"] == 4
+    assert "  db.select" in waterfall(spans.values())
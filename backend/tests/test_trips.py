@@ -1,19 +1,34 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 
 from app.main import app
+from app.core.cache.cache import cache
+from app.core.config import settings
 from app.core.database import get_db, Base
-from app.models.trip import Trip
+from app.core.rate_limit import rate_limiter
+from app.models.trip import Trip, DailyItinerary, TripOption
+from app.services.trip_purger import TripPurger
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create tables
+# Create tables (dropping any left over from an older schema)
+Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
 
 def override_get_db():
@@ -25,6 +40,9 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Rate limits are covered in test_rate_limit.py; the API tests make many requests from one client
+rate_limiter.enabled = False
+
 client = TestClient(app)
 
 def test_create_trip():
@@ -126,6 +144,661 @@ def test_delete_trip():
     get_response = client.get(f"/api/v1/trips/{trip_id}")
     assert get_response.status_code == 404
 
+def test_generate_and_select_option():
+    """Test generating options and selecting one creates every day of the itinerary"""
+    trip_data = {
+        "destination": "Goa",
+        "start_date": "2024-05-01T00:00:00",
+        "end_date": "2024-05-30T00:00:00",
+        "total_budget": 90000,
+        "travelers": 2,
+        "themes": ["beach"]
+    }
+    
+    create_response = client.post("/api/v1/trips/", json=trip_data)
+    trip_id = create_response.json()["id"]
+    
+    # Generate options
+    response = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={})
+    assert response.status_code == 200
+    
+    options = response.json()
+    assert len(options) == 3
+    assert all(option["trip_id"] == trip_id for option in options)
+    assert len(options[0]["daily_itineraries"]) == 30
+    
+    # Select the first option
+    option_id = options[0]["id"]
+    response = client.post(f"/api/v1/trips/{trip_id}/select-option/{option_id}")
+    assert response.status_code == 200
+    
+    itinerary = client.get(f"/api/v1/trips/{trip_id}/itinerary").json()
+    assert [day["day_number"] for day in itinerary] == list(range(1, 31))
+    
+    trip = client.get(f"/api/v1/trips/{trip_id}").json()
+    assert trip["status"] == "planned"
+
+def test_fast_responses_match_validated_responses(monkeypatch):
+    """Test orjson responses are identical to the response_model path"""
+    trip_data = {
+        "destination": "Kerala",
+        "start_date": "2024-07-01T00:00:00",
+        "end_date": "2024-07-04T00:00:00",
+        "total_budget": 45000,
+        "travelers": 3,
+        "themes": ["nature"]
+    }
+    
+    trip_id = client.post("/api/v1/trips/", json=trip_data).json()["id"]
+    options = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{options[1]['id']}")
+    
+    paths = [
+        f"/api/v1/trips/{trip_id}",
+        f"/api/v1/trips/{trip_id}/options",
+        f"/api/v1/trips/{trip_id}/itinerary",
+    ]
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+    fast = [client.get(path).json() for path in paths]
+    monkeypatch.setattr(settings, "fast_json_responses", False)
+    validated = [client.get(path).json() for path in paths]
+    
+    assert fast == validated
+    assert fast[0]["selected_option"]["id"] == options[1]["id"]
+    assert fast[0]["selected_option"]["is_selected"] is True
+
+def test_conditional_get_with_etags():
+    """Test unchanged resources answer If-None-Match with 304 and changes invalidate the ETag"""
+    trip_data = {
+        "destination": "Sikkim",
+        "start_date": "2024-08-01T00:00:00",
+        "end_date": "2024-08-03T00:00:00",
+        "total_budget": 30000,
+        "travelers": 2
+    }
+    
+    trip_id = client.post("/api/v1/trips/", json=trip_data).json()["id"]
+    options = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    
+    paths = [
+        f"/api/v1/trips/{trip_id}",
+        f"/api/v1/trips/{trip_id}/options",
+        f"/api/v1/trips/{trip_id}/itinerary",
+    ]
+    etags = []
+    for path in paths:
+        response = client.get(path)
+        etag = response.headers["etag"]
+        etags.append(etag)
+        
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+    
+    # Each representation has its own tag
+    assert len(set(etags)) == 3
+    
+    # Selecting an option changes every representation of the trip
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{options[0]['id']}")
+    for path, etag in zip(paths, etags):
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+def test_summary_views_skip_heavy_columns():
+    """Test summary views and sparse fieldsets never read the JSON columns"""
+    trip_data = {
+        "destination": "Andaman",
+        "start_date": "2024-09-01T00:00:00",
+        "end_date": "2024-09-10T00:00:00",
+        "total_budget": 120000,
+        "travelers": 2
+    }
+    
+    trip_id = client.post("/api/v1/trips/", json=trip_data).json()["id"]
+    options = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{options[0]['id']}")
+    
+    statements = []
+    
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record_statement)
+    try:
+        full = client.get(f"/api/v1/trips/{trip_id}/options")
+        statements.clear()
+        summary = client.get(f"/api/v1/trips/{trip_id}/options", params={"view": "summary"})
+        assert not any("daily_itineraries" in statement for statement in statements)
+        
+        statements.clear()
+        itinerary = client.get(f"/api/v1/trips/{trip_id}/itinerary", params={"view": "summary"}).json()
+        assert not any("activities" in statement for statement in statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", record_statement)
+    
+    assert "daily_itineraries" not in summary.json()[0]
+    assert summary.json()[0]["option_name"] == full.json()[0]["option_name"]
+    assert len(summary.content) * 10 < len(full.content)
+    assert set(itinerary[0]) == {"id", "trip_id", "day_number", "date", "daily_budget", "created_at", "updated_at"}
+    
+    # Sparse fieldsets always include the id
+    sparse = client.get(f"/api/v1/trips/{trip_id}/options", params={"fields": "option_name,total_cost"}).json()
+    assert set(sparse[0]) == {"id", "option_name", "total_cost"}
+    
+    trip = client.get(f"/api/v1/trips/{trip_id}", params={"view": "summary"}).json()
+    assert trip["selected_option"]["id"] == options[0]["id"]
+    assert "daily_itineraries" not in trip["selected_option"]
+    
+    listed = client.get("/api/v1/trips/", params={"fields": "destination"}).json()
+    assert all(set(item) == {"id", "destination"} for item in listed)
+    
+    response = client.get(f"/api/v1/trips/{trip_id}/options", params={"fields": "bogus"})
+    assert response.status_code == 400
+
+def test_deleted_trip_is_purged():
+    """Test soft-deleted trips are hidden immediately and purged with their options"""
+    trip_data = {
+        "destination": "Ladakh",
+        "start_date": "2024-06-01T00:00:00",
+        "end_date": "2024-06-07T00:00:00",
+        "total_budget": 80000,
+        "travelers": 2
+    }
+    
+    trip_id = client.post("/api/v1/trips/", json=trip_data).json()["id"]
+    options = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{options[0]['id']}")
+    
+    response = client.delete(f"/api/v1/trips/{trip_id}")
+    assert response.status_code == 200
+    assert client.delete(f"/api/v1/trips/{trip_id}").status_code == 404
+    assert all(trip["id"] != trip_id for trip in client.get("/api/v1/trips/").json())
+    
+    purger = TripPurger(session_factory=TestingSessionLocal, batch_size=1)
+    assert purger.purge_all() >= 1
+    
+    db = TestingSessionLocal()
+    try:
+        assert db.query(Trip).filter(Trip.id == trip_id).count() == 0
+        assert db.query(TripOption).filter(TripOption.trip_id == trip_id).count() == 0
+        assert db.query(DailyItinerary).filter(DailyItinerary.trip_id == trip_id).count() == 0
+    finally:
+        db.close()
+
+def test_bulk_import_reports_row_errors():
+    """Test NDJSON and CSV imports insert valid rows and report invalid ones"""
+    ndjson = "\n".join([
+        '{"destination": "Import Alpha", "start_date": "2024-10-01T00:00:00", "end_date": "2024-10-03T00:00:00", "total_budget": 20000, "travelers": 2}',
+        '{"destination": "Import Beta", "start_date": "2024-10-01T00:00:00", "end_date": "2024-10-03T00:00:00", "total_budget": 20000, "travelers": 0}',
+        'not json',
+        '',
+        '{"destination": "Import Gamma", "start_date": "2024-10-05T00:00:00", "end_date": "2024-10-09T00:00:00", "total_budget": 25000, "travelers": 1, "themes": ["food"]}',
+    ])
+    
+    response = client.post(
+        "/api/v1/trips/import",
+        params={"chunk_size": 2},
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    assert "travelers" in report["errors"][0]["error"]
+    
+    csv_body = (
+        "destination,start_date,end_date,total_budget,travelers,themes\r\n"
+        "Import Delta,2024-11-01T00:00:00,2024-11-04T00:00:00,30000,2,beach|food\r\n"
+        "Import Epsilon,2024-11-01T00:00:00,,30000,2,\r\n"
+    )
+    report = client.post("/api/v1/trips/import", content=csv_body, headers={"Content-Type": "text/csv"}).json()
+    assert report["imported"] == 1
+    assert report["errors"][0]["line"] == 3
+    
+    destinations = {trip["destination"]: trip for trip in client.get("/api/v1/trips/", params={"limit": 1000}).json()}
+    assert "Import Alpha" in destinations and "Import Gamma" in destinations
+    assert destinations["Import Delta"]["themes"] == ["beach", "food"]
+    assert destinations["Import Delta"]["status"] == "draft"
+
+def test_csv_import_follows_quoting_and_bounds_lines():
+    """Test quoted CSV fields may span lines and an endless line stops the import"""
+    from app.services.trip_import import TripImporter
+    
+    csv_body = (
+        'destination,start_date,end_date,total_budget,travelers,themes\r\n'
+        '"Import Zeta\r\nNorth Goa",2024-11-01T00:00:00,2024-11-04T00:00:00,30000,2,beach\r\n'
+        'Import Eta,2024-11-01T00:00:00,2024-11-04T00:00:00,30000,0,\r\n'
+    )
+    report = client.post("/api/v1/trips/import", content=csv_body, headers={"Content-Type": "text/csv"}).json()
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [4]
+    destinations = [trip["destination"] for trip in client.get("/api/v1/trips/", params={"limit": 1000}).json()]
+    assert "Import Zeta\r\nNorth Goa" in destinations
+    
+    async def body():
+        yield b'{"destination": "Import Theta", "start_date": "2024-10-01T00:00:00", '
+        yield b'"end_date": "2024-10-03T00:00:00", "total_budget": 20000, "travelers": 2}\n'
+        for _ in range(100):
+            yield b"x" * 100
+    
+    db = TestingSessionLocal()
+    try:
+        importer = TripImporter(db, max_line_bytes=1000)
+        report = asyncio.run(importer.import_stream(body()))
+    finally:
+        db.close()
+    assert report["imported"] == 1
+    assert report["errors"] == [{"line": 2, "error": "Line is longer than 1000 bytes; import stopped"}]
+
+def test_export_streams_trips_with_children():
+    """Test NDJSON, CSV and Parquet exports include options and itinerary days"""
+    trip_data = {
+        "destination": "Export Town",
+        "start_date": "2024-09-01T00:00:00",
+        "end_date": "2024-09-04T00:00:00",
+        "total_budget": 40000,
+        "travelers": 2,
+        "themes": ["heritage"]
+    }
+    trip = client.post("/api/v1/trips/", json=trip_data).json()
+    options = client.post(f"/api/v1/trips/{trip['id']}/generate-options", json={}).json()
+    client.post(f"/api/v1/trips/{trip['id']}/select-option/{options[0]['id']}")
+    
+    response = client.get("/api/v1/trips/export", params={"chunk_size": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    ids = [record["id"] for record in records]
+    assert ids == sorted(ids)
+    record = next(record for record in records if record["id"] == trip["id"])
+    assert len(record["options"]) == len(options)
+    assert [day["day_number"] for day in record["itinerary"]] == list(range(1, len(record["itinerary"]) + 1))
+    
+    response = client.get("/api/v1/trips/export", params={"format": "csv", "options": False})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(records)
+    row = next(row for row in rows if row["id"] == trip["id"])
+    assert "options" not in row
+    assert json.loads(row["itinerary"]) == record["itinerary"]
+    
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    response = client.get("/api/v1/trips/export", params={"format": "parquet", "chunk_size": 2})
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == len(records)
+    assert table.column("destination").to_pylist() == [record["destination"] for record in records]
+
+def test_generate_options_is_idempotent_unless_forced(monkeypatch):
+    """Test repeated calls return the stored options and force_regenerate replaces them"""
+    from app.services.google_ai_service import google_ai_service
+    
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Kerala",
+        "start_date": "2024-08-01T00:00:00",
+        "end_date": "2024-08-04T00:00:00",
+        "total_budget": 60000,
+        "travelers": 2
+    }).json()["id"]
+    
+    first = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    etag = client.get(f"/api/v1/trips/{trip_id}").headers["etag"]
+    again = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    assert [option["id"] for option in again] == [option["id"] for option in first]
+    assert client.get(f"/api/v1/trips/{trip_id}").headers["etag"] == etag
+    
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{first[0]['id']}")
+    
+    # Without Gemini (or with an unparseable answer) the stored options and plan are kept
+    response = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={"force_regenerate": True})
+    assert response.status_code == 502
+    
+    async def unparseable(prompt, method="generate", model_name=None):
+        return "Sorry, I cannot help with that."
+    
+    monkeypatch.setattr(google_ai_service, "_generate_content", unparseable)
+    response = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={"force_regenerate": True})
+    assert response.status_code == 502
+    stored = client.get(f"/api/v1/trips/{trip_id}/options").json()
+    assert sorted(option["id"] for option in stored) == sorted(option["id"] for option in first)
+    assert client.get(f"/api/v1/trips/{trip_id}").json()["status"] == "planned"
+    assert len(client.get(f"/api/v1/trips/{trip_id}/itinerary").json()) == 4
+    
+    async def generated(prompt, method="generate", model_name=None):
+        return json.dumps([
+            {"option_name": f"Backwaters {index}", "theme": "relaxation", "total_cost": 50000, "daily_itineraries": []}
+            for index in range(3)
+        ])
+    
+    monkeypatch.setattr(google_ai_service, "_generate_content", generated)
+    forced = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={"force_regenerate": True}).json()
+    assert [option["option_name"] for option in forced] == ["Backwaters 0", "Backwaters 1", "Backwaters 2"]
+    assert not {option["id"] for option in forced} & {option["id"] for option in first}
+    stored = client.get(f"/api/v1/trips/{trip_id}/options").json()
+    assert sorted(option["id"] for option in stored) == sorted(option["id"] for option in forced)
+    
+    # The selected option was replaced, so the trip is back to choosing one
+    trip = client.get(f"/api/v1/trips/{trip_id}").json()
+    assert trip["status"] == "draft" and trip["selected_option"] is None
+    assert client.get(f"/api/v1/trips/{trip_id}/itinerary").json() == []
+
+
+def test_force_regenerate_without_options_falls_back_to_samples():
+    """Test force_regenerate on a trip with nothing to keep still returns options without Gemini"""
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Hampi",
+        "start_date": "2024-08-10T00:00:00",
+        "end_date": "2024-08-12T00:00:00",
+        "total_budget": 30000,
+        "travelers": 1
+    }).json()["id"]
+    
+    response = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={"force_regenerate": True})
+    assert response.status_code == 200
+    options = response.json()
+    assert options
+    stored = client.get(f"/api/v1/trips/{trip_id}/options").json()
+    assert sorted(option["id"] for option in stored) == sorted(option["id"] for option in options)
+
+
+def test_regenerate_one_day_patches_option_and_itinerary(monkeypatch):
+    """Test regenerating a day costs one generation and rewrites only that day"""
+    from app.services.google_ai_service import google_ai_service
+    
+    prompts = []
+    
+    async def fake_generate_content(prompt, method="generate", model_name=None):
+        prompts.append((method, prompt))
+        return '{"day_number": 9, "activities": [{"activity": "Houseboat cruise", "cost": 4000}], "meals": []}'
+    
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Alleppey",
+        "start_date": "2024-09-01T00:00:00",
+        "end_date": "2024-09-03T00:00:00",
+        "total_budget": 45000,
+        "travelers": 2
+    }).json()["id"]
+    options = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()
+    option = options[0]
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{option['id']}")
+    before = client.get(f"/api/v1/trips/{trip_id}/itinerary").json()
+    
+    monkeypatch.setattr(google_ai_service, "_generate_content", fake_generate_content)
+    response = client.post(
+        f"/api/v1/trips/{trip_id}/options/{option['id']}/regenerate", json={"day_number": 2}
+    )
+    assert response.status_code == 200
+    days = response.json()["daily_itineraries"]
+    assert len(prompts) == 1 and prompts[0][0] == "daily_itinerary"
+    assert days[1]["day_number"] == 2
+    assert days[1]["date"] == option["daily_itineraries"][1]["date"]
+    assert days[1]["activities"][0]["activity"] == "Houseboat cruise"
+    assert days[0] == option["daily_itineraries"][0]
+    assert days[2] == option["daily_itineraries"][2]
+    
+    after = client.get(f"/api/v1/trips/{trip_id}/itinerary").json()
+    assert after[1]["activities"][0]["activity"] == "Houseboat cruise"
+    assert after[0]["activities"] == before[0]["activities"]
+    
+    async def unparseable(prompt, method="generate", model_name=None):
+        return "Sorry, I cannot help with that."
+    
+    monkeypatch.setattr(google_ai_service, "_generate_content", unparseable)
+    response = client.post(f"/api/v1/trips/{trip_id}/options/{option['id']}/regenerate", json={})
+    assert response.status_code == 502
+    assert client.get(f"/api/v1/trips/{trip_id}/itinerary").json()[1]["activities"] == after[1]["activities"]
+    assert client.post(
+        f"/api/v1/trips/{trip_id}/options/{option['id']}/regenerate", json={"day_number": 7}
+    ).status_code == 404
+
+def test_json_patch_edits_day_and_option_with_if_match():
+    """Test JSON Patch edits one day or option, bumps the ETag and rejects stale If-Match with 412"""
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Munnar",
+        "start_date": "2024-10-01T00:00:00",
+        "end_date": "2024-10-03T00:00:00",
+        "total_budget": 30000,
+        "travelers": 2
+    }).json()["id"]
+    option = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()[0]
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{option['id']}")
+    listing = client.get(f"/api/v1/trips/{trip_id}/itinerary")
+    before, etag = listing.json(), listing.headers["etag"]
+    headers = {"Content-Type": "application/json-patch+json", "If-Match": etag}
+    
+    response = client.patch(f"/api/v1/trips/{trip_id}/itinerary/2", headers=headers, content=json.dumps([
+        {"op": "add", "path": "/activities/0", "value": {"activity": "Tea garden walk", "cost": 500}},
+        {"op": "replace", "path": "/daily_budget", "value": 12000}
+    ]))
+    assert response.status_code == 200
+    assert set(response.json()) == {"id", "day_number", "activities", "daily_budget"}
+    assert response.json()["activities"][0]["activity"] == "Tea garden walk"
+    new_etag = response.headers["etag"]
+    assert new_etag != etag
+    
+    after = client.get(f"/api/v1/trips/{trip_id}/itinerary")
+    assert after.headers["etag"] == new_etag
+    assert after.json()[1]["activities"] == response.json()["activities"]
+    assert after.json()[1]["daily_budget"] == 12000
+    assert after.json()[0] == before[0]
+    
+    # The old ETag is stale now, for patches and for full updates alike
+    stale = client.patch(f"/api/v1/trips/{trip_id}/itinerary/2", headers=headers, content=json.dumps([
+        {"op": "remove", "path": "/activities/0"}
+    ]))
+    assert stale.status_code == 412
+    assert client.put(f"/api/v1/trips/{trip_id}", json={"travelers": 3}, headers={"If-Match": etag}).status_code == 412
+    
+    headers["If-Match"] = new_etag
+    assert client.patch(f"/api/v1/trips/{trip_id}/itinerary/2", headers=headers, content=json.dumps([
+        {"op": "test", "path": "/activities/0/activity", "value": "Something else"}
+    ])).status_code == 409
+    assert client.patch(f"/api/v1/trips/{trip_id}/itinerary/2", headers=headers, content=json.dumps([
+        {"op": "replace", "path": "/date", "value": "2024-10-09T00:00:00"}
+    ])).status_code == 422
+    assert client.patch(f"/api/v1/trips/{trip_id}/itinerary/9", headers=headers, content=json.dumps([
+        {"op": "replace", "path": "/daily_budget", "value": 1}
+    ])).status_code == 404
+    
+    response = client.patch(f"/api/v1/trips/{trip_id}/options/{option['id']}", headers=headers, content=json.dumps([
+        {"op": "replace", "path": "/option_name", "value": "Hill Escape"},
+        {"op": "move", "from": "/daily_itineraries/0", "path": "/daily_itineraries/-"}
+    ]))
+    assert response.status_code == 200
+    stored = client.get(f"/api/v1/trips/{trip_id}/options").json()
+    stored = next(item for item in stored if item["id"] == option["id"])
+    assert stored["option_name"] == "Hill Escape"
+    assert stored["daily_itineraries"] == option["daily_itineraries"][1:] + option["daily_itineraries"][:1]
+    assert client.put(
+        f"/api/v1/trips/{trip_id}", json={"travelers": 3}, headers={"If-Match": response.headers["etag"]}
+    ).status_code == 200
+
+def test_coalesced_patches_with_the_same_if_match_do_not_lose_updates():
+    """Test only the first of two concurrent edits sent with one ETag applies; the other gets 412"""
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Coorg",
+        "start_date": "2024-11-01T00:00:00",
+        "end_date": "2024-11-02T00:00:00",
+        "total_budget": 20000,
+        "travelers": 2
+    }).json()["id"]
+    option = client.post(f"/api/v1/trips/{trip_id}/generate-options", json={}).json()[0]
+    client.post(f"/api/v1/trips/{trip_id}/select-option/{option['id']}")
+    headers = {
+        "Content-Type": "application/json-patch+json",
+        "If-Match": client.get(f"/api/v1/trips/{trip_id}/itinerary").headers["etag"]
+    }
+    
+    async def both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(
+                async_client.patch(f"/api/v1/trips/{trip_id}/itinerary/1", headers=headers, content=json.dumps([
+                    {"op": "replace", "path": "/daily_budget", "value": value}
+                ]))
+                for value in (111, 222)
+            ))
+    
+    first, second = asyncio.run(both())
+    assert (first.status_code, second.status_code) == (200, 412)
+    assert first.json()["daily_budget"] == 111
+    assert client.get(f"/api/v1/trips/{trip_id}/itinerary").json()[0]["daily_budget"] == 111
+
+def test_recommendations_are_cached_per_destination_and_interests(monkeypatch):
+    """Test trips with the same destination and interests share one Gemini call"""
+    from app.services.google_ai_service import google_ai_service, recommendation_key, recommendations_cache
+    from app.services.recommendation_warmer import RecommendationWarmer
+    
+    asyncio.run(recommendations_cache.clear())
+    prompts = []
+    
+    async def fake_generate_content(prompt, method="generate", model_name=None):
+        prompts.append(prompt)
+        return '{"must_visit": ["Fort Aguada"], "tips": ["Carry sunscreen"]}'
+    
+    monkeypatch.setattr(google_ai_service, "_generate_content", fake_generate_content)
+    trip_ids = [
+        client.post("/api/v1/trips/", json={
+            "destination": destination,
+            "start_date": "2024-12-01T00:00:00",
+            "end_date": "2024-12-05T00:00:00",
+            "total_budget": 30000,
+            "travelers": 2,
+            "themes": themes
+        }).json()["id"]
+        for destination, themes in [("Goa", ["beach", "food"]), (" goa", ["Food", "beach"])]
+    ]
+    
+    responses = [client.post(f"/api/v1/trips/{trip_id}/recommendations") for trip_id in trip_ids]
+    assert [response.json()["must_visit"] for response in responses] == [["Fort Aguada"]] * 2
+    assert len(prompts) == 1
+    
+    warmer = RecommendationWarmer(session_factory=TestingSessionLocal, top=5)
+    popular = [recommendation_key(*combination) for combination in warmer.popular_combinations()]
+    assert "goa:beach:food" in popular
+    assert asyncio.run(google_ai_service.warm_travel_recommendations("Goa", ["beach", "food"])) is False
+    assert len(prompts) == 1
+
+
+def test_recommendation_warmer_paces_gemini_calls(monkeypatch):
+    """Test the background warmer spends Gemini calls through its token bucket"""
+    from app.services.google_ai_service import google_ai_service
+    from app.services.recommendation_warmer import RecommendationWarmer
+    
+    calls = []
+    
+    async def fake_warm(destination, interests, throttle=None):
+        await throttle()
+        calls.append(time.monotonic())
+        return True
+    
+    monkeypatch.setattr(google_ai_service, "_model", object())
+    monkeypatch.setattr(google_ai_service, "warm_travel_recommendations", fake_warm)
+    warmer = RecommendationWarmer(session_factory=TestingSessionLocal, top=3, gemini_per_minute=600)
+    monkeypatch.setattr(warmer, "popular_combinations", lambda: [("Goa", ["beach"]), ("Ooty", []), ("Agra", [])])
+    
+    assert asyncio.run(warmer.warm()) == 3
+    # One call right away, then one every 0.1 s
+    assert calls[2] - calls[0] >= 0.15
+
+
+def test_cache_warmer_prefills_popular_entries(monkeypatch):
+    """Test the warm-up mines trips, fills the caches once and then finds them cached"""
+    from app.services.cache_warmer import CacheWarmer
+    from app.services.google_ai_service import google_ai_service
+    from app.services.google_maps_service import google_maps_service
+    
+    asyncio.run(cache.backend.clear())
+    calls = []
+    
+    class FakeMapsClient:
+        def geocode(self, address):
+            calls.append("geocode")
+            return [{"geometry": {"location": {"lat": 32.2, "lng": 77.2}}}]
+    
+    async def fake_generate_content(prompt, method="generate", model_name=None):
+        calls.append(method)
+        if method == "trip_options":
+            return '[{"option_name": "Valley Explorer", "theme": "adventure"}]'
+        return '{"must_visit": ["Solang Valley"]}'
+    
+    monkeypatch.setattr(google_maps_service, "client", FakeMapsClient())
+    monkeypatch.setattr(google_ai_service, "model", object())
+    monkeypatch.setattr(google_ai_service, "_generate_content", fake_generate_content)
+    start = datetime.utcnow() + timedelta(days=30)
+    for _ in range(2):
+        client.post("/api/v1/trips/", json={
+            "destination": "Manali",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=4)).isoformat(),
+            "total_budget": 40000,
+            "travelers": 2,
+            "themes": ["adventure"]
+        })
+    
+    warmer = CacheWarmer(session_factory=TestingSessionLocal, gemini_per_minute=6000, maps_per_minute=6000)
+    plan = warmer.plan()
+    assert ("geocode", ("Manali",)) in plan["jobs"]
+    assert ("recommendations", ("Manali", ["adventure"])) in plan["jobs"]
+    assert any(kind == "trip_options" and args[0]["destination"] == "Manali" for kind, args in plan["jobs"])
+    assert warmer.estimate_cost(plan["jobs"]) > 0
+    
+    report = asyncio.run(warmer.run(plan["jobs"]))
+    assert report["failed"] == 0
+    assert report["warmed"] == len(calls) >= 3
+    
+    calls.clear()
+    report = asyncio.run(warmer.run(plan["jobs"]))
+    assert report["cached"] == len(plan["jobs"])
+    assert calls == []
+
+def test_places_search_skips_upstream_work_past_deadline(monkeypatch):
+    """Test a slow geocode leaves no time for the search, which then falls back fast"""
+    from app.services.google_maps_service import google_maps_service
+    
+    asyncio.run(cache.backend.clear())
+    calls = []
+    
+    class SlowMapsClient:
+        def geocode(self, address):
+            calls.append("geocode")
+            time.sleep(0.4)
+            return [{"geometry": {"location": {"lat": 15.3, "lng": 74.1}}}]
+        
+        def places_nearby(self, **kwargs):
+            calls.append("places_nearby")
+            return {"results": []}
+    
+    monkeypatch.setattr(google_maps_service, "client", SlowMapsClient())
+    trip_id = client.post("/api/v1/trips/", json={
+        "destination": "Goa",
+        "start_date": "2024-12-01T00:00:00",
+        "end_date": "2024-12-05T00:00:00",
+        "total_budget": 30000,
+        "travelers": 2
+    }).json()["id"]
+    
+    response = client.post(
+        f"/api/v1/trips/{trip_id}/places/search",
+        params={"query": "beach"},
+        headers={"X-Request-Timeout": "0.8"}
+    )
+    assert response.status_code == 200
+    assert calls == ["geocode"]
+    assert response.headers["x-degraded"] == "maps"
+    assert response.json()["places"][0]["place_id"] == "fallback_beach_1"
+    
+    calls.clear()
+    response = client.post(f"/api/v1/trips/{trip_id}/places/search", params={"query": "beach"})
+    assert calls == ["places_nearby"]  # the geocode was cached; the fallback search was not
+    assert "x-degraded" not in response.headers
+    assert "maps;dur=" in response.headers["server-timing"]
+    assert "cache;dur=" in response.headers["server-timing"]
+
 def test_health_check():
     """Test health check endpoint"""
     response = client.get("/health")
@@ -133,6 +806,52 @@ def test_health_check():
     
     data = response.json()
     assert data["status"] == "healthy"
+    assert data["circuits"]["gemini"]["state"] == "closed"
+    assert data["circuits"]["maps"]["state"] == "closed"
+
+def test_importing_the_app_defers_ddl_and_sdks(tmp_path):
+    """Test tables are created at startup, not import, and the Google SDKs and NumPy load on first use"""
+    database = tmp_path / "startup.db"
+    script = (
+        "import os, sys\n"
+        "from app.main import app\n"
+        "print(os.path.exists(sys.argv[1]), 'google.generativeai' in sys.modules, 'googlemaps' in sys.modules,\n"
+        "      'numpy' in sys.modules)\n"
+        "from fastapi.testclient import TestClient\n"
+        "from sqlalchemy import create_engine, inspect\n"
+        "with TestClient(app):\n"
+        "    pass\n"
+        "print('trips' in inspect(create_engine(f'sqlite:///{sys.argv[1]}')).get_table_names())\n"
+    )
+    env = {
+        **os.environ, "DATABASE_URL": f"sqlite:///{database}", "SECRET_KEY": "test-secret-key",
+        "TRIP_PURGE_ENABLED": "False", "RECOMMENDATIONS_WARM_ENABLED": "False",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(database)], env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False", "False", "False", "True"]
+
+def test_requests_wait_for_sdk_setup_off_the_event_loop():
+    """Test a request arriving while connect() holds the init lock does not block the event loop"""
+    from app.services import google_ai_service as module
+    
+    service = module.GoogleAIService()
+    
+    async def scenario():
+        module._init_lock.acquire()
+        try:
+            waiting = asyncio.create_task(service.available())
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+        finally:
+            module._init_lock.release()
+        return await waiting
+    
+    # No API key in tests: Gemini is unavailable once setup finishes
+    assert asyncio.run(scenario()) is False
+
 
 def test_root_endpoint():
     """Test root endpoint"""
@@ -0,0 +1,64 @@
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import pytest
+from sqlalchemy import create_engine, Column, String, MetaData, Table, select, text
+
+from app.core.types import CompressedJSON, check_codec, encode_json, decode_json, is_encoded
+
+
+def _make_table():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table(
+        "documents", metadata,
+        Column("id", String(50), primary_key=True),
+        Column("payload", CompressedJSON),
+    )
+    metadata.create_all(engine)
+    return engine, table
+
+
+def test_compressed_json_round_trip():
+    """Test values survive a write/read cycle and are stored compressed"""
+    engine, table = _make_table()
+    payload = [{"day_number": day, "activities": [{"activity": "Fort visit", "cost": 1500.5}]} for day in range(1, 15)]
+    
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [{"id": "a", "payload": payload}, {"id": "b", "payload": None}])
+        raw = connection.execute(text("SELECT payload FROM documents WHERE id = 'a'")).scalar()
+        rows = dict(connection.execute(select(table.c.id, table.c.payload)).all())
+    
+    assert is_encoded(raw)
+    assert len(raw) < len(str(payload))
+    assert rows == {"a": payload, "b": None}
+
+
+def test_compressed_json_reads_legacy_rows():
+    """Test rows written by the old JSON column type are still readable"""
+    engine, table = _make_table()
+    
+    with engine.begin() as connection:
+        connection.execute(text("""INSERT INTO documents VALUES ('legacy', '{"name": "Hotel", "cost": 3000}')"""))
+        value = connection.execute(select(table.c.payload)).scalar()
+    
+    assert value == {"name": "Hotel", "cost": 3000}
+    assert decode_json(encode_json(value)) == value
+
+
+def test_unusable_codec_fails_clearly():
+    """Test an unknown codec, or zstd without zstandard installed, is rejected up front"""
+    with pytest.raises(ValueError):
+        check_codec("gzip")
+    with pytest.raises(ValueError):
+        encode_json({"a": 1}, codec="gzip")
+    
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        with pytest.raises(RuntimeError, match="zstandard is not installed"):
+            check_codec("zstd")
+    else:
+        check_codec("zstd")
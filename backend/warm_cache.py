@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Cache Warm-up Script
+Prefills the geocode, recommendations and trip options caches for the most
+common destinations, durations and themes in the trips table
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.cache.cache import cache
+from app.core.config import settings
+from app.services.cache_warmer import CacheWarmer, describe
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Prefill caches from historical trips")
+    parser.add_argument("--sample-size", type=int, default=5000, help="Recent trips to mine")
+    parser.add_argument("--top-destinations", type=int, default=50, help="Destinations to geocode")
+    parser.add_argument("--top-combinations", type=int, default=100, help="Destination/interest recommendations")
+    parser.add_argument("--top-profiles", type=int, default=20, help="Upcoming trip profiles to generate options for")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers")
+    parser.add_argument("--gemini-per-minute", type=float, default=10, help="Gemini calls per minute")
+    parser.add_argument("--maps-per-minute", type=float, default=300, help="Google Maps calls per minute")
+    parser.add_argument("--dry-run", action="store_true", help="Show the plan and cost estimate only")
+    args = parser.parse_args()
+
+    if not cache.shared and not args.dry_run:
+        print(f"❌ CACHE_BACKEND={settings.cache_backend} is private to this process, so the server would not")
+        print("   see the warmed entries. Use CACHE_BACKEND=sqlite or resp (see README) and try again.")
+        return False
+
+    warmer = CacheWarmer(
+        sample_size=args.sample_size,
+        top_destinations=args.top_destinations,
+        top_combinations=args.top_combinations,
+        top_profiles=args.top_profiles,
+        concurrency=args.concurrency,
+        gemini_per_minute=args.gemini_per_minute,
+        maps_per_minute=args.maps_per_minute
+    )
+
+    plan = warmer.plan()
+    jobs = plan["jobs"]
+    print(f"🔍 Mined {plan['trips']} recent trips")
+    print(f"   Destinations: {', '.join(f'{name} ({count})' for name, count in plan['destinations']) or '-'}")
+    print(f"   Durations: {', '.join(f'{days} days ({count})' for days, count in plan['durations']) or '-'}")
+    print(f"   Themes: {', '.join(f'{theme} ({count})' for theme, count in plan['themes']) or '-'}")
+    counts = {kind: sum(1 for job in jobs if job[0] == kind) for kind in ("geocode", "recommendations", "trip_options")}
+    print(f"📋 {len(jobs)} jobs: {counts['geocode']} geocodes, {counts['recommendations']} recommendations, "
+          f"{counts['trip_options']} trip option sets")
+    print(f"💰 Estimated cost: up to ${warmer.estimate_cost(jobs):.2f} (cached entries are skipped and cost nothing)")
+
+    if args.dry_run:
+        for job in jobs:
+            print(f"   - {describe(*job)}")
+        return True
+
+    start = time.perf_counter()
+
+    def show_progress(report):
+        done = report["warmed"] + report["cached"] + report["failed"]
+        print(
+            f"\r🔄 {done}/{report['total'] - report['skipped']} done: {report['warmed']} warmed, "
+            f"{report['cached']} already cached, {report['failed']} failed (${report['cost_usd']:.2f})",
+            end="", flush=True
+        )
+
+    report = asyncio.run(warmer.run(jobs, progress=show_progress))
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Warmed {report['warmed']} entries in {elapsed:.1f}s "
+          f"({report['cached']} already cached, {report['failed']} failed, est. ${report['cost_usd']:.2f})")
+    if report["skipped"]:
+        print(f"   ⚠️  Skipped {report['skipped']} jobs: Gemini or Google Maps API key not configured")
+    for error in report["errors"]:
+        print(f"   ❌ {error}")
+
+    return report["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)